@@ -31,4 +31,47 @@ class TweetsPipeline:
         except pymongo.errors.DuplicateKeyError:
             pass
         return item
-        
\ No newline at end of file
+        
+
+class TweetsBulkPipeline(TweetsPipeline):
+    """Buffer tweets and write them with one bulk upsert per batch.
+
+    Also records the newest stored tweet id per user in
+    ``twitter_timeline_state`` so the next watchlist refresh can stop paging
+    once it reaches tweets already stored.
+    """
+    state_collection_name = "twitter_timeline_state"
+    batch_size = 200
+
+    def open_spider(self, spider):
+        super().open_spider(spider)
+        self.buffer = []
+
+    def close_spider(self, spider):
+        self.flush()
+        super().close_spider(spider)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        items, self.buffer = self.buffer, []
+        # Engagement counts change after posting, so re-seen tweets are updated rather than skipped
+        self.db[self.collection_name].bulk_write(
+            [pymongo.UpdateOne({"_id": item["_id"]}, {"$set": item}, upsert=True) for item in items],
+            ordered=False)
+
+        newest = {}
+        for item in items:
+            newest[item["user_id"]] = max(newest.get(item["user_id"], 0), int(item["_id"]))
+        self.db[self.state_collection_name].bulk_write(
+            [pymongo.UpdateOne({"_id": user_id}, {"$max": {"newest_id": post_id}}, upsert=True)
+             for user_id, post_id in newest.items()],
+            ordered=False)
+
+    def process_item(self, item, spider):
+        item["_id"] = item["post_id"]
+        del item["post_id"]
+        self.buffer.append(ItemAdapter(item).asdict())
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        return item
@@ -2,16 +2,22 @@ import scrapy
 from datetime import datetime
 import json
 import os
+import pymongo
 from dotenv import load_dotenv
 load_dotenv()
 # from keys import TWITTER_API
 
+TIMELINE_STATE_COLLECTION = "twitter_timeline_state"
+
+
 class Tweets(scrapy.Spider):
     name = "twitter_tweets"
     custom_settings = {
         "ITEM_PIPELINES": {
-            "ackers_weldon.pipelines.twitter.tweets.TweetsPipeline": 300,
-        }
+            "ackers_weldon.pipelines.twitter.tweets.TweetsBulkPipeline": 300,
+        },
+        # Stay within the RapidAPI plan when a watchlist fans out
+        "CONCURRENT_REQUESTS_PER_DOMAIN": int(os.getenv("TWITTER_API_MAX_CONCURRENCY", 4)),
     }
     headers = {
         "x-rapidapi-host": "twitter-v1-1-v2-api.p.rapidapi.com",
@@ -19,9 +25,23 @@ class Tweets(scrapy.Spider):
         "Content-Type": "application/json"
     }
     date_format = "%a %b %d %H:%M:%S +0000 %Y"
+    page_size = 20
 
-    def __init__(self, payload=None, *args, **kwargs):
+    def __init__(self, payload=None, user_ids=None, max_pages=5, initial_pages=None, *args, **kwargs):
+        '''
+        Single timeline: ``payload`` (latest 20 tweets for ``payload["userId"]``).
+        Watchlist refresh: ``user_ids`` (list or comma separated). Each timeline is
+        paged only until it reaches the newest tweet already stored for that
+        user (``twitter_timeline_state``), at most ``max_pages`` pages. A user
+        with nothing stored yet has no tweet to stop at, so their first refresh
+        takes ``initial_pages`` pages (TWITTER_INITIAL_PAGES, default 1).
+        '''
         super(Tweets, self).__init__(*args, **kwargs)
+        if isinstance(user_ids, str):
+            user_ids = [user_id for user_id in user_ids.split(",") if user_id]
+        self.user_ids = user_ids
+        self.max_pages = int(max_pages)
+        self.initial_pages = int(initial_pages or os.getenv("TWITTER_INITIAL_PAGES", 1))
         # Default payload if none provided
         self.payload = payload or {
             "userId": "783214",  # Default to Twitter's user ID
@@ -32,45 +52,98 @@ class Tweets(scrapy.Spider):
             "withV2Timeline": True
         }
 
+    def timeline_request(self, user_id, cursor=None, since_id=None, page=1):
+        variables = dict(self.payload, userId=user_id, count=self.page_size)
+        if cursor:
+            variables["cursor"] = cursor
+        return scrapy.Request(
+            url=f"https://twitter-v1-1-v2-api.p.rapidapi.com/graphql/UserTweets?variables={json.dumps(variables)}",
+            method="GET",
+            headers=self.headers,
+            callback=self.parse_timeline,
+            dont_filter=True,
+            meta={"user_id": user_id, "since_id": since_id, "page": page}
+        )
+
+    def since_ids(self):
+        client = pymongo.MongoClient(self.settings.get("MONGO_URI"))
+        try:
+            states = client[self.settings.get("MONGO_DATABASE", "items")][TIMELINE_STATE_COLLECTION].find(
+                {"_id": {"$in": self.user_ids}}, {"newest_id": 1})
+            return {state["_id"]: state.get("newest_id") for state in states}
+        finally:
+            client.close()
+
     def start_requests(self):
-        return [
-            scrapy.Request(
-                url=f"https://twitter-v1-1-v2-api.p.rapidapi.com/graphql/UserTweets?variables={json.dumps(self.payload)}",
-                method="GET",
-                headers=self.headers,
-                callback=self.parse
-            )
-        ]
+        if not self.user_ids:
+            return [
+                scrapy.Request(
+                    url=f"https://twitter-v1-1-v2-api.p.rapidapi.com/graphql/UserTweets?variables={json.dumps(self.payload)}",
+                    method="GET",
+                    headers=self.headers,
+                    callback=self.parse
+                )
+            ]
+        since_ids = self.since_ids()
+        return [self.timeline_request(user_id, since_id=since_ids.get(user_id)) for user_id in self.user_ids]
 
-    def parse(self, response):
-        entries = response.json()["data"]["user"]["result"]["timeline_v2"]["timeline"]["instructions"][1]["entries"]
+    def timeline_entries(self, response):
+        instructions = response.json()["data"]["user"]["result"]["timeline_v2"]["timeline"]["instructions"]
+        for instruction in instructions:
+            if instruction.get("type") == "TimelineAddEntries":
+                return instruction.get("entries", [])
+        return []
 
+    def tweet_item(self, entry, user_id):
+        result = entry["content"]["itemContent"]["tweet_results"]["result"]
+        # Tweets with visibility notices wrap the usual result
+        result = result.get("tweet", result)
+        legacy = result["legacy"]
+        user = result["core"]["user_results"]["result"]["legacy"]
+        return {
+            "post_id": legacy["id_str"],
+            "user_id": user_id,
+            "user_name": user["name"],
+            "user_handle": user["screen_name"],
+            "profile_img": user["profile_image_url_https"],
+            "likes": legacy["favorite_count"],
+            "retweets": legacy["retweet_count"],
+            "reply": legacy["reply_count"],
+            "full_text": legacy["full_text"],
+            "date_posted": datetime.strptime(legacy["created_at"], self.date_format).timestamp(),
+            "img_path": legacy.get("extended_entities", {}).get("media", [{}])[0].get("media_url_https", None),
+            "hashtags": legacy["entities"]["hashtags"] if legacy["entities"]["hashtags"] else None,
+        }
+
+    def parse(self, response):
         count = 0
-        for tweet in entries:
+        for entry in self.timeline_entries(response):
             if count >= 20:
                 break
-            item = {
-                "post_id": tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["id_str"],
-                "user_id": self.payload["userId"],
-                "user_name": tweet["content"]["itemContent"]["tweet_results"]["result"]["core"]["user_results"]["result"]["legacy"]["name"],
-                "user_handle": tweet["content"]["itemContent"]["tweet_results"]["result"]["core"]["user_results"]["result"]["legacy"]["screen_name"],
-                "profile_img": tweet["content"]["itemContent"]["tweet_results"]["result"]["core"]["user_results"]["result"]["legacy"]["profile_image_url_https"],
-                "likes": tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["favorite_count"],
-                "retweets": tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["retweet_count"],
-                "reply": tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["reply_count"],
-                "full_text": tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["full_text"],
-                "date_posted": datetime.strptime(tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["created_at"], self.date_format).timestamp(),
-                "img_path": (
-                            tweet.get("content", {})
-                            .get("itemContent", {})
-                            .get("tweet_results", {})
-                            .get("result", {})
-                            .get("legacy", {})
-                            .get("extended_entities", {})
-                            .get("media", [{}])[0].get("media_url_https", None)
-                        ) if tweet.get("content") else None,
-                "hashtags": tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["entities"]["hashtags"] if tweet["content"]["itemContent"]["tweet_results"]["result"]["legacy"]["entities"]["hashtags"] else None,
-            }
-            
-            count+=1
-            yield item
\ No newline at end of file
+            if not entry.get("entryId", "").startswith("tweet-"):
+                continue
+            count += 1
+            yield self.tweet_item(entry, self.payload["userId"])
+
+    def parse_timeline(self, response):
+        user_id = response.meta["user_id"]
+        since_id = response.meta["since_id"]
+        reached_stored = False
+        cursor = None
+        for entry in self.timeline_entries(response):
+            entry_id = entry.get("entryId", "")
+            if entry_id.startswith("cursor-bottom-"):
+                cursor = entry["content"]["value"]
+                continue
+            if not entry_id.startswith("tweet-"):
+                continue
+            item = self.tweet_item(entry, user_id)
+            if since_id and int(item["post_id"]) <= since_id:
+                reached_stored = True
+                continue
+            yield item
+
+        # Later refreshes page until the stored tweets; a first refresh has its own bound
+        page_limit = self.max_pages if since_id else self.initial_pages
+        if cursor and not reached_stored and response.meta["page"] < page_limit:
+            yield self.timeline_request(user_id, cursor=cursor, since_id=since_id, page=response.meta["page"] + 1)
@@ -0,0 +1,71 @@
+"""
+JSON Provider
+orjson-backed Flask JSON provider that serializes MongoDB documents as returned by pymongo
+"""
+
+import decimal
+import json
+from datetime import date
+from typing import Any, Union
+
+from bson import Decimal128, ObjectId
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+# orjson is optional: without it responses fall back to the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dates are passed through to mongo_default so they keep Flask's HTTP-date format
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+    if orjson is not None else 0
+)
+
+
+def mongo_default(obj: Any) -> Any:
+    """Serialize the MongoDB/BSON types that the native encoders do not know about"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        obj = obj.to_decimal()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, date):
+        # Same as Flask's default provider ("Wed, 21 Oct 2015 07:28:00 GMT"), which clients already parse
+        return http_date(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    numpy values are handled inside orjson; ``ObjectId``, ``Decimal`` and
+    dates go through ``mongo_default``, so routes can return projected
+    documents as-is without converting fields in Python first. Dates are
+    written as HTTP-dates, as Flask's default provider does.
+    """
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=mongo_default, option=ORJSON_OPTIONS).decode()
+        kwargs.setdefault("default", mongo_default)
+        return json.dumps(obj, **kwargs)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(obj, default=mongo_default, option=ORJSON_OPTIONS)
+        return json.dumps(obj, default=mongo_default).encode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -22,11 +22,33 @@ from flask_cors import CORS
 from pymongo import MongoClient
 from bson import ObjectId
 import json
+import re
+import threading
 from datetime import datetime, timedelta
 from services.news_fetcher import NewsFetcherService
 from services.ai_proxy import AIProxyService
-from flask import Response
-import yfinance as yf
+from services.ai_cache import AIResultCache
+from services.single_flight import SingleFlight
+from services.news_projections import resolve_fields, build_projection, shape_article
+from services.news_search import NewsSearchService
+from services.realtime_news import RealtimeNewsAggregator
+from services.ai_batch import (AIBatchProcessor, AI_TASKS, MAX_BATCH_ARTICLES, article_projection,
+                               article_text, article_update, cached_article_result)
+from services.ai_streaming import AIStreamManager
+from services.company_autocomplete import CompanyAutocomplete
+from services.fundamentals import FundamentalsService, STATEMENTS, FREQUENCIES
+from services.quotes import QuoteSnapshotService
+from services.crawl_runner import CrawlRunnerService
+from services.twitter_users import TwitterUserResolver, MAX_BATCH_HANDLES
+from services.kyc import (KYCService, KINDS as KYC_KINDS, MAX_BATCH_NAMES as KYC_MAX_BATCH_NAMES,
+                          legacy_result_view, record_view)
+from services.read_routing import read_preference_from_env, describe as describe_read_preference
+from services.response_cache import ResponseCache
+from services.compression import Compression
+from services.metrics import RequestMetrics
+from api.json_provider import MongoJSONProvider
+from api.routes.search import search_proxy
+from flask import Response, stream_with_context
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -35,37 +57,70 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Custom JSON encoder to handle ObjectId
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+# Fast JSON provider that serializes ObjectId, datetime and Decimal natively
+# (app.json_encoder is ignored by Flask >= 2.3)
+app.json = MongoJSONProvider(app)
 
-app.json_encoder = CustomJSONEncoder
+# Per-route latency histograms, Mongo command timing and Server-Timing headers.
+# Registered before the MongoClient is created so its command listener attaches.
+request_metrics = RequestMetrics(app)
+
+# LAZY_STARTUP=1 (set by the gunicorn configs): importing this module does no I/O.
+# The client connects on first use inside each worker, and index/collection setup
+# is left to migrate.py instead of running in every process that imports the app.
+LAZY_STARTUP = os.getenv('LAZY_STARTUP', '').lower() in ('1', 'true', 'yes')
 
 # MongoDB connection
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-try:
-    client = MongoClient(MONGO_URI)
-    db = client['dashboard_db']
-    # Test connection
-    client.admin.command('ping')
-    print("MongoDB connected successfully")
-except Exception as e:
-    print(f"MongoDB connection failed: {e}")
-    # Fallback to local connection without auth
-    client = MongoClient('mongodb://localhost:27017/')
+if LAZY_STARTUP:
+    client = MongoClient(MONGO_URI, connect=False)
     db = client['dashboard_db']
-    print("Using fallback MongoDB connection")
+else:
+    try:
+        client = MongoClient(MONGO_URI)
+        db = client['dashboard_db']
+        # Test connection
+        client.admin.command('ping')
+        print("MongoDB connected successfully")
+    except Exception as e:
+        print(f"MongoDB connection failed: {e}")
+        # Fallback to local connection without auth
+        client = MongoClient('mongodb://localhost:27017/')
+        db = client['dashboard_db']
+        print("Using fallback MongoDB connection")
+
+# Uncached read-only endpoints that tolerate slightly stale data (news export,
+# company search/autocomplete, financials) read through read_db, which prefers
+# secondaries within a bounded staleness. Everything else stays on db (primary):
+# writes and the reads that must see them (ingest dedup, AI results, single-flight),
+# and every @response_cache.cached view, since a recompute after invalidate()
+# that read a lagging secondary would cache old data under the new version.
+read_preference = read_preference_from_env()
+read_db = db.with_options(read_preference=read_preference)
+
+# Content-addressed cache of AI results: in-process LRU in front of a Mongo TTL collection
+ai_result_cache = AIResultCache(db)
+
+# Identical concurrent AI requests (in this worker or any other) share one Ollama generation
+ai_single_flight = SingleFlight(db)
 
 # Initialize AI proxy
-ai_proxy = AIProxyService()
+ai_proxy = AIProxyService(cache=ai_result_cache, single_flight=ai_single_flight)
+
+# Response cache for hot read endpoints, invalidated whenever ingest stores news
+response_cache = ResponseCache(db)
 
-# Initialize News Fetcher
-news_fetcher = NewsFetcherService()
+# gzip/brotli negotiation for uncached responses; cached ones are stored precompressed
+compression = Compression(app)
+
+# Initialize News Fetcher (sharing the AI proxy, its result cache and the Mongo client)
+news_fetcher = NewsFetcherService(ai_service=ai_proxy, db=db)
+
+# Batched AI analysis; new results invalidate the cached news responses
+ai_batch = AIBatchProcessor(db, news_fetcher.ai_service, on_write=lambda: response_cache.invalidate('news'))
+
+# Token-by-token SSE streams for summarize/extract, resumable from the AI result cache
+ai_streams = AIStreamManager(news_fetcher.ai_service)
 
 # News Deduplication Module
 class NewsDeduplicator:
@@ -241,7 +296,8 @@ class NewsDeduplicator:
 news_deduplicator = NewsDeduplicator(db)
 
 def create_deduplication_indexes():
-    """Create indexes for efficient deduplication"""
+    """Create indexes for efficient deduplication; returns the number that failed"""
+    failures = 0
     try:
         # Unique index on canonical URL to prevent exact duplicates
         db.news_metadata.create_index(
@@ -253,6 +309,7 @@ def create_deduplication_indexes():
         print("✓ Created canonical_url_unique index")
     except Exception as e:
         print(f"⚠️  canonical_url_unique index error: {e}")
+        failures += 1
     
     try:
         # Compound index for title+time deduplication
@@ -263,6 +320,7 @@ def create_deduplication_indexes():
         print("✓ Created title_time_dedup index")
     except Exception as e:
         print(f"⚠️  title_time_dedup index error: {e}")
+        failures += 1
     
     try:
         # TTL index for automatic cleanup (90 days)
@@ -274,9 +332,43 @@ def create_deduplication_indexes():
         print("✓ Created fetched_at_ttl index")
     except Exception as e:
         print(f"⚠️  fetched_at_ttl index error: {e}")
+        failures += 1
+    return failures
+
+# Relevance-ranked text search over news_metadata
+news_search = NewsSearchService(db)
 
-# Create indexes on startup
-create_deduplication_indexes()
+# Parallel fan-out over the realtime news sources (SearXNG goes through the cached web search proxy)
+realtime_news = RealtimeNewsAggregator(db, news_search, deadline=float(os.getenv('REALTIME_NEWS_DEADLINE', 8)),
+                                       search_proxy=search_proxy)
+
+def create_search_indexes():
+    """Create text indexes backing the search endpoints; returns the number that failed"""
+    failures = 0
+    try:
+        news_search.create_indexes()
+        print("✓ Created news_text_search index")
+    except Exception as e:
+        print(f"⚠️  news_text_search index error: {e}")
+        failures += 1
+    
+    try:
+        db.companies.create_index([("symbol", 1)], name="symbol_lookup")
+        db.companies.create_index([("name", 1)], name="name_prefix")
+        db.companies.create_index([("name", "text")], default_language="english", name="companies_text_search")
+        print("✓ Created companies search indexes")
+    except Exception as e:
+        print(f"⚠️  companies search index error: {e}")
+        failures += 1
+    
+    try:
+        db.kyc_results.create_index([("query", 1)], name="kyc_query_prefix")
+        db.kyc_results.create_index([("query", "text")], default_language="english", name="kyc_text_search")
+        print("✓ Created kyc_text_search index")
+    except Exception as e:
+        print(f"⚠️  kyc_text_search index error: {e}")
+        failures += 1
+    return failures
 
 # AI Status endpoint
 @app.route('/api/ai/status', methods=['GET'])
@@ -292,6 +384,8 @@ def get_ai_status():
                 'status': 'AI services available',
                 'ollama_available': True,
                 'ollama_url': ollama_url,
+                'cache': ai_result_cache.stats(),
+                'single_flight': ai_single_flight.stats(),
                 'timestamp': datetime.now().isoformat()
             })
         else:
@@ -314,14 +408,6 @@ def get_ai_status():
 def trigger_fresh_news_fetch():
     """Trigger fresh news fetch from all sources"""
     try:
-        # Import the news fetcher service
-        from services.news_fetcher import NewsFetcherService
-        
-        # Create a news fetcher instance using the existing database connection
-        news_fetcher = NewsFetcherService()
-        # Override the database connection to use the existing one
-        news_fetcher.db = db
-        
         # Fetch fresh news from all sources
         stored_count = news_fetcher.fetch_all_news()
         
@@ -346,10 +432,6 @@ def trigger_news_fetch():
     try:
         logger.info("News fetch triggered via API")
         
-        # Import and initialize news fetcher
-        from services.news_fetcher import NewsFetcherService
-        news_fetcher = NewsFetcherService()
-        
         # Fetch news from all sources in background
         def fetch_news_background():
             try:
@@ -360,7 +442,6 @@ def trigger_news_fetch():
                 logger.error(f"Background news fetch failed: {e}")
         
         # Start background thread for news fetching
-        import threading
         fetch_thread = threading.Thread(target=fetch_news_background)
         fetch_thread.daemon = True
         fetch_thread.start()
@@ -387,98 +468,170 @@ def index():
     """Serve the main comprehensive dashboard page"""
     return render_template('index.html')
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics aggregated across all gunicorn workers"""
+    try:
+        body, content_type = request_metrics.render()
+        return Response(body, content_type=content_type)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
+        'read_preference': describe_read_preference(read_preference),
         'timestamp': datetime.now().isoformat()
     })
 
+def build_news_filter(args):
+    """Build the news_metadata filter shared by the list, stream and export endpoints"""
+    query = {}
+    
+    # Handle both 'source' (backward compatibility) and 'sources' (new multiple sources)
+    source = args.get('source')
+    sources = args.get('sources', '').split(',') if args.get('sources') else []
+    category = args.get('category')
+    search_query = args.get('q', '')
+    
+    # Handle source filtering - prioritize 'sources' over 'source'
+    if sources and 'all' not in sources:
+        # Multiple sources filtering
+        query['api_source'] = {'$in': sources}
+    elif source and source != 'all':
+        # Single source filtering (backward compatibility)
+        query['api_source'] = source
+        
+    if category:
+        query['category'] = category
+    if search_query:
+        # Served by the weighted text index instead of an unanchored $regex scan
+        query['$text'] = {'$search': search_query}
+    
+    return query
+
+def is_string_list(value):
+    """True for a JSON array of strings (a bare string would otherwise be iterated per character)"""
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+def get_batch_size(args, default=500):
+    """Cursor batch size for streamed responses, bounded to keep memory flat; ValueError if malformed"""
+    try:
+        batch_size = int(args.get('batch_size', default))
+    except ValueError:
+        raise ValueError('batch_size must be an integer')
+    return max(1, min(batch_size, 5000))
+
+def ndjson_response(documents, transform=None, batch_size=500):
+    """Stream documents as newline-delimited JSON, flushing one chunk per batch"""
+    def generate():
+        chunk = []
+        for document in documents:
+            if transform:
+                document = transform(document)
+            chunk.append(app.json.dumps_bytes(document))
+            if len(chunk) >= batch_size:
+                yield b'\n'.join(chunk) + b'\n'
+                chunk = []
+        if chunk:
+            yield b'\n'.join(chunk) + b'\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def news_page_args(args):
+    """page, per_page and fields for a page of /api/news; ValueError for malformed values"""
+    try:
+        page = int(args.get('page', 1))
+        # Also accept 'limit' parameter for backward compatibility
+        per_page = int(args.get('limit') or args.get('per_page', 500))
+    except ValueError:
+        raise ValueError('page, per_page and limit must be integers')
+    # Sparse fieldsets: ?fields=title,url or a predefined ?view=list|detail|ai
+    return page, per_page, resolve_fields(args.get('fields'), args.get('view'))
+
 # Enhanced News API with multiple sources
 @app.route('/api/news', methods=['GET'])
 def get_news():
     """Get news from the enhanced news_metadata collection with pagination"""
+    # NDJSON pages are streamed and never cached, so they are served before the response cache
+    if request.args.get('format') == 'ndjson':
+        return stream_news()
+    return get_news_page()
+
+def stream_news():
+    """?format=ndjson: the page streamed straight from the cursor without the envelope"""
     try:
-        # Get pagination parameters
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 500))
-        # Also accept 'limit' parameter for backward compatibility
-        if request.args.get('limit'):
-            per_page = int(request.args.get('limit'))
+        try:
+            page, per_page, fields = news_page_args(request.args)
+            batch_size = get_batch_size(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        skip = (page - 1) * per_page
+        search_query = request.args.get('q', '')
+        query = build_news_filter(request.args)
+        # Same title-prefix fallback as the JSON page when the text index finds nothing
+        if search_query and db.news_metadata.count_documents(query, limit=1) == 0:
+            articles = news_search.prefix_matches(query, skip, per_page, build_projection(fields))
+            articles.batch_size(batch_size)
+        elif search_query and request.args.get('sort', 'relevance') == 'relevance':
+            articles = news_search.rank(query, skip, per_page, build_projection(fields))
+        else:
+            articles = db.news_metadata.find(query, build_projection(fields)).sort('published_at', -1).skip(skip).limit(per_page)
+            articles.batch_size(batch_size)
+        return ndjson_response(articles, lambda article: shape_article(article, fields), batch_size)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@response_cache.cached('news')
+def get_news_page():
+    """The JSON page of /api/news, with pagination info and filter options"""
+    try:
+        try:
+            page, per_page, fields = news_page_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        # Handle both 'source' (backward compatibility) and 'sources' (new multiple sources)
-        source = request.args.get('source')
-        sources = request.args.get('sources', '').split(',') if request.args.get('sources') else []
         search_query = request.args.get('q', '')
-        category = request.args.get('category')
         
         # Calculate skip for pagination
         skip = (page - 1) * per_page
         
         # Build query for news_metadata collection
-        query = {}
-        
-        # Handle source filtering - prioritize 'sources' over 'source'
-        if sources and 'all' not in sources:
-            # Multiple sources filtering
-            query['api_source'] = {'$in': sources}
-        elif source and source != 'all':
-            # Single source filtering (backward compatibility)
-            query['api_source'] = source
-            
-        if category:
-            query['category'] = category
-        if search_query:
-            query['$or'] = [
-                {'title': {'$regex': search_query, '$options': 'i'}},
-                {'summary': {'$regex': search_query, '$options': 'i'}}
-            ]
+        query = build_news_filter(request.args)
         
         # Get total count for pagination info
         total_count = db.news_metadata.count_documents(query)
         
+        # The text index only matches whole words: when it finds nothing, fall back to
+        # titles starting with the query so partial input ("Gold") still finds "Goldman"
+        prefix_fallback = bool(search_query) and total_count == 0
+        if prefix_fallback:
+            total_count = db.news_metadata.count_documents(
+                news_search.prefix_filter(query), maxTimeMS=news_search.prefix_max_time_ms)
+        
         # Calculate total pages
         total_pages = (total_count + per_page - 1) // per_page
         
-        # Query the news_metadata collection with pagination
-        news_cursor = db.news_metadata.find(query).sort('published_at', -1).skip(skip).limit(per_page)
-        articles = list(news_cursor)
+        # Search results are ranked by relevance unless ?sort=date is requested
+        if prefix_fallback:
+            articles = list(news_search.prefix_matches(query, skip, per_page, build_projection(fields)))
+        elif search_query and request.args.get('sort', 'relevance') == 'relevance':
+            articles = news_search.rank(query, skip, per_page, build_projection(fields))
+        else:
+            # Query the news_metadata collection with pagination, returning only the requested fields
+            news_cursor = db.news_metadata.find(query, build_projection(fields)).sort('published_at', -1).skip(skip).limit(per_page)
+            articles = list(news_cursor)
         
-        # Process each article
-        processed_articles = []
-        for article in articles:
-            # Convert ObjectId to string
-            article['_id'] = str(article['_id'])
-            
-            # Ensure we have all required fields
-            processed_article = {
-                # AI Analysis Fields
-                "ai_summary": article.get("ai_summary", ""),
-                "ai_summary_timestamp": article.get("ai_summary_timestamp", ""),
-                "ai_summary_model": article.get("ai_summary_model", ""),
-                "ai_sentiment_analysis": article.get("ai_sentiment_analysis", ""),
-                "ai_sentiment_timestamp": article.get("ai_sentiment_timestamp", ""),
-                "ai_sentiment_model": article.get("ai_sentiment_model", ""),
-                # Enhanced Sentiment Fields
-                "sentiment_confidence": article.get("sentiment_confidence", 0),
-                "sentiment_analysis_date": article.get("sentiment_analysis_date", ""),
-                '_id': article['_id'],
-                'title': article.get('title', ''),
-                'summary': article.get('summary', ''),
-                'url': article.get('url', ''),
-                'source': article.get('source', ''),
-                'category': article.get('category', ''),
-                'published_at': article.get('published_at', ''),
-                'api_source': article.get('api_source', ''),
-                'sentiment_score': article.get('sentiment_score', 0),
-                'sentiment_label': article.get('sentiment_label', ''),
-                'relevance_score': article.get('relevance_score', 0),
-                'topic': article.get('topic', ''),
-                'fetched_at': article.get('fetched_at', ''),
-                'unique_id': article.get('unique_id', '')
-            }
-            processed_articles.append(processed_article)
+        # Shape each projected article
+        processed_articles = [shape_article(article, fields) for article in articles]
         
         # Get available sources and categories for filtering
         available_sources = list(db.news_metadata.distinct('api_source')) if db.news_metadata.count_documents({}) > 0 else []
@@ -506,140 +659,20 @@ def get_news():
             'collection': 'news_metadata'  # Debug info
         }), 500
 
-# Web Search API endpoint (fallback if blueprint fails)
-@app.route('/api/search/web', methods=['GET'])
-def web_search_fallback():
-    try:
-        import requests
-        
-        q = request.args.get('q', '').strip()
-        if not q:
-            return jsonify({"error": "missing query param q"}), 400
-            
-        # Use SearXNG for web search
-        searx_url = os.getenv("SEARX_BASE_URL", "http://localhost:8081")
-        
-        r = requests.get(f"{searx_url.rstrip('/')}/search",
-                         params={"q": q, "format": "json"}, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-        
-        # Format results for dashboard
-        formatted_results = []
-        if 'results' in data:
-            for result in data['results']:
-                formatted_results.append({
-                    'title': result.get('title', ''),
-                    'url': result.get('url', ''),
-                    'description': result.get('content', ''),
-                    'source': result.get('engines', []),
-                    'published_date': result.get('publishedDate', ''),
-                    'score': result.get('score', 0)
-                })
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'query': q,
-                'results': formatted_results,
-                'total_results': len(formatted_results),
-                'search_metadata': {
-                    'query_time': data.get('query_time', 0),
-                    'total_results_estimate': data.get('number_of_results', 0)
-                }
-            }
-        }), 200
-        
-    except Exception as e:
-        return jsonify({"error": str(e)}), 502
-
 # Real-time News API with multiple sources
 @app.route('/api/news/realtime', methods=['GET'])
 def get_realtime_news():
+    """Query all realtime sources in parallel and return what finished within the deadline"""
     try:
-        import requests
-        
         query = request.args.get('q', '')
         source = request.args.get('source', 'all')
         limit = int(request.args.get('limit', 20))
+        deadline = request.args.get('deadline', type=float)
+        if deadline is not None:
+            deadline = min(max(deadline, 0.5), realtime_news.deadline)
         
-        news_results = []
-        
-        # Financial News API (Alpha Vantage)
-        if source in ['all', 'financial']:
-            try:
-                alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
-                if alpha_vantage_key and query:
-                    url = f"https://www.alphavantage.co/query"
-                    params = {
-                        'function': 'NEWS_SENTIMENT',
-                        'tickers': query.upper() if query else 'FOREX',
-                        'apikey': alpha_vantage_key,
-                        'limit': limit
-                    }
-                    
-                    response = requests.get(url, params=params, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if 'feed' in data:
-                            for article in data['feed'][:limit//2]:
-                                news_results.append({
-                                    'title': article.get('title', ''),
-                                    'summary': article.get('summary', ''),
-                                    'source': article.get('source', 'Alpha Vantage'),
-                                    'publishedAt': article.get('time_published', ''),
-                                    'url': article.get('url', ''),
-                                    'score': article.get('overall_sentiment_score', 0),
-                                    'category': 'financial'
-                                })
-            except Exception as e:
-                print(f"Alpha Vantage API error: {e}")
-        
-        # Web Search News (SearXNG)
-        if source in ['all', 'web'] and query:
-            try:
-                searx_url = os.getenv("SEARX_BASE_URL", "http://localhost:8081")
-                r = requests.get(f"{searx_url.rstrip('/')}/search",
-                               params={"q": f"{query} news", "format": "json", "categories": "news"}, 
-                               timeout=15)
-                if r.status_code == 200:
-                    data = r.json()
-                    if 'results' in data:
-                        for result in data['results'][:limit//2]:
-                            news_results.append({
-                                'title': result.get('title', ''),
-                                'summary': result.get('content', ''),
-                                'source': result.get('engines', ['Web Search'])[0],
-                                'publishedAt': result.get('publishedDate', ''),
-                                'url': result.get('url', ''),
-                                'score': result.get('score', 0),
-                                'category': 'web'
-                            })
-            except Exception as e:
-                print(f"SearXNG API error: {e}")
-        
-        # Database News (if available)
-        if source in ['all', 'database']:
-            try:
-                db_query = {}
-                if query:
-                    db_query['$or'] = [
-                        {'title': {'$regex': query, '$options': 'i'}},
-                        {'content': {'$regex': query, '$options': 'i'}},
-                        {'summary': {'$regex': query, '$options': 'i'}}
-                    ]
-                
-                db_articles = list(db.news_metadata.find(db_query).sort('published_at', -1).limit(limit//3))
-                for article in db_articles:
-                    article['_id'] = str(article['_id'])
-                    article['category'] = article.get('category', 'database')
-                    news_results.append(article)
-            except Exception as e:
-                print(f"Database query error: {e}")
-        
-        # Sort by published date and limit results
-        news_results.sort(key=lambda x: x.get('publishedAt', ''), reverse=True)
-        news_results = news_results[:limit]
+        aggregated = realtime_news.aggregate(query, source=source, limit=limit, deadline=deadline)
+        news_results = aggregated['results']
         
         return jsonify({
             'success': True,
@@ -647,7 +680,9 @@ def get_realtime_news():
                 'query': query,
                 'results': news_results,
                 'total_results': len(news_results),
-                'sources': list(set([item.get('category', 'unknown') for item in news_results]))
+                'sources': list(set([item.get('category', 'unknown') for item in news_results])),
+                'source_status': aggregated['source_status'],
+                'elapsed_ms': aggregated['elapsed_ms']
             }
         }), 200
         
@@ -674,15 +709,51 @@ def fetch_all_news():
             'error': str(e)
         }), 500
 
+def latest_news_args(args):
+    """limit, category, source and fields for /api/news/latest; ValueError for malformed values"""
+    try:
+        limit = int(args.get('limit', 500))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    # Without ?fields= / ?view= only the heavy internal fields are dropped
+    fields = resolve_fields(args.get('fields'), args.get('view'), default_view=None)
+    return limit, args.get('category'), args.get('source'), fields
+
 @app.route('/api/news/latest', methods=['GET'])
 def get_latest_news():
     """Get latest news from database"""
+    # NDJSON is streamed and never cached, so it is served before the response cache
+    if request.args.get('format') == 'ndjson':
+        return stream_latest_news()
+    return get_latest_news_page()
+
+def stream_latest_news():
+    """?format=ndjson: the latest articles streamed straight from the cursor"""
+    try:
+        try:
+            limit, category, source, fields = latest_news_args(request.args)
+            batch_size = get_batch_size(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        cursor = news_fetcher.latest_news_cursor(limit, category, source, projection=build_projection(fields))
+        return ndjson_response(cursor.batch_size(batch_size), batch_size=batch_size)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@response_cache.cached('news')
+def get_latest_news_page():
+    """The JSON envelope of /api/news/latest"""
     try:
-        limit = int(request.args.get('limit', 500))
-        category = request.args.get('category')
-        source = request.args.get('source')
+        try:
+            limit, category, source, fields = latest_news_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        news_list = news_fetcher.get_latest_news(limit, category, source)
+        news_list = news_fetcher.get_latest_news(limit, category, source, projection=build_projection(fields))
         
         return jsonify({
             'success': True,
@@ -698,7 +769,42 @@ def get_latest_news():
             'error': str(e)
         }), 500
 
+@app.route('/api/news/export', methods=['GET'])
+def export_news():
+    """Stream every article matching the filters as NDJSON at constant memory"""
+    try:
+        try:
+            fields = resolve_fields(request.args.get('fields'), request.args.get('view'), default_view=None)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        query = build_news_filter(request.args)
+        since = request.args.get('since')
+        if since:
+            try:
+                query['created_at'] = {'$gte': datetime.fromisoformat(since)}
+            except ValueError:
+                return jsonify({'success': False, 'error': 'since must be an ISO 8601 date or datetime'}), 400
+        
+        try:
+            batch_size = get_batch_size(request.args, default=1000)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        # _id order is stable while ingest keeps inserting, so no article is sent twice
+        cursor = read_db.news_metadata.find(query, build_projection(fields)).sort('_id', 1).batch_size(batch_size)
+        
+        response = ndjson_response(cursor, batch_size=batch_size)
+        response.headers['Content-Disposition'] = 'attachment; filename="news_export.ndjson"'
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/news/categories', methods=['GET'])
+@response_cache.cached('news')
 def get_news_categories():
     """Get available news categories and counts"""
     try:
@@ -727,6 +833,7 @@ def get_news_categories():
         }), 500
 
 @app.route('/api/news/sources', methods=['GET'])
+@response_cache.cached('news')
 def get_news_sources():
     """Get available news sources and counts"""
     try:
@@ -803,6 +910,13 @@ def test_deduplication():
             'error': str(e)
         }), 500
 
+# Scrapy pipelines write to the 'aw' database (MONGO_DATABASE in ackers_weldon/settings.py)
+scraper_db = client['aw']
+read_scraper_db = scraper_db.with_options(read_preference=read_preference)
+
+# Autocomplete over companies plus the S&P 500 constituents scraped by the sp500 spider
+company_autocomplete = CompanyAutocomplete(read_db.companies, read_scraper_db.sp500)
+
 @app.route('/api/companies/search', methods=['GET'])
 def search_companies():
     try:
@@ -810,16 +924,41 @@ def search_companies():
         if not query:
             return jsonify({'success': False, 'error': 'Query parameter required'}), 400
             
-        companies = list(db.companies.find({
-            '$or': [
-                {'symbol': {'$regex': query, '$options': 'i'}},
-                {'name': {'$regex': query, '$options': 'i'}}
-            ]
-        }).limit(10))
-        
-        # Convert ObjectIds to strings
+        limit = min(int(request.args.get('limit', 10)), 50)
+        
+        # In-memory autocomplete: exact symbol, then symbol/name prefix, then typo-tolerant matches
+        try:
+            suggestions = company_autocomplete.search(query, limit)
+            return jsonify({
+                'success': True,
+                'data': suggestions,
+                'count': len(suggestions)
+            })
+        except Exception as e:
+            logger.warning(f"Company autocomplete unavailable, falling back to MongoDB: {e}")
+        
+        # Symbol prefix matches come first (anchored regex uses the symbol index), then
+        # name prefix matches ("Gold" -> "Goldman Sachs", which the word-based text index
+        # misses), then companies whose name matches the text index, ranked by relevance
+        companies = list(read_db.companies.find(
+            {'symbol': {'$regex': f'^{re.escape(query.upper())}'}}
+        ).sort('symbol', 1).limit(limit))
+        
+        if len(companies) < limit:
+            seen = [company['_id'] for company in companies]
+            companies.extend(read_db.companies.find(
+                {'name': {'$regex': f'^{re.escape(query)}', '$options': 'i'}, '_id': {'$nin': seen}}
+            ).sort('name', 1).limit(limit - len(companies)))
+        
+        if len(companies) < limit:
+            seen = [company['_id'] for company in companies]
+            companies.extend(read_db.companies.find(
+                {'$text': {'$search': query}, '_id': {'$nin': seen}},
+                {'_score': {'$meta': 'textScore'}}
+            ).sort([('_score', {'$meta': 'textScore'})]).limit(limit - len(companies)))
+        
         for company in companies:
-            company['_id'] = str(company['_id'])
+            company.pop('_score', None)
         
         return jsonify({
             'success': True,
@@ -832,16 +971,23 @@ def search_companies():
             'error': str(e)
         }), 500
 
+# Live quotes: one batched download per interval, served from each worker's in-memory snapshot
+quotes = QuoteSnapshotService(db, scraper_db.sp500)
+
 @app.route('/api/companies/<symbol>/quote', methods=['GET'])
+@response_cache.cached('companies', ttl=60)
 def get_company_quote(symbol):
     try:
         company = db.companies.find_one({'symbol': symbol.upper()})
         if not company:
             return jsonify({'success': False, 'error': 'Company not found'}), 404
-            
-        # Convert ObjectId to string
-        company['_id'] = str(company['_id'])
-        
+
+        try:
+            company['quote'] = quotes.get([symbol])['quotes'].get(symbol.upper())
+        except Exception as e:
+            logger.warning(f"Live quote for {symbol} unavailable: {e}")
+            company['quote'] = None
+
         return jsonify({
             'success': True,
             'data': company
@@ -852,27 +998,49 @@ def get_company_quote(symbol):
             'error': str(e)
         }), 500
 
+@app.route('/api/quotes', methods=['GET'])
+def get_quotes():
+    """
+    Latest quotes for a watchlist in one request
+    Example: /api/quotes?symbols=AAPL,MSFT,NVDA
+    """
+    try:
+        symbols = [s.strip() for s in request.args.get('symbols', '').split(',') if s.strip()]
+        if not symbols:
+            return jsonify({'success': False, 'error': 'symbols parameter is required'}), 400
+        if len(symbols) > 500:
+            return jsonify({'success': False, 'error': 'At most 500 symbols per request'}), 400
+
+        result = quotes.get(symbols)
+        return jsonify({
+            'success': True,
+            'data': result['quotes'],
+            'missing': result['missing'],
+            'as_of': result['as_of'],
+            'count': len(result['quotes'])
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/companies/<symbol>/financials', methods=['GET'])
 def get_company_financials(symbol):
     try:
         statements = request.args.get('statements', 'BS,IS,CF').split(',')
         freq = request.args.get('freq', 'annual')
         
-        company = db.companies.find_one({'symbol': symbol.upper()})
+        company = read_db.companies.find_one({'symbol': symbol.upper()})
         if not company:
             return jsonify({'success': False, 'error': 'Company not found'}), 404
             
-        financials = list(db.financials.find({
+        financials = list(read_db.financials.find({
             'company_id': company['_id'],
             'type': {'$in': statements},
             'frequency': freq
         }).sort('period', -1).limit(20))
         
-        # Convert ObjectIds to strings
-        for fin in financials:
-            fin['_id'] = str(fin['_id'])
-            fin['company_id'] = str(fin['company_id'])
-        
         return jsonify({
             'success': True,
             'data': financials,
@@ -884,6 +1052,56 @@ def get_company_financials(symbol):
             'error': str(e)
         }), 500
 
+# Fundamental screener: vectorized ratios over a memory-mapped snapshot of db.financials.
+# Engines (and NumPy) are loaded on the first screener request, not at import.
+SCREENER_FREQUENCIES = ('annual', 'quarterly')
+screeners = {}
+# One engine per frequency per worker, so concurrent first requests share its refresher
+screeners_lock = threading.Lock()
+
+def get_screener(freq):
+    if freq not in screeners:
+        with screeners_lock:
+            if freq not in screeners:
+                from services.screener import ScreenerEngine
+                screeners[freq] = ScreenerEngine(db, scraper_db.sp500, freq=freq,
+                                                 refresh_interval=float(os.getenv('SCREENER_REFRESH_INTERVAL', 300)))
+    return screeners[freq]
+
+@app.route('/api/screener', methods=['GET'])
+def screen_companies():
+    """
+    Filter and sort the S&P 500 universe by fundamental ratios
+    Example: /api/screener?filter=debt_to_equity<1,revenue_growth>10%&sort=-net_margin&limit=25
+    """
+    try:
+        freq = request.args.get('freq', 'annual')
+        if freq not in SCREENER_FREQUENCIES:
+            return jsonify({'success': False, 'error': f"Invalid freq. Must be one of: {', '.join(SCREENER_FREQUENCIES)}"}), 400
+        limit = min(int(request.args.get('limit', 50)), 500)
+
+        try:
+            result = get_screener(freq).screen(
+                filters=request.args.get('filter', ''),
+                sort=request.args.get('sort'),
+                limit=limit,
+                sector=request.args.get('sector')
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/screener/metrics', methods=['GET'])
+def screener_metrics():
+    from services.screener import METRICS
+    return jsonify({'success': True, 'metrics': METRICS})
+
 @app.route('/api/social', methods=['GET'])
 def get_social_posts():
     try:
@@ -896,10 +1114,6 @@ def get_social_posts():
             
         posts = list(db.social_posts.find(query).sort('posted_at', -1).limit(limit))
         
-        # Convert ObjectIds to strings
-        for post in posts:
-            post['_id'] = str(post['_id'])
-        
         return jsonify({
             'success': True,
             'data': posts,
@@ -911,18 +1125,36 @@ def get_social_posts():
             'error': str(e)
         }), 500
 
+# KYC screening against BrokerCheck and SEC IAPD, cached in kyc_records / kyc_searches
+kyc = KYCService(db)
+
 @app.route('/api/kyc', methods=['GET'])
 def get_kyc_results():
     try:
         query = request.args.get('query', '')
         if not query:
             return jsonify({'success': False, 'error': 'Query parameter required'}), 400
-            
-        results = list(db.kyc_results.find({'query': {'$regex': query, '$options': 'i'}}).limit(10))
-        
-        # Convert ObjectIds to strings
-        for result in results:
-            result['_id'] = str(result['_id'])
+
+        # Normalized-name match over screened records first, then the legacy results:
+        # anchored prefix matches on the query (which the word-based text index misses),
+        # topped up by the text search
+        results = kyc.lookup(query, kind=request.args.get('kind'))
+        if not results:
+            results = list(db.kyc_results.find(
+                {'query': {'$regex': f'^{re.escape(query)}', '$options': 'i'}}
+            ).limit(10))
+
+            if len(results) < 10:
+                seen = [result['_id'] for result in results]
+                results.extend(db.kyc_results.find(
+                    {'$text': {'$search': query}, '_id': {'$nin': seen}},
+                    {'_score': {'$meta': 'textScore'}}
+                ).sort([('_score', {'$meta': 'textScore'})]).limit(10 - len(results)))
+
+            # Legacy documents are projected onto the kyc_records shape
+            results = [legacy_result_view(result) for result in results]
+        else:
+            results = [record_view(record) for record in results]
         
         return jsonify({
             'success': True,
@@ -935,6 +1167,43 @@ def get_kyc_results():
             'error': str(e)
         }), 500
 
+@app.route('/api/kyc/screen', methods=['POST'])
+def screen_kyc():
+    """
+    Screen a list of names against BrokerCheck and SEC IAPD
+    Body: {"names": ["John Smith", ...], "kind": "individual" | "firm", "stream": false}
+    With stream=true, one NDJSON line per name is sent as soon as it resolves.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        names = data.get('names') or []
+        kind = data.get('kind', 'individual')
+        if not is_string_list(names):
+            return jsonify({'success': False, 'error': 'names must be a list of strings'}), 400
+        if not names:
+            return jsonify({'success': False, 'error': 'names is required'}), 400
+        if len(names) > KYC_MAX_BATCH_NAMES:
+            return jsonify({'success': False, 'error': f'At most {KYC_MAX_BATCH_NAMES} names per request'}), 400
+        if kind not in KYC_KINDS:
+            return jsonify({'success': False, 'error': f"kind must be one of: {', '.join(KYC_KINDS)}"}), 400
+
+        results = kyc.screen(names, kind)
+        if data.get('stream'):
+            return ndjson_response(results, batch_size=1)
+
+        results = list(results)
+        return jsonify({
+            'success': True,
+            'data': results,
+            'count': len(results),
+            'matched': sum(1 for result in results if result['matches'])
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # AI Chat endpoint
 @app.route('/api/ai/chat', methods=['POST'])
 def ai_chat():
@@ -1023,6 +1292,7 @@ def ai_summarize():
                     }
                 )
                 logger.info(f"Cached AI summary for article {article_id}")
+                response_cache.invalidate_later('news')
             except Exception as e:
                 logger.warning(f"Failed to cache AI summary for article {article_id}: {e}")
         
@@ -1093,6 +1363,7 @@ def ai_extract():
                     }
                 )
                 logger.info(f"Cached AI entities for article {article_id}")
+                response_cache.invalidate_later('news')
             except Exception as e:
                 logger.warning(f"Failed to cache AI entities for article {article_id}: {e}")
         
@@ -1165,6 +1436,7 @@ def ai_sentiment():
                     }
                 )
                 logger.info(f"Cached AI sentiment for article {article_id}")
+                response_cache.invalidate_later('news')
             except Exception as e:
                 logger.warning(f"Failed to cache AI sentiment for article {article_id}: {e}")
         
@@ -1181,6 +1453,47 @@ def ai_sentiment():
         logger.error(f"AI sentiment error: {e}")
         return jsonify({'success': False, 'message': str(e)})
 
+# Batch AI analysis endpoint
+@app.route('/api/ai/batch', methods=['POST'])
+def ai_batch_analyze():
+    """Run AI tasks for many articles: one cache lookup, concurrent generation, one bulk write"""
+    try:
+        data = request.get_json() or {}
+        article_ids = data.get('article_ids', [])
+        tasks = data.get('tasks', ['summarize'])
+        model = data.get('model', 'llama3.2:3b')
+        tone = data.get('tone', 'neutral')
+        stream = data.get('stream', False)
+        
+        if not isinstance(article_ids, list) or not article_ids:
+            return jsonify({'success': False, 'message': 'article_ids must be a non-empty list'}), 400
+        if len(article_ids) > MAX_BATCH_ARTICLES:
+            return jsonify({'success': False, 'message': f'At most {MAX_BATCH_ARTICLES} articles per batch'}), 400
+        if isinstance(tasks, str):
+            tasks = [tasks]
+        unknown = [task for task in tasks if task not in AI_TASKS]
+        if not tasks or unknown:
+            return jsonify({'success': False, 'message': f"tasks must be a subset of: {', '.join(AI_TASKS)}"}), 400
+        
+        results = ai_batch.run(article_ids, list(dict.fromkeys(tasks)), model, tone)
+        
+        # Stream one NDJSON line per result as it finishes
+        if stream:
+            return ndjson_response(results, batch_size=1)
+        
+        results = list(results)
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': len(results),
+            'cached': sum(1 for result in results if result.get('cached')),
+            'failed': sum(1 for result in results if not result.get('success'))
+        })
+        
+    except Exception as e:
+        logger.error(f"AI batch error: {e}")
+        return jsonify({'success': False, 'message': str(e)})
+
 # Get available AI models
 @app.route('/api/ai/models', methods=['GET'])
 def get_ai_models():
@@ -1218,6 +1531,161 @@ def ai_stream_chat():
         logger.error(f"AI stream chat error: {e}")
         return jsonify({'success': False, 'message': str(e)})
 
+def sse_event(event):
+    """Format a stream event as SSE; the id is the character offset used to resume"""
+    message = f"id: {event['id']}\n" if 'id' in event else ''
+    return f"{message}data: {json.dumps(event['data'])}\n\n"
+
+def stream_ai_task(task):
+    """Stream an AI task as server-sent events, resuming after Last-Event-ID on reconnect"""
+    data = request.get_json(silent=True) or request.args
+    text = data.get('text', '')
+    tone = data.get('tone', 'neutral')
+    model = data.get('model', 'llama3.2:3b')
+    article_id = data.get('article_id', '')  # Optional article ID for caching
+    
+    if not text:
+        return jsonify({'success': False, 'message': 'Text is required'})
+    
+    try:
+        offset = max(int(request.headers.get('Last-Event-ID') or data.get('last_event_id') or 0), 0)
+    except ValueError:
+        offset = 0
+    
+    events = None
+    on_complete = None
+    if article_id:
+        try:
+            article = db.news_metadata.find_one({'_id': ObjectId(article_id)}, article_projection([task]))
+            cached = cached_article_result(task, article, model, tone) if article else None
+            if cached is not None:
+                logger.info(f"Streaming cached AI {task} for article {article_id}")
+                events = ai_streams.replay(task, cached, offset)
+        except Exception as e:
+            logger.warning(f"Failed to check cache for article {article_id}: {e}")
+        
+        def on_complete(result):
+            db.news_metadata.update_one({'_id': ObjectId(article_id)},
+                                        {'$set': article_update(task, result, model)})
+            logger.info(f"Cached streamed AI {task} for article {article_id}")
+            response_cache.invalidate_later('news')
+    
+    if events is None:
+        events = ai_streams.stream(task, text, model, tone, offset, on_complete)
+    
+    def generate():
+        try:
+            for event in events:
+                yield sse_event(event)
+        except Exception as e:
+            yield sse_event({'data': {'error': str(e)}})
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/ai/summarize/stream', methods=['GET', 'POST'])
+def ai_summarize_stream():
+    """Stream a summary token by token (SSE); the result is cached when the stream completes"""
+    try:
+        return stream_ai_task('summarize')
+    except Exception as e:
+        logger.error(f"AI summarize stream error: {e}")
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/ai/extract/stream', methods=['GET', 'POST'])
+def ai_extract_stream():
+    """Stream entity extraction output (SSE); the parsed entities arrive in the final event"""
+    try:
+        return stream_ai_task('extract')
+    except Exception as e:
+        logger.error(f"AI extract stream error: {e}")
+        return jsonify({'success': False, 'message': str(e)})
+
+
+# In-process Scrapy runner (replaces the scrapyrt server on :9080). Job state and
+# items go to Mongo too, so any worker can answer for a job another one started.
+crawl_runner = CrawlRunnerService(db=db)
+CRAWL_TIMEOUT = float(os.getenv('CRAWL_TIMEOUT', 60))
+
+# Screen name -> user id lookups, cached so watchlists do not cost a crawl per handle
+twitter_users = TwitterUserResolver(db, crawl_runner, crawl_timeout=CRAWL_TIMEOUT)
+
+# Spiders /api/crawl/jobs may start, with the arguments each accepts. Scrapy copies
+# unknown spider kwargs onto the spider as attributes, so anything else is refused.
+CRAWL_JOB_ARGS = {
+    'twitter_tweets': {'payload', 'user_ids', 'max_pages', 'initial_pages'},
+    'twitter_user_info': {'payload'}
+}
+
+def crawl_offset(args):
+    """?offset= for the crawl job routes; ValueError if malformed"""
+    try:
+        return max(0, int(args.get('offset', 0)))
+    except ValueError:
+        raise ValueError('offset must be an integer')
+
+@app.route('/api/crawl/jobs', methods=['POST'])
+def submit_crawl_job():
+    """
+    Start a spider run without waiting for it
+    Body: {"spider": "twitter_tweets", "args": {"payload": {...}}}
+    Only the spiders and arguments in CRAWL_JOB_ARGS are accepted.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        spider = data.get('spider')
+        if not spider:
+            return jsonify({'success': False, 'error': 'spider is required'}), 400
+        if spider not in CRAWL_JOB_ARGS or spider not in crawl_runner.spiders():
+            return jsonify({'success': False, 'error': f"Unknown spider '{spider}'"}), 404
+        args = data.get('args') or {}
+        if not isinstance(args, dict):
+            return jsonify({'success': False, 'error': 'args must be an object'}), 400
+        unexpected = sorted(set(args) - CRAWL_JOB_ARGS[spider])
+        if unexpected:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported args for {spider}: {', '.join(unexpected)}"
+            }), 400
+
+        job = crawl_runner.submit(spider, **args)
+        return jsonify({'success': True, 'data': job.to_dict(offset=None)}), 202
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/crawl/jobs/<job_id>', methods=['GET'])
+def get_crawl_job(job_id):
+    """Job status plus items scraped so far (from ``offset``)"""
+    try:
+        offset = crawl_offset(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    job = crawl_runner.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'data': job.to_dict(offset=offset)})
+
+@app.route('/api/crawl/jobs/<job_id>/items', methods=['GET'])
+def stream_crawl_job(job_id):
+    """Stream a job's items as NDJSON while it runs"""
+    try:
+        offset = crawl_offset(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    job = crawl_runner.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return ndjson_response(job.follow(offset, timeout=CRAWL_TIMEOUT), batch_size=1)
+
+@app.route('/api/crawl/status', methods=['GET'])
+def crawl_status():
+    return jsonify({'success': True, 'data': crawl_runner.stats()})
+
 
 @app.route("/twitter/getUserId", methods=["GET"])
 def getUserId():
@@ -1236,18 +1704,39 @@ def getUserId():
     ```
     '''
     username = request.args.get("username")
-    crawl_args = json.dumps(
-        {
-            "payload": {
-                "screen_name": username,
-                "withSafetyModeUserFields": True,
-                "withHighlightedLabel": True
-            }
-        }
-    )
-    res = requests.get(
-        f'http://localhost:9080/crawl.json?start_requests=true&spider_name=twitter_user_info&crawl_args={crawl_args}')
-    return jsonify(res.json()["items"] or [])
+    if not username:
+        return jsonify({"error": "username parameter is required"}), 400
+
+    user = twitter_users.resolve(username)
+    if isinstance(user, dict) and 'error' in user:
+        return jsonify(user), 502
+    return jsonify([user] if user else [])
+
+
+@app.route("/twitter/resolveUsers", methods=["GET", "POST"])
+def resolveUsers():
+    '''
+    Resolve many screen names at once (cached; misses are crawled concurrently)
+    GET /twitter/resolveUsers?handles=business,Reuters or POST {"handles": [...]}
+
+    ### Example of success response:
+
+    ``` json
+    {
+        "business": {"_id": "34713362", "user_handle": "business", "user_name": "Bloomberg"},
+        "no_such_user_123": null
+    }
+    ```
+    '''
+    data = request.get_json(silent=True) or {}
+    if "handles" in data and not is_string_list(data["handles"]):
+        return jsonify({"error": "handles must be a list of strings"}), 400
+    handles = data.get("handles") or [h for h in request.args.get("handles", "").split(",") if h.strip()]
+    if not handles:
+        return jsonify({"error": "handles parameter is required"}), 400
+    if len(handles) > MAX_BATCH_HANDLES:
+        return jsonify({"error": f"At most {MAX_BATCH_HANDLES} handles per request"}), 400
+    return jsonify(twitter_users.resolve_many(handles))
 
 
 @app.route("/twitter/getTweets", methods=["GET"])
@@ -1279,50 +1768,115 @@ def getTweets():
     if not user_id:
         return jsonify({"error": "user_id parameter is required"}), 400
     
-    crawl_args = json.dumps(
-        {
-            "payload": {
-                "userId": user_id,
-                "count": 20,
-                "includePromotedContent": False,
-                "withQuickPromoteEligibilityTweetFields": True,
-                "withVoice": True,
-                "withV2Timeline": True
-            }
+    crawl_args = {
+        "payload": {
+            "userId": user_id,
+            "count": 20,
+            "includePromotedContent": False,
+            "withQuickPromoteEligibilityTweetFields": True,
+            "withVoice": True,
+            "withV2Timeline": True
         }
-    )
-    res = requests.get(
-        f'http://localhost:9080/crawl.json?start_requests=true&spider_name=twitter_tweets&crawl_args={crawl_args}')
-    return jsonify(res.json()["items"] or [])
+    }
+    try:
+        items = crawl_runner.run('twitter_tweets', timeout=CRAWL_TIMEOUT, **crawl_args)
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 504
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 502
+    return jsonify(items or [])
+
+@app.route("/twitter/refreshTimelines", methods=["POST"])
+def refreshTimelines():
+    '''
+    Fetch new tweets for a watchlist in one crawl job
+    Body: {"handles": ["business", "Reuters"]} or {"user_ids": ["34713362"]}; with neither,
+    every user in twitter_user_info is refreshed. Only tweets newer than the
+    ones already stored are requested, up to "max_pages" pages (default 5) per
+    user. Users with no stored tweets get "initial_pages" pages (default
+    TWITTER_INITIAL_PAGES, 1). Returns the crawl job (202); follow it at
+    /api/crawl/jobs/<job_id>/items from either worker pool.
+    '''
+    data = request.get_json(silent=True) or {}
+    for field in ("handles", "user_ids"):
+        if field in data and not is_string_list(data[field]):
+            return jsonify({"error": f"{field} must be a list of strings"}), 400
+    user_ids = list(data.get("user_ids") or [])
+    unresolved = []
+    if data.get("handles"):
+        if len(data["handles"]) > MAX_BATCH_HANDLES:
+            return jsonify({"error": f"At most {MAX_BATCH_HANDLES} handles per request"}), 400
+        for handle, user in twitter_users.resolve_many(data["handles"]).items():
+            if user and "_id" in user:
+                user_ids.append(user["_id"])
+            else:
+                unresolved.append(handle)
+    elif not user_ids:
+        user_ids = [doc["_id"] for doc in scraper_db.twitter_user_info.find({}, {"_id": 1})]
+    if not user_ids:
+        return jsonify({"error": "No users to refresh", "unresolved": unresolved}), 400
+
+    try:
+        job = crawl_runner.submit("twitter_tweets", user_ids=list(dict.fromkeys(user_ids)),
+                                  max_pages=int(data.get("max_pages", 5)),
+                                  initial_pages=data.get("initial_pages"))
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 502
+    return jsonify({"job": job.to_dict(offset=None), "user_count": len(user_ids), "unresolved": unresolved}), 202
+
+# Financial statements cached in Mongo and refreshed from Yahoo off the request path
+fundamentals = FundamentalsService(db)
+# How long a request waits on a first-time Yahoo download before answering 202
+FUNDAMENTALS_FETCH_TIMEOUT = float(os.getenv('FUNDAMENTALS_FETCH_TIMEOUT', 10))
 
 @app.route("/yfinance/getBalanceSheet", methods=["GET"])
 def getBalanceSheet():
-    ticker = request.args.get('ticker') or 'AAPL'
+    ticker = (request.args.get('ticker') or 'AAPL').upper()
     freq = request.args.get('freq') or 'quarterly'
+    if freq not in FREQUENCIES:
+        return jsonify({'success': False, 'error': f"freq must be one of: {', '.join(FREQUENCIES)}"}), 400
+
+    res = fundamentals.get(ticker, 'BS', freq, timeout=FUNDAMENTALS_FETCH_TIMEOUT)
+    if res.get('pending'):
+        # The download continues in the background and is stored; the client retries
+        response = jsonify({'success': False, 'pending': True, 'error': res['error']})
+        response.headers['Retry-After'] = '5'
+        return response, 202
+    if 'error' in res:
+        return jsonify({'success': False, 'error': res['error']}), 502
+
+    return jsonify(res)
+
+@app.route("/yfinance/fundamentals", methods=["GET"])
+def getFundamentals():
+    '''
+    ### Example request:
+    /yfinance/fundamentals?tickers=AAPL,MSFT&statements=BS,IS&freq=annual
 
-    stock = yf.Ticker(ticker)
-
-    res = stock.get_balance_sheet(proxy=None, as_dict=True, freq=freq)
-
-    res_str_keys ={str(key): value for key, value in res.items()}
+    Returns {ticker: {statement: {period: {line_item: value}}}}. Cached statements
+    are returned immediately; tickers never fetched before are downloaded
+    concurrently (capped by YFINANCE_MAX_CONCURRENCY).
+    '''
+    tickers = [t.strip().upper() for t in request.args.get('tickers', '').split(',') if t.strip()]
+    statements = [s.strip().upper() for s in request.args.get('statements', 'BS,IS,CF').split(',') if s.strip()]
+    freq = request.args.get('freq') or 'quarterly'
 
-    return jsonify(res_str_keys)
+    if not tickers:
+        return jsonify({'success': False, 'error': 'tickers parameter required'}), 400
+    if len(tickers) > 100:
+        return jsonify({'success': False, 'error': 'At most 100 tickers per request'}), 400
+    unknown = [s for s in statements if s not in STATEMENTS]
+    if unknown or freq not in FREQUENCIES:
+        return jsonify({
+            'success': False,
+            'error': f"statements must be among {', '.join(STATEMENTS)} and freq among {', '.join(FREQUENCIES)}"
+        }), 400
 
-if __name__ == '__main__':
-    port = int(os.getenv('PORT', 5001))
-    debug = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
-    flask_env = os.getenv('FLASK_ENV', 'development')
-    
-    print(f"Starting Dashboard API server on port {port}")
-    print(f"Environment: {flask_env}")
-    print(f"Debug mode: {debug}")
-    
-    # Force production mode if FLASK_ENV is production
-    if flask_env == 'production':
-        debug = False
-        print("Forcing production mode - debug disabled")
-    
-    app.run(host='0.0.0.0', port=port, debug=debug)
+    try:
+        data = fundamentals.get_many(list(dict.fromkeys(tickers)), list(dict.fromkeys(statements)), freq, timeout=60)
+        return jsonify({'success': True, 'data': data, 'count': len(data)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 
 # AI Results Update API
@@ -1410,6 +1964,7 @@ def update_news_ai_results():
             }), 400
         
         logger.info(f"Updated article {article_id} with {ai_type} AI results")
+        response_cache.invalidate_later('news')
         
         return jsonify({
             'success': True,
@@ -1553,6 +2108,7 @@ def store_ai_cache():
             }), 404
         
         logger.info(f"Stored AI {ai_type} cache for article {article_id}")
+        response_cache.invalidate_later('news')
         
         return jsonify({
             'success': True,
@@ -1775,6 +2331,15 @@ def clear_ai_cache():
         result = db.news_metadata.update_many(query, {'$set': clear_fields})
         
         logger.info(f"Cleared AI {ai_type} cache for {result.modified_count} articles")
+        response_cache.invalidate('news')
+        
+        # Also drop the content-addressed results (for these articles' text, or all of
+        # them) so a clear followed by a regenerate does not replay the same output
+        tasks = {'summary': ['summarize'], 'sentiment': ['sentiment']}.get(ai_type)
+        texts = None
+        if article_ids:
+            texts = [article_text(article) for article in db.news_metadata.find(query, {'title': 1, 'summary': 1})]
+        ai_result_cache.clear(tasks, texts)
         
         return jsonify({
             'success': True,
@@ -1789,3 +2354,42 @@ def clear_ai_cache():
             'error': str(e)
         }), 500
 
+# Index and collection setup, in one place so it can run as an explicit migration step
+def run_migrations():
+    """Create the indexes and collections the services rely on (idempotent); returns the failure count"""
+    failures = create_deduplication_indexes() + create_search_indexes()
+    for label, migrate in (
+        ('ai_result_cache TTL index', ai_result_cache.create_indexes),
+        ('ai_inflight TTL index', ai_single_flight.create_indexes),
+        ('quote_snapshots time-series collection', quotes.create_collections),
+        ('kyc_records indexes', kyc.create_indexes),
+        ('twitter_user_cache TTL index', twitter_users.create_indexes),
+        ('fundamentals_cache indexes', fundamentals.create_indexes),
+        ('crawl_jobs TTL indexes', crawl_runner.store.create_indexes)
+    ):
+        try:
+            migrate()
+            print(f"✓ {label} ready")
+        except Exception as e:
+            print(f"⚠️  {label} error: {e}")
+            failures += 1
+    return failures
+
+if not LAZY_STARTUP:
+    run_migrations()
+
+if __name__ == '__main__':
+    port = int(os.getenv('PORT', 5001))
+    debug = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
+    flask_env = os.getenv('FLASK_ENV', 'development')
+    
+    print(f"Starting Dashboard API server on port {port}")
+    print(f"Environment: {flask_env}")
+    print(f"Debug mode: {debug}")
+    
+    # Force production mode if FLASK_ENV is production
+    if flask_env == 'production':
+        debug = False
+        print("Forcing production mode - debug disabled")
+    
+    app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Read Routing Check
+Run this script against a replica set (see compose.replset.yml) to confirm which member serves each endpoint's queries
+"""
+
+import sys
+import os
+import time
+import logging
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+# Read-only endpoints whose queries on these collections should land on a secondary
+SECONDARY_ROUTES = [
+    '/api/news/export',
+    '/api/companies/search?q=zzzz',
+    '/api/companies/AAPL/financials'
+]
+# Cached views and AI result lookups, whose queries must all stay on the primary
+PRIMARY_ROUTES = [
+    '/api/news?per_page=5',
+    '/api/news/latest?limit=5',
+    '/api/news/categories',
+    '/api/news/sources',
+    '/api/companies/AAPL/quote',
+    '/api/ai/cache?articleId=000000000000000000000000&type=summary',
+    '/api/news/000000000000000000000000/ai-results'
+]
+READ_COLLECTIONS = {'news_metadata', 'companies', 'financials'}
+READ_COMMANDS = {'find', 'aggregate', 'count', 'distinct'}
+
+# Reads that must always see the latest writes, whichever route issues them
+PRIMARY_COLLECTIONS = {'response_cache_versions', 'ai_result_cache', 'ai_inflight'}
+
+def main():
+    try:
+        from pymongo import monitoring
+
+        commands = []
+        current = {'route': None}
+
+        class RouteCommandRecorder(monitoring.CommandListener):
+            def started(self, event):
+                collection = event.command.get(event.command_name)
+                if isinstance(collection, str) and current['route']:
+                    commands.append((current['route'], event.command_name, collection, event.connection_id[:2]))
+
+            def succeeded(self, event):
+                pass
+
+            def failed(self, event):
+                pass
+
+        # Registered before api_dashboard creates its client so the listener attaches to it
+        monitoring.register(RouteCommandRecorder())
+        os.environ['LAZY_STARTUP'] = '1'
+        import api_dashboard
+
+        client = api_dashboard.client
+        client.admin.command('ping')
+        deadline = time.monotonic() + 30
+        while not client.secondaries and time.monotonic() < deadline:
+            time.sleep(0.5)
+        primary, secondaries = client.primary, client.secondaries
+        logger.info(f"Read preference: {api_dashboard.describe_read_preference(api_dashboard.read_preference)}")
+        logger.info(f"Primary: {primary}, secondaries: {sorted(secondaries)}")
+        if not secondaries:
+            logger.error("No secondaries found; point MONGO_URI at a replica set (see compose.replset.yml)")
+            return 1
+
+        test_client = api_dashboard.app.test_client()
+        for route in SECONDARY_ROUTES + PRIMARY_ROUTES:
+            current['route'] = route
+            response = test_client.get(route)
+            response.get_data()
+            current['route'] = None
+            logger.info(f"GET {route} -> {response.status_code}")
+
+        failures = 0
+        for route, command, collection, address in commands:
+            role = 'primary' if address == primary else 'secondary' if address in secondaries else 'other'
+            expected = 'secondary' if route in SECONDARY_ROUTES else 'primary'
+            wrong = ((collection in READ_COLLECTIONS and command in READ_COMMANDS and role != expected)
+                     or (collection in PRIMARY_COLLECTIONS and role != 'primary'))
+            failures += wrong
+            logger.info(f"{'✗' if wrong else '✓'} {route}: {command} {collection} on {address[0]}:{address[1]} ({role})")
+
+        if failures:
+            logger.error(f"{failures} queries were served by the wrong member")
+            return 1
+        logger.info("Read routing check passed")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error during read routing check: {e}")
+        return 1
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
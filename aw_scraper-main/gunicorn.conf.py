@@ -36,3 +36,51 @@ tmp_upload_dir = None
 limit_request_line = 4094
 limit_request_fields = 100
 limit_request_field_size = 8190
+
+# Metrics: every worker of both pools writes prometheus_client mmap files to one
+# shared directory so /metrics reports the whole deployment. Must be set before
+# the app (and prometheus_client) is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.abspath("logs/prometheus_multiproc"))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Import the app without connecting to Mongo or creating indexes: the preloading
+# master must not open a client that forked workers would inherit, and indexes
+# are created once per deploy by migrate.py (see start_production.sh).
+os.environ.setdefault("LAZY_STARTUP", "1")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def on_starting(server):
+    """Drop metric files left behind by workers of a previous run
+
+    The directory is shared with the async pool, so only files whose worker
+    (the pid in counter_<pid>.db, gauge_all_<pid>.db, ...) is gone are removed.
+    """
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    for name in os.listdir(metrics_dir):
+        pid = name[:-len(".db")].rsplit("_", 1)[-1]
+        if name.endswith(".db") and pid.isdigit() and not _pid_alive(int(pid)):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def post_fork(server, worker):
+    """Start loading the quote snapshot so the first /api/quotes request does not wait for it"""
+    from api_dashboard import quotes
+    quotes.warm()
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
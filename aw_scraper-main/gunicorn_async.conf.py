@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Gunicorn configuration for the async (gevent) Dashboard API pool
+
+Serves the long-running upstream-bound routes (/api/ai/*, /api/crawl/*, /twitter/*) with
+cooperative workers so thousands of in-flight Ollama/crawl waits share a
+few processes instead of each pinning a sync worker. The sync pool in
+gunicorn.conf.py keeps serving every other route unchanged.
+"""
+
+import multiprocessing
+import os
+
+# Server socket
+bind = os.getenv("ASYNC_BIND", "127.0.0.1:5002")
+backlog = 2048
+
+# Worker processes
+workers = int(os.getenv("ASYNC_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gevent"
+worker_connections = int(os.getenv("ASYNC_WORKER_CONNECTIONS", 1000))
+max_requests = 1000
+max_requests_jitter = 50
+# gevent must monkey-patch sockets before pymongo/requests create any, so the
+# app is imported inside each worker rather than in the master
+preload_app = False
+
+# Ollama calls may take up to 120s; keep streams alive past that
+timeout = 180
+graceful_timeout = 30
+keepalive = 75
+
+# Logging
+accesslog = "logs/gunicorn_async_access.log"
+errorlog = "logs/gunicorn_async_error.log"
+loglevel = "info"
+access_log_format = "%(h)s %(l)s %(u)s %(t)s \"%(r)s\" %(s)s %(b)s \"%(f)s\" \"%(a)s\""
+
+# Process naming
+proc_name = "dashboard_api_async"
+
+# Server mechanics
+daemon = False
+pidfile = "logs/gunicorn_async.pid"
+user = None
+group = None
+tmp_upload_dir = None
+
+# Security
+limit_request_line = 4094
+limit_request_fields = 100
+limit_request_field_size = 8190
+
+# Metrics: shares the sync pool's prometheus_client directory (see gunicorn.conf.py)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.abspath("logs/prometheus_multiproc"))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Workers import the app without connecting or creating indexes (see gunicorn.conf.py)
+os.environ.setdefault("LAZY_STARTUP", "1")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def on_starting(server):
+    """Drop metric files of workers that are gone; live sync-pool workers keep theirs"""
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    for name in os.listdir(metrics_dir):
+        pid = name[:-len(".db")].rsplit("_", 1)[-1]
+        if name.endswith(".db") and pid.isdigit() and not _pid_alive(int(pid)):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Financials Ingestion Cron Script
+Run this script periodically to load S&P 500 statements into db.financials (pass --restart to ignore an unfinished run)
+"""
+
+import sys
+import os
+import logging
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('logs/financials_ingest.log'),
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+def main():
+    try:
+        logger.info("Starting S&P 500 financials ingest...")
+
+        from dotenv import load_dotenv
+        load_dotenv('/home/ubuntu/.env')
+        from pymongo import MongoClient
+        from services.financials_ingest import FinancialsIngestJob
+
+        client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))
+        job = FinancialsIngestJob(client['dashboard_db'], client['aw'].sp500)
+
+        totals = job.run(restart='--restart' in sys.argv)
+
+        logger.info(f"Ingested {totals['tickers']} tickers ({totals['failed']} failed): "
+                    f"{totals['upserted']} new and {totals['modified']} changed periods "
+                    f"in {totals['elapsed_seconds']}s")
+        return 0 if not totals['failed'] else 1
+
+    except Exception as e:
+        logger.error(f"Error during financials ingest: {e}")
+        return 1
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script
+Run this script on deploy (start_production.sh does) to create the indexes and collections the API relies on
+"""
+
+import sys
+import os
+import logging
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+def main():
+    try:
+        logger.info("Starting database migrations...")
+
+        # Import without the implicit startup migration, then run it once explicitly
+        os.environ['LAZY_STARTUP'] = '1'
+        import api_dashboard
+
+        api_dashboard.client.admin.command('ping')
+        failures = api_dashboard.run_migrations()
+        if failures:
+            logger.error(f"{failures} database migration steps failed")
+            return 1
+
+        logger.info("Database migrations completed successfully")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error during database migrations: {e}")
+        return 1
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Fundamentals Refresh Cron Script
+Run this script periodically so cached financial statements are refreshed before dashboard reads need them
+"""
+
+import sys
+import os
+import logging
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('logs/fundamentals_refresh.log'),
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+def main():
+    try:
+        logger.info("Starting fundamentals refresh...")
+
+        from dotenv import load_dotenv
+        load_dotenv('/home/ubuntu/.env')
+        from pymongo import MongoClient
+        from services.fundamentals import FundamentalsService
+
+        client = MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017/'))
+        service = FundamentalsService(client['dashboard_db'])
+
+        refreshed = service.refresh_stale(limit=int(os.getenv('FUNDAMENTALS_REFRESH_LIMIT', 500)))
+
+        logger.info(f"Refreshed {refreshed} stale statements")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error during fundamentals refresh: {e}")
+        return 1
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
@@ -0,0 +1,193 @@
+"""
+AI Batch Processor
+Runs AI analysis tasks for many news articles with one cache lookup and one bulk write
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Result field -> news_metadata field, as written by /api/ai/summarize, /extract and
+# /sentiment. The first entry marks the article as cached for that task.
+AI_TASKS: Dict[str, Dict[str, Any]] = {
+    'summarize': {
+        'fields': {'summary': 'ai_summary', 'tone': 'ai_summary_tone', 'model': 'ai_summary_model'},
+        'created_at': 'ai_summary_created_at'
+    },
+    'extract': {
+        'fields': {'entities': 'ai_entities', 'confidence': 'ai_entities_confidence', 'model': 'ai_entities_model'},
+        'created_at': 'ai_entities_created_at'
+    },
+    'sentiment': {
+        'fields': {'sentiment': 'ai_sentiment', 'confidence': 'ai_sentiment_confidence',
+                   'reasoning': 'ai_sentiment_reasoning', 'model': 'ai_sentiment_model'},
+        'created_at': 'ai_sentiment_created_at'
+    }
+}
+
+MAX_BATCH_ARTICLES = 100
+
+
+def article_update(task: str, result: Dict[str, Any], model: str) -> Dict[str, Any]:
+    """The news_metadata fields that store ``result`` as the article's cached ``task`` output"""
+    spec = AI_TASKS[task]
+    update = {field: result.get(key) for key, field in spec['fields'].items()}
+    update[spec['fields']['model']] = model
+    update[spec['created_at']] = datetime.now().isoformat()
+    return update
+
+
+def cached_article_result(task: str, article: Dict[str, Any], model: str,
+                          tone: str = 'neutral') -> Optional[Dict[str, Any]]:
+    """An article's cached ``task`` output, with the single-article endpoints' fallbacks; None if absent"""
+    spec = AI_TASKS[task]
+    fields = spec['fields']
+    if not article.get(next(iter(fields.values()))):
+        return None
+    defaults = {'tone': tone, 'model': model, 'confidence': 0.8, 'reasoning': 'Cached analysis'}
+    result = {key: article.get(field, defaults.get(key)) for key, field in fields.items()}
+    result['cached_at'] = article.get(spec['created_at'])
+    return result
+
+
+def article_projection(tasks: List[str]) -> Dict[str, int]:
+    projection = {'title': 1, 'summary': 1}
+    for task in tasks:
+        projection.update({field: 1 for field in AI_TASKS[task]['fields'].values()})
+        projection[AI_TASKS[task]['created_at']] = 1
+    return projection
+
+
+def article_text(article: Dict[str, Any]) -> str:
+    """The text the dashboard sends for an article: title and summary"""
+    title = article.get('title', '')
+    summary = article.get('summary', '')
+    return f"{title}. {summary}" if summary else title
+
+
+class AIBatchProcessor:
+    """Resolve cached results in one query, run misses concurrently, write back in one bulk_write.
+
+    Misses share one executor per process, so ``max_concurrency`` caps the
+    Ollama requests in flight across all concurrent batches of a worker.
+    """
+
+    def __init__(self, db, ai_service, max_concurrency: Optional[int] = None,
+                 on_write: Optional[Callable[[], None]] = None):
+        self.db = db
+        self.ai_service = ai_service
+        self.max_concurrency = max_concurrency or int(os.getenv('OLLAMA_MAX_CONCURRENCY', 4))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='ai-batch')
+        self.on_write = on_write
+
+    def _run_task(self, task: str, text: str, model: str, tone: str) -> Dict[str, Any]:
+        if task == 'summarize':
+            return self.ai_service.summarize(text, tone, model)
+        if task == 'extract':
+            return self.ai_service.extract_entities(text, model)
+        return self.ai_service.analyze_sentiment(text, model)
+
+    def run(self, article_ids: List[str], tasks: List[str], model: str,
+            tone: str = 'neutral') -> Generator[Dict[str, Any], None, None]:
+        """Yield one result per (article, task) as soon as it is available.
+
+        Cache hits and invalid IDs are yielded first, generated results in
+        completion order. New results are persisted once the batch is done;
+        if the client disconnects first, tasks still running are persisted
+        when they finish.
+        """
+        object_ids = {}
+        for article_id in dict.fromkeys(article_ids):
+            try:
+                object_ids[article_id] = ObjectId(article_id)
+            except (InvalidId, TypeError):
+                yield {'article_id': article_id, 'success': False, 'message': 'Invalid article id'}
+
+        articles = {
+            str(article['_id']): article
+            for article in self.db.news_metadata.find({'_id': {'$in': list(object_ids.values())}},
+                                                      article_projection(tasks))
+        }
+
+        futures = {}
+        operations = []
+        handled = set()
+        try:
+            for article_id in object_ids:
+                article = articles.get(article_id)
+                if article is None:
+                    yield {'article_id': article_id, 'success': False, 'message': 'Article not found'}
+                    continue
+                for task in tasks:
+                    cached = cached_article_result(task, article, model, tone)
+                    if cached is not None:
+                        yield dict(cached, article_id=article_id, task=task, success=True, cached=True)
+                        continue
+                    future = self.executor.submit(self._run_task, task, article_text(article), model, tone)
+                    futures[future] = (article_id, task)
+
+            for future in as_completed(futures):
+                handled.add(future)
+                article_id, task = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'error': str(e)}
+                if 'error' in result:
+                    yield {'article_id': article_id, 'task': task, 'success': False, 'message': result['error']}
+                    continue
+
+                operations.append(UpdateOne({'_id': object_ids[article_id]},
+                                            {'$set': article_update(task, result, model)}))
+                yield dict(result, article_id=article_id, task=task, success=True, cached=False)
+        finally:
+            # Persist whatever finished, even if the client went away mid-stream
+            if operations:
+                self._write(operations)
+            # Tasks still running after a disconnect are written once they finish
+            abandoned = {future: key for future, key in futures.items() if future not in handled}
+            if abandoned:
+                self._write_when_done(abandoned, object_ids, model)
+
+    def _write_when_done(self, futures: Dict[Any, Tuple[str, str]], object_ids: Dict[str, ObjectId], model: str):
+        """Persist the successful results of ``futures`` in one bulk write after the last one completes"""
+        lock = threading.Lock()
+        operations = []
+        remaining = len(futures)
+
+        def completed(future):
+            nonlocal remaining
+            article_id, task = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'error': str(e)}
+            with lock:
+                if 'error' not in result:
+                    operations.append(UpdateOne({'_id': object_ids[article_id]},
+                                                {'$set': article_update(task, result, model)}))
+                remaining -= 1
+                last = remaining == 0
+            if last and operations:
+                self._write(operations)
+
+        for future in futures:
+            future.add_done_callback(completed)
+
+    def _write(self, operations: List[UpdateOne]):
+        try:
+            result = self.db.news_metadata.bulk_write(operations, ordered=False)
+            logger.info(f"Cached {result.modified_count} AI results from batch")
+            if self.on_write:
+                self.on_write()
+        except Exception as e:
+            logger.warning(f"Failed to cache AI batch results: {e}")
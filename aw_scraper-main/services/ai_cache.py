@@ -0,0 +1,220 @@
+"""
+AI Result Cache
+Content-addressed cache of AI results with an in-process LRU tier and a MongoDB TTL tier
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# prometheus_client is optional: the in-process counters in stats() are always kept
+try:
+    from prometheus_client import Counter
+except ImportError:
+    Counter = None
+
+COLLECTION = 'ai_result_cache'
+TTL_INDEX_NAME = 'ai_result_cache_ttl'
+# One document whose counter every clear() bumps, so all workers drop their LRU tier
+GENERATION_COLLECTION = 'ai_result_cache_generation'
+GENERATION_ID = 'generation'
+
+if Counter is not None:
+    AI_CACHE_REQUESTS = Counter(
+        'ai_cache_requests_total', 'AI result cache lookups by task and outcome',
+        ['task', 'outcome'])
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies (syndicated stories) share a key"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip()
+
+
+def make_key(task: str, model: str, prompt_version: int, tone: Optional[str], text: str) -> str:
+    payload = json.dumps([task, model, prompt_version, tone, normalize_text(text)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Hash of the normalized input alone, shared by every task/model/tone key for that text"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class AIResultCache:
+    """Two-tier cache of AI results keyed by hash(task, model, prompt version, tone, text).
+
+    Lookups hit a byte-bounded LRU first, then the Mongo collection, whose
+    entries expire through a TTL index. Mongo hits are promoted into the LRU.
+    Cache failures are logged and treated as misses; they never fail a request.
+
+    clear() bumps a shared generation counter; every worker compares it at most
+    once per ``generation_check_seconds`` and empties its LRU when it moved, so
+    cleared results stop being served everywhere, not only by the clearing worker.
+    """
+
+    def __init__(self, db=None, max_bytes: Optional[int] = None, ttl_days: Optional[float] = None,
+                 generation_check_seconds: Optional[float] = None):
+        self.collection = db[COLLECTION] if db is not None else None
+        self.generations = db[GENERATION_COLLECTION] if db is not None else None
+        self.generation_check_seconds = generation_check_seconds if generation_check_seconds is not None \
+            else float(os.getenv('AI_CACHE_GENERATION_CHECK_SECONDS', 5))
+        self._generation = None
+        self._generation_checked = 0.0
+        self.max_bytes = max_bytes or int(os.getenv('AI_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+        # Single results larger than this are kept in Mongo only
+        self.max_entry_bytes = max(self.max_bytes // 16, 1)
+        self.ttl_seconds = int((ttl_days or float(os.getenv('AI_CACHE_TTL_DAYS', 30))) * 86400)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'mongo_hits': 0, 'misses': 0}
+
+    def create_indexes(self):
+        if self.collection is None:
+            return
+        self.collection.create_index(
+            [('created_at', 1)], expireAfterSeconds=self.ttl_seconds, name=TTL_INDEX_NAME
+        )
+        self.collection.create_index([('text_hash', 1)])
+
+    def _read_generation(self) -> int:
+        document = self.generations.find_one({'_id': GENERATION_ID})
+        return document['value'] if document is not None else 0
+
+    def _check_generation(self):
+        """Empty the LRU tier if another worker cleared the cache since the last check"""
+        if self.generations is None:
+            return
+        now = time.monotonic()
+        if now - self._generation_checked < self.generation_check_seconds:
+            return
+        self._generation_checked = now
+        try:
+            generation = self._read_generation()
+        except Exception as e:
+            logger.warning(f"AI cache generation check failed: {e}")
+            return
+        with self._lock:
+            if self._generation is not None and generation != self._generation:
+                self._entries.clear()
+                self._bytes = 0
+            self._generation = generation
+
+    def _count(self, task: str, outcome: str):
+        with self._lock:
+            self._stats[outcome] += 1
+        if Counter is not None:
+            AI_CACHE_REQUESTS.labels(task, outcome).inc()
+
+    def _remember(self, key: str, value: Dict[str, Any], size: int):
+        if size > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def get(self, key: str, task: str) -> Optional[Dict[str, Any]]:
+        self._check_generation()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            self._count(task, 'memory_hits')
+            return dict(entry[0])
+
+        if self.collection is not None:
+            try:
+                document = self.collection.find_one({'_id': key}, {'result': 1})
+            except Exception as e:
+                logger.warning(f"AI cache lookup failed: {e}")
+                document = None
+            if document is not None:
+                result = document['result']
+                self._remember(key, result, len(json.dumps(result, default=str)))
+                self._count(task, 'mongo_hits')
+                return dict(result)
+
+        self._count(task, 'misses')
+        return None
+
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look a key up in both tiers without touching LRU order or hit/miss stats"""
+        self._check_generation()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return dict(entry[0])
+        if self.collection is None:
+            return None
+        try:
+            document = self.collection.find_one({'_id': key}, {'result': 1})
+        except Exception as e:
+            logger.warning(f"AI cache lookup failed: {e}")
+            return None
+        return dict(document['result']) if document is not None else None
+
+    def set(self, key: str, task: str, model: str, result: Dict[str, Any], text: Optional[str] = None):
+        self._remember(key, dict(result), len(json.dumps(result, default=str)))
+        if self.collection is None:
+            return
+        try:
+            self.collection.replace_one({'_id': key}, {
+                '_id': key,
+                'task': task,
+                'model': model,
+                'text_hash': text_hash(text) if text is not None else None,
+                'result': result,
+                'created_at': datetime.now(timezone.utc)
+            }, upsert=True)
+        except Exception as e:
+            logger.warning(f"AI cache write failed: {e}")
+
+    def clear(self, tasks: Optional[List[str]] = None, texts: Optional[List[str]] = None) -> int:
+        """Drop cached results (all, or only the given tasks and/or input texts) from Mongo.
+
+        Results for ``texts`` are dropped for every model and tone. The LRU tier
+        is emptied here and, through the generation counter, in every other worker.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.collection is None:
+            return 0
+        query = {}
+        if tasks:
+            query['task'] = {'$in': tasks}
+        if texts is not None:
+            query['text_hash'] = {'$in': [text_hash(text) for text in texts]}
+        deleted = self.collection.delete_many(query).deleted_count
+        try:
+            self.generations.update_one({'_id': GENERATION_ID}, {'$inc': {'value': 1}}, upsert=True)
+        except Exception as e:
+            logger.warning(f"AI cache generation bump failed: {e}")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+        lookups = stats['memory_hits'] + stats['mongo_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['mongo_hits']) / lookups, 4) if lookups else 0.0
+        return stats
@@ -7,22 +7,64 @@ import os
 import requests
 import json
 import logging
-from typing import List, Dict, Any, Generator
+from typing import List, Dict, Any, Generator, Callable, Optional
+
+from services.ai_cache import make_key
 
 logger = logging.getLogger(__name__)
 
+# Part of every AI cache key: bump a task's version whenever its prompt changes
+PROMPT_VERSIONS = {
+    'summarize': 1,
+    'extract': 1,
+    'sentiment': 1
+}
+
 class AIProxyService:
-    def __init__(self, base_url=None):
+    def __init__(self, base_url=None, cache=None, single_flight=None):
         if base_url is None:
             base_url = os.getenv("OLLAMA_BASE_URL", "http://3.80.91.238:11434")
         self.base_url = base_url
         self.default_model = "llama3.2:3b"  # Default model, simplified to use 3B version
+        # Keep-alive connections to Ollama, shared by all requests (and greenlets under gevent)
+        self.session = requests.Session()
+        # Optional content-addressed AIResultCache consulted by summarize/extract/sentiment
+        self.cache = cache
+        # Optional SingleFlight so identical concurrent requests share one generation
+        self.single_flight = single_flight
+        
+    def _cached(self, task: str, text: str, model: str, tone: Optional[str],
+                generate: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a cached result for identical input, or generate and cache it"""
+        if self.cache is None and self.single_flight is None:
+            return generate()
         
+        key = self.cache_key(task, text, model, tone)
+        if self.cache is not None:
+            cached = self.cache.get(key, task)
+            if cached is not None:
+                return cached
+        
+        def generate_and_store():
+            result = generate()
+            if self.cache is not None and "error" not in result:
+                self.cache.set(key, task, model, result, text)
+            return result
+        
+        if self.single_flight is None:
+            return generate_and_store()
+        # Followers in other workers pick the leader's result up from the shared cache
+        lookup = (lambda: self.cache.peek(key)) if self.cache is not None else None
+        return self.single_flight.run(key, generate_and_store, lookup)
+        
+    def cache_key(self, task: str, text: str, model: str, tone: Optional[str] = None) -> str:
+        return make_key(task, model, PROMPT_VERSIONS[task], tone, text)
+    
     def _make_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Make a request to the Ollama API"""
         try:
             url = f"{self.base_url}{endpoint}"
-            response = requests.post(url, json=data, timeout=120)  # Increased timeout to 120 seconds
+            response = self.session.post(url, json=data, timeout=120)  # Increased timeout to 120 seconds
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -49,7 +91,7 @@ class AIProxyService:
         """Handle streaming chat responses"""
         try:
             url = f"{self.base_url}/api/chat"
-            response = requests.post(url, json=data, stream=True, timeout=120)  # Increased timeout to 120 seconds
+            response = self.session.post(url, json=data, stream=True, timeout=120)  # Increased timeout to 120 seconds
             response.raise_for_status()
             
             for line in response.iter_lines():
@@ -67,85 +109,105 @@ class AIProxyService:
         """Summarize text with specified tone"""
         if not model:
             model = self.default_model
-            
-        prompt = f"""Please provide a {tone} summary of the following text. 
-        Focus on the key points and main ideas. Keep it concise but informative.
-        
-        Text: {text}
-        
-        Summary:"""
-        
-        messages = [{"role": "user", "content": prompt}]
-        
+        return self._cached('summarize', text, model, tone, lambda: self._generate_summary(text, tone, model))
+    
+    def _generate_summary(self, text: str, tone: str, model: str) -> Dict[str, Any]:
         result = self._make_request("/api/chat", {
             "model": model,
-            "messages": messages,
+            "messages": self.task_messages('summarize', text, tone),
             "stream": False
         })
         
         if "error" not in result:
-            return {
-                "summary": result.get("message", {}).get("content", "Summary generation failed"),
-                "tone": tone,
-                "original_length": len(text),
-                "model": model
-            }
+            return self._summary_result(result.get("message", {}).get("content", "Summary generation failed"),
+                                        text, tone, model)
         else:
             return result
     
+    def _summary_prompt(self, text: str, tone: str) -> str:
+        return f"""Please provide a {tone} summary of the following text. 
+        Focus on the key points and main ideas. Keep it concise but informative.
+        
+        Text: {text}
+        
+        Summary:"""
+    
+    def _summary_result(self, content: str, text: str, tone: str, model: str) -> Dict[str, Any]:
+        return {
+            "summary": content,
+            "tone": tone,
+            "original_length": len(text),
+            "model": model
+        }
+    
     def extract_entities(self, text: str, model: str = None) -> Dict[str, Any]:
         """Extract named entities from text"""
         if not model:
             model = self.default_model
-            
-        prompt = f"""Please extract the key entities from the following text. 
-        Identify people, organizations, locations, dates, and key topics.
-        Return them as a JSON list with categories.
-        
-        Text: {text}
-        
-        Entities:"""
-        
-        messages = [{"role": "user", "content": prompt}]
-        
+        return self._cached('extract', text, model, None, lambda: self._generate_entities(text, model))
+    
+    def _generate_entities(self, text: str, model: str) -> Dict[str, Any]:
         result = self._make_request("/api/chat", {
             "model": model,
-            "messages": messages,
+            "messages": self.task_messages('extract', text),
             "stream": False
         })
         
         if "error" not in result:
-            try:
-                # Try to parse the response as JSON
-                content = result.get("message", {}).get("content", "")
-                # Extract JSON from the response if it's wrapped in text
-                if "{" in content and "}" in content:
-                    start = content.find("{")
-                    end = content.rfind("}") + 1
-                    json_str = content[start:end]
-                    entities = json.loads(json_str)
-                else:
-                    entities = {"entities": [content.strip()]}
-                
-                return {
-                    "entities": entities,
-                    "confidence": 0.9,
-                    "model": model
-                }
-            except json.JSONDecodeError:
-                return {
-                    "entities": {"entities": [result.get("message", {}).get("content", "Entity extraction failed")]},
-                    "confidence": 0.7,
-                    "model": model
-                }
+            return self._entities_result(result.get("message", {}).get("content", ""), model)
         else:
             return result
     
+    def _entities_prompt(self, text: str) -> str:
+        return f"""Please extract the key entities from the following text. 
+        Identify people, organizations, locations, dates, and key topics.
+        Return them as a JSON list with categories.
+        
+        Text: {text}
+        
+        Entities:"""
+    
+    def _entities_result(self, content: str, model: str) -> Dict[str, Any]:
+        try:
+            # Extract JSON from the response if it's wrapped in text
+            if "{" in content and "}" in content:
+                start = content.find("{")
+                end = content.rfind("}") + 1
+                json_str = content[start:end]
+                entities = json.loads(json_str)
+            else:
+                entities = {"entities": [content.strip()]}
+            
+            return {
+                "entities": entities,
+                "confidence": 0.9,
+                "model": model
+            }
+        except json.JSONDecodeError:
+            return {
+                "entities": {"entities": [content or "Entity extraction failed"]},
+                "confidence": 0.7,
+                "model": model
+            }
+    
+    def task_messages(self, task: str, text: str, tone: str = 'neutral') -> List[Dict[str, str]]:
+        """Chat messages for a streamable task ('summarize' or 'extract')"""
+        prompt = self._summary_prompt(text, tone) if task == 'summarize' else self._entities_prompt(text)
+        return [{"role": "user", "content": prompt}]
+    
+    def task_result(self, task: str, content: str, text: str, model: str, tone: str = 'neutral') -> Dict[str, Any]:
+        """Build the same result dict the non-streaming call returns from generated content"""
+        if task == 'summarize':
+            return self._summary_result(content, text, tone, model)
+        return self._entities_result(content, model)
+    
     def analyze_sentiment(self, text: str, model: str = None) -> Dict[str, Any]:
         """Analyze sentiment of text"""
         if not model:
             model = self.default_model
-            
+        return self._cached('sentiment', text, model, None, lambda: self._generate_sentiment(text, model))
+    
+    def _generate_sentiment(self, text: str, model: str) -> Dict[str, Any]:
         prompt = f"""Analyze the sentiment of this text and respond with ONLY a valid JSON object.
 
 Text: {text}
@@ -252,7 +314,7 @@ Respond with ONLY this JSON format, no other text:
     def get_available_models(self) -> List[str]:
         """Get list of available models from Ollama"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=10)
             if response.status_code == 200:
                 models = response.json().get("models", [])
                 return [model["name"] for model in models]
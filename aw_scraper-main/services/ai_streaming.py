@@ -0,0 +1,146 @@
+"""
+AI Streaming
+Server-sent event streams for long AI generations with cache write-back and resume
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Generator, Optional
+
+logger = logging.getLogger(__name__)
+
+STREAMABLE_TASKS = ('summarize', 'extract')
+
+# Longest wait for the next token before a reader gives up on a generation
+IDLE_TIMEOUT = 130
+
+
+class LiveGeneration:
+    """Text of one in-progress generation, readable from any offset by any number of clients"""
+
+    def __init__(self):
+        self.text = ''
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.done = False
+        self._condition = threading.Condition()
+
+    def append(self, content: str):
+        with self._condition:
+            self.text += content
+            self._condition.notify_all()
+
+    def finish(self, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._condition:
+            self.result = result
+            self.error = error
+            self.done = True
+            self._condition.notify_all()
+
+    def follow(self, offset: int = 0, timeout: float = IDLE_TIMEOUT) -> Generator[Dict[str, Any], None, None]:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self.text) > offset or self.done, timeout)
+                chunk = self.text[offset:]
+                done, result, error = self.done, self.result, self.error
+            if chunk:
+                offset += len(chunk)
+                yield {'id': offset, 'data': {'content': chunk}}
+                continue
+            if not done:
+                yield {'data': {'error': 'Timed out waiting for the AI model'}}
+                return
+            if error:
+                yield {'data': {'error': error}}
+            else:
+                yield {'id': offset, 'data': {'done': True, 'cached': False, 'result': result}}
+            return
+
+
+def result_text(task: str, result: Dict[str, Any]) -> str:
+    """The streamed text a finished result corresponds to (summaries only; entities are parsed JSON)"""
+    return result.get('summary', '') if task == 'summarize' else ''
+
+
+class AIStreamManager:
+    """Stream summarize/extract generations token by token.
+
+    Each generation runs in a background thread that keeps going when the
+    client disconnects, so the finished text still reaches the AI result cache.
+    Stream positions are character offsets sent as SSE ``id``s: a client that
+    reconnects with ``Last-Event-ID`` follows the live generation (same worker)
+    or gets the rest of the cached result, instead of starting over. Clients
+    asking for the same generation while it runs share it.
+    """
+
+    def __init__(self, ai_service, idle_timeout: float = IDLE_TIMEOUT):
+        self.ai_service = ai_service
+        self.idle_timeout = idle_timeout
+        self._live: Dict[str, LiveGeneration] = {}
+        self._lock = threading.Lock()
+
+    def replay(self, task: str, result: Dict[str, Any], offset: int = 0) -> Generator[Dict[str, Any], None, None]:
+        """Events for an already finished result, starting after ``offset``"""
+        text = result_text(task, result)
+        if len(text) > offset:
+            yield {'id': len(text), 'data': {'content': text[offset:]}}
+        yield {'id': max(len(text), offset), 'data': {'done': True, 'cached': True, 'result': result}}
+
+    def stream(self, task: str, text: str, model: str, tone: str = 'neutral', offset: int = 0,
+               on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> Generator[Dict[str, Any], None, None]:
+        if task not in STREAMABLE_TASKS:
+            raise ValueError(f"Task '{task}' cannot be streamed")
+
+        cache = self.ai_service.cache
+        cache_tone = tone if task == 'summarize' else None
+        key = self.ai_service.cache_key(task, text, model, cache_tone)
+
+        with self._lock:
+            live = self._live.get(key)
+
+        if live is None:
+            cached = cache.get(key, task) if cache is not None else None
+            if cached is not None:
+                yield from self.replay(task, cached, offset)
+                return
+            with self._lock:
+                live = self._live.get(key)
+                if live is None:
+                    live = self._live[key] = LiveGeneration()
+                    threading.Thread(
+                        target=self._generate, args=(key, live, task, text, model, tone, on_complete),
+                        name='ai-stream', daemon=True
+                    ).start()
+
+        yield from live.follow(offset, self.idle_timeout)
+
+    def _generate(self, key: str, live: LiveGeneration, task: str, text: str, model: str, tone: str,
+                  on_complete: Optional[Callable[[Dict[str, Any]], None]]):
+        try:
+            for chunk in self.ai_service._stream_chat({
+                "model": model,
+                "messages": self.ai_service.task_messages(task, text, tone),
+                "stream": True
+            }):
+                if 'error' in chunk:
+                    live.finish(error=chunk['error'])
+                    return
+                content = chunk.get('message', {}).get('content', '')
+                if content:
+                    live.append(content)
+
+            result = self.ai_service.task_result(task, live.text, text, model, tone)
+            if self.ai_service.cache is not None:
+                self.ai_service.cache.set(key, task, model, result, text)
+            if on_complete is not None:
+                try:
+                    on_complete(result)
+                except Exception as e:
+                    logger.warning(f"Failed to store streamed AI {task} result: {e}")
+            live.finish(result=result)
+        except Exception as e:
+            logger.error(f"AI {task} stream failed: {e}")
+            live.finish(error=str(e))
+        finally:
+            with self._lock:
+                self._live.pop(key, None)
@@ -0,0 +1,233 @@
+"""
+Company Autocomplete
+In-memory prefix trie and trigram index over the companies and sp500 collections
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Candidates kept per trie node; enough for any page of suggestions
+MAX_NODE_IDS = 50
+# Minimum share of the query's trigrams an entry must contain to be a fuzzy suggestion
+MIN_SIMILARITY = 0.5
+
+MATCH_EXACT = 'exact'
+MATCH_SYMBOL_PREFIX = 'symbol_prefix'
+MATCH_NAME_PREFIX = 'name_prefix'
+MATCH_FUZZY = 'fuzzy'
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text: str) -> str:
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PrefixTrie:
+    """Character trie whose nodes keep the ids of the best entries below them, in insert order"""
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {}
+
+    def insert(self, key: str, entry_id: int):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+            ids = node.setdefault('', [])
+            if len(ids) < MAX_NODE_IDS and entry_id not in ids:
+                ids.append(entry_id)
+
+    def find(self, prefix: str) -> List[int]:
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return node.get('', [])
+
+
+class _Index:
+    """Immutable snapshot of the autocomplete structures; swapped in whole on rebuild"""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        # Shorter, alphabetically earlier symbols first, so trie nodes hold the best candidates
+        self.entries = sorted(entries, key=lambda entry: (len(entry['symbol']), entry['symbol']))
+        self.by_symbol: Dict[str, int] = {}
+        self.symbols = PrefixTrie()
+        self.names = PrefixTrie()
+        self.grams: Dict[str, List[int]] = {}
+        self.gram_counts: List[int] = []
+
+        for entry_id, entry in enumerate(self.entries):
+            symbol = entry['symbol'].lower()
+            self.by_symbol[symbol] = entry_id
+            self.symbols.insert(symbol, entry_id)
+            compact = symbol.replace('.', '').replace('-', '')
+            if compact != symbol:
+                self.symbols.insert(compact, entry_id)
+
+            name = normalize(entry.get('name', ''))
+            if name:
+                self.names.insert(name, entry_id)
+                for word in name.split()[1:]:
+                    self.names.insert(word, entry_id)
+
+            entry_grams = trigrams(name) | trigrams(symbol)
+            self.gram_counts.append(len(entry_grams))
+            for gram in entry_grams:
+                self.grams.setdefault(gram, []).append(entry_id)
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, str]]:
+        symbol_query = query.strip().lower()
+        name_query = normalize(query)
+        results: List[Tuple[int, str]] = []
+        seen = set()
+
+        def add(entry_ids, match):
+            for entry_id in entry_ids:
+                if len(results) >= limit:
+                    return
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    results.append((entry_id, match))
+
+        exact = self.by_symbol.get(symbol_query)
+        if exact is not None:
+            add([exact], MATCH_EXACT)
+        add(self.symbols.find(symbol_query), MATCH_SYMBOL_PREFIX)
+        if name_query:
+            add(self.names.find(name_query), MATCH_NAME_PREFIX)
+
+        # Trigram fallback for typos, only when prefixes did not fill the page
+        if len(results) < limit and len(name_query) >= 3:
+            query_grams = trigrams(name_query)
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self.grams.get(gram, ()))
+            scored = []
+            for entry_id, count in shared.items():
+                if entry_id in seen:
+                    continue
+                # Containment decides (long names are not penalized), Jaccard breaks ties
+                containment = count / len(query_grams)
+                if containment >= MIN_SIMILARITY:
+                    jaccard = count / (len(query_grams) + self.gram_counts[entry_id] - count)
+                    scored.append((-containment, -jaccard, entry_id))
+            scored.sort()
+            add([entry_id for _, _, entry_id in scored], MATCH_FUZZY)
+
+        return results
+
+
+class CompanyAutocomplete:
+    """Sub-millisecond company suggestions ranked exact symbol > prefix > fuzzy.
+
+    The index is built lazily in each worker on first use (threads started in
+    a preloading gunicorn master would not survive the fork). Afterwards a
+    cheap fingerprint of both collections is checked every ``check_interval``
+    seconds, and the index is rebuilt in the background when it changes or
+    ``rebuild_interval`` has passed; lookups keep using the previous snapshot.
+    """
+
+    def __init__(self, companies, sp500=None, check_interval: float = 30, rebuild_interval: float = 3600):
+        self.companies = companies
+        self.sp500 = sp500
+        self.check_interval = check_interval
+        self.rebuild_interval = rebuild_interval
+        self._index: Optional[_Index] = None
+        self._fingerprint = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _load_entries(self) -> List[Dict[str, Any]]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        if self.sp500 is not None:
+            for doc in self.sp500.find({}, {'name': 1, 'sector': 1, 'industry': 1}):
+                if not doc.get('_id'):
+                    continue
+                symbol = str(doc['_id']).upper()
+                merged[symbol] = {
+                    'symbol': symbol, 'name': doc.get('name') or '', 'sector': doc.get('sector'),
+                    'industry': doc.get('industry'), 'sources': ['sp500']
+                }
+        for doc in self.companies.find({'symbol': {'$exists': True}}, {'symbol': 1, 'name': 1, 'sector': 1, 'industry': 1}):
+            symbol = str(doc['symbol']).upper()
+            entry = merged.setdefault(symbol, {'symbol': symbol, 'name': '', 'sector': None,
+                                               'industry': None, 'sources': []})
+            entry['name'] = doc.get('name') or entry['name']
+            entry['sector'] = doc.get('sector') or entry['sector']
+            entry['industry'] = doc.get('industry') or entry['industry']
+            entry['sources'].append('companies')
+        return list(merged.values())
+
+    def _fingerprint_now(self):
+        def collection_fingerprint(collection):
+            if collection is None:
+                return None
+            latest = collection.find_one({}, {'_id': 1}, sort=[('_id', -1)])
+            return collection.estimated_document_count(), latest['_id'] if latest else None
+        return collection_fingerprint(self.companies), collection_fingerprint(self.sp500)
+
+    def rebuild(self):
+        started = time.perf_counter()
+        fingerprint = self._fingerprint_now()
+        index = _Index(self._load_entries())
+        self._index, self._fingerprint = index, fingerprint
+        self._built_at = self._checked_at = time.monotonic()
+        logger.info(f"Built company autocomplete index: {len(index.entries)} companies "
+                    f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def _refresh_if_changed(self):
+        try:
+            if (time.monotonic() - self._built_at >= self.rebuild_interval
+                    or self._fingerprint_now() != self._fingerprint):
+                self.rebuild()
+            else:
+                self._checked_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Company autocomplete refresh failed: {e}")
+            self._checked_at = time.monotonic()
+        finally:
+            self._refreshing = False
+
+    def _ensure_fresh(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self.rebuild()
+            return
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_if_changed, name='autocomplete-refresh', daemon=True).start()
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        self._ensure_fresh()
+        index = self._index
+        return [
+            dict(index.entries[entry_id], match=match)
+            for entry_id, match in index.search(query, limit)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index
+        return {
+            'companies': len(index.entries) if index else 0,
+            'built_seconds_ago': round(time.monotonic() - self._built_at, 1) if index else None
+        }
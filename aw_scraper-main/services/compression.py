@@ -0,0 +1,97 @@
+"""
+Response Compression
+gzip/brotli content negotiation for Flask responses
+"""
+
+import gzip
+import logging
+from typing import Optional
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+# brotli is optional: without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'application/javascript'
+}
+
+# Bodies smaller than this are sent as-is; compression would not pay off
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+SUPPORTED_ENCODINGS = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Pick the best encoding the client accepts for the current request"""
+    encoding = request.accept_encodings.best_match(SUPPORTED_ENCODINGS)
+    return encoding if encoding in SUPPORTED_ENCODINGS else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Each encoding is a distinct representation, so it gets its own strong ETag"""
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+class Compression:
+    """Compress eligible responses in an after_request hook.
+
+    Responses that already carry a Content-Encoding (e.g. served precompressed
+    from the response cache) and streamed responses are left untouched.
+    """
+
+    def __init__(self, app=None, min_size: int = MIN_COMPRESS_SIZE):
+        self.min_size = min_size
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    def after_request(self, response):
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code >= 300
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        try:
+            response.set_data(compress(body, encoding))
+        except Exception as e:
+            logger.warning(f"Response compression failed ({encoding}): {e}")
+            return response
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak=weak)
+        return response
@@ -0,0 +1,379 @@
+"""
+Crawl Runner
+Long-lived in-process Scrapy runner with a job API, replacing the scrapyrt HTTP hop
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Generator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = 'pending'
+JOB_RUNNING = 'running'
+JOB_FINISHED = 'finished'
+JOB_FAILED = 'failed'
+
+# Waiters poll job state: it is written by the reactor thread, and under gevent
+# a native thread cannot wake greenlets through threading primitives
+POLL_INTERVAL = 0.05
+# Jobs run by another worker are polled from Mongo, less eagerly
+STORE_POLL_INTERVAL = 0.25
+
+JOBS_COLLECTION = 'crawl_jobs'
+ITEMS_COLLECTION = 'crawl_job_items'
+
+
+class CrawlJobStore:
+    """Job state and items in Mongo, so any worker (of either pool) can answer for any job.
+
+    The worker running a job writes its state on every transition and each
+    item as it is scraped; both expire through TTL indexes after ``ttl_hours``.
+    """
+
+    def __init__(self, db, ttl_hours: Optional[float] = None):
+        self.jobs = db[JOBS_COLLECTION]
+        self.items = db[ITEMS_COLLECTION]
+        self.ttl = timedelta(hours=ttl_hours or float(os.getenv('CRAWL_JOB_STORE_TTL_HOURS', 24)))
+
+    def create_indexes(self):
+        self.jobs.create_index([('expires_at', 1)], expireAfterSeconds=0, name='crawl_jobs_ttl')
+        self.items.create_index([('job_id', 1), ('seq', 1)], unique=True, name='crawl_job_items_seq')
+        self.items.create_index([('expires_at', 1)], expireAfterSeconds=0, name='crawl_job_items_ttl')
+
+    def save(self, job: 'CrawlJob'):
+        state = job.to_dict(offset=None)
+        state.pop('item_count')
+        state['_id'] = state.pop('job_id')
+        state['expires_at'] = datetime.now(timezone.utc) + self.ttl
+        self.jobs.replace_one({'_id': job.id}, state, upsert=True)
+
+    def append(self, job_id: str, seq: int, item: Dict[str, Any]):
+        self.items.insert_one({'job_id': job_id, 'seq': seq, 'item': item,
+                               'expires_at': datetime.now(timezone.utc) + self.ttl})
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.find_one({'_id': job_id})
+
+    def items_from(self, job_id: str, offset: int = 0) -> List[Dict[str, Any]]:
+        cursor = self.items.find({'job_id': job_id, 'seq': {'$gte': offset}}, {'item': 1}).sort('seq', 1)
+        return [doc['item'] for doc in cursor]
+
+    def count(self, job_id: str) -> int:
+        return self.items.count_documents({'job_id': job_id})
+
+
+class CrawlJob:
+    """One spider run; items are appended by the reactor thread as they are scraped"""
+
+    def __init__(self, spider: str, kwargs: Dict[str, Any], store: Optional[CrawlJobStore] = None):
+        self.id = uuid.uuid4().hex
+        self.store = store
+        self.spider = spider
+        self.kwargs = kwargs
+        self.status = JOB_PENDING
+        self.items: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+        self.stats: Dict[str, Any] = {}
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_FINISHED, JOB_FAILED)
+
+    # Reactor thread callbacks
+
+    def _persist(self, method: str, *args):
+        if self.store is None:
+            return
+        try:
+            getattr(self.store, method)(*args)
+        except Exception as e:
+            # The in-memory copy stays authoritative for this worker
+            logger.warning(f"Crawl job {self.id} store write failed: {e}")
+
+    def _item_scraped(self, item, response, spider):
+        item = dict(item)
+        self.items.append(item)
+        self._persist('append', self.id, len(self.items) - 1, item)
+
+    def _spider_error(self, failure, response, spider):
+        self.errors.append(failure.getErrorMessage())
+
+    def _started(self):
+        self.status = JOB_RUNNING
+        self.started_at = datetime.now(timezone.utc)
+        self._persist('save', self)
+
+    def _finished(self, _):
+        self.finished_at = datetime.now(timezone.utc)
+        self.status = JOB_FINISHED
+        self._persist('save', self)
+
+    def _failed(self, failure):
+        self.errors.append(failure.getErrorMessage())
+        self.finished_at = datetime.now(timezone.utc)
+        self.status = JOB_FAILED
+        self._persist('save', self)
+
+    # Readers
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    def follow(self, offset: int = 0, timeout: Optional[float] = None) -> Generator[Dict[str, Any], None, None]:
+        """Items from ``offset`` on, yielded as they are scraped until the job ends"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            done = self.done
+            items = self.items[offset:]
+            for item in items:
+                yield item
+            offset += len(items)
+            if done:
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(POLL_INTERVAL)
+
+    def to_dict(self, offset: Optional[int] = 0) -> Dict[str, Any]:
+        job = {
+            'job_id': self.id,
+            'spider': getattr(self.spider, 'name', self.spider),
+            'status': self.status,
+            'item_count': len(self.items),
+            'errors': self.errors,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if offset is not None:
+            job['items'] = self.items[offset:]
+        return job
+
+
+class StoredCrawlJob:
+    """Read-only view of a job run by another worker, polled from the job store"""
+
+    def __init__(self, store: CrawlJobStore, state: Dict[str, Any]):
+        self.store = store
+        self.state = state
+        self.id = state['_id']
+
+    @property
+    def status(self) -> str:
+        return self.state['status']
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_FINISHED, JOB_FAILED)
+
+    def _reload(self):
+        self.state = self.store.load(self.id) or self.state
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(STORE_POLL_INTERVAL)
+            self._reload()
+        return True
+
+    def follow(self, offset: int = 0, timeout: Optional[float] = None) -> Generator[Dict[str, Any], None, None]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            done = self.done
+            items = self.store.items_from(self.id, offset)
+            for item in items:
+                yield item
+            offset += len(items)
+            if done:
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(STORE_POLL_INTERVAL)
+            self._reload()
+
+    def to_dict(self, offset: Optional[int] = 0) -> Dict[str, Any]:
+        job = {key: value for key, value in self.state.items() if key not in ('_id', 'expires_at')}
+        job['job_id'] = self.id
+        job['item_count'] = self.store.count(self.id)
+        if offset is not None:
+            job['items'] = self.store.items_from(self.id, offset)
+        return job
+
+
+class CrawlRunnerService:
+    """Run project spiders on demand inside the API process.
+
+    A Twisted reactor (the project's asyncio reactor) runs in a daemon thread
+    for the life of the worker, with one ``CrawlerRunner`` that every job
+    shares, so a crawl costs neither an HTTP round trip to scrapyrt nor a
+    fresh Scrapy startup. ``max_concurrent_jobs`` spiders run at once; the
+    rest queue. The reactor is started lazily in each worker, since a thread
+    started in a preloading gunicorn master would not survive the fork.
+
+    With a ``db``, job state and items are also written to a shared
+    ``CrawlJobStore``, so a job submitted to one worker can be polled or
+    streamed from any other.
+    """
+
+    def __init__(self, max_concurrent_jobs: Optional[int] = None, job_ttl: float = 600, max_jobs: int = 500,
+                 db=None):
+        self.store = CrawlJobStore(db) if db is not None else None
+        self.max_concurrent_jobs = max_concurrent_jobs or int(os.getenv('CRAWL_MAX_CONCURRENT_JOBS', 8))
+        self.job_ttl = job_ttl
+        self.max_jobs = max_jobs
+        self._jobs: 'OrderedDict[str, CrawlJob]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._reactor = None
+        self._runner = None
+        self._semaphore = None
+        self._started_error: Optional[BaseException] = None
+
+    # Reactor
+
+    def _start_thread(self, target):
+        try:
+            from gevent import monkey
+            if monkey.is_module_patched('threading'):
+                # The reactor needs a real OS thread, not a greenlet
+                start_new_thread = monkey.get_original('_thread', 'start_new_thread')
+                start_new_thread(target, ())
+                return
+        except ImportError:
+            pass
+        threading.Thread(target=target, name='crawl-reactor', daemon=True).start()
+
+    def _ensure_reactor(self):
+        if self._pid == os.getpid() and self._reactor is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._reactor is not None:
+                return
+            ready = threading.Event()
+            self._started_error = None
+            self._start_thread(lambda: self._run_reactor(ready))
+            deadline = time.monotonic() + 30
+            while not ready.is_set() and time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+            if self._started_error is not None:
+                raise RuntimeError(f"Crawl reactor failed to start: {self._started_error}")
+            if not ready.is_set():
+                raise RuntimeError('Crawl reactor did not start in time')
+            self._pid = os.getpid()
+
+    def _run_reactor(self, ready: threading.Event):
+        try:
+            os.environ.setdefault('SCRAPY_SETTINGS_MODULE', 'ackers_weldon.settings')
+            from scrapy.utils.project import get_project_settings
+            from scrapy.utils.reactor import install_reactor
+
+            settings = get_project_settings()
+            if settings.get('TWISTED_REACTOR'):
+                install_reactor(settings['TWISTED_REACTOR'], settings.get('ASYNCIO_EVENT_LOOP'))
+            from twisted.internet import reactor, defer
+            from scrapy.crawler import CrawlerRunner
+
+            self._runner = CrawlerRunner(settings)
+            self._semaphore = defer.DeferredSemaphore(self.max_concurrent_jobs)
+            self._reactor = reactor
+        except BaseException as e:
+            self._started_error = e
+            logger.error(f"Crawl reactor failed to start: {e}")
+            return
+        reactor.callWhenRunning(ready.set)
+        logger.info(f"Crawl reactor started (max {self.max_concurrent_jobs} concurrent jobs)")
+        reactor.run(installSignalHandlers=False)
+
+    def _crawl(self, job: CrawlJob):
+        from scrapy import signals
+
+        crawler = self._runner.create_crawler(job.spider)
+        crawler.signals.connect(job._item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(job._spider_error, signal=signals.spider_error)
+        job._started()
+        deferred = self._runner.crawl(crawler, **job.kwargs)
+
+        def record_stats(result):
+            job.stats = crawler.stats.get_stats() if crawler.stats else {}
+            return result
+
+        deferred.addBoth(record_stats)
+        deferred.addCallbacks(job._finished, job._failed)
+        return deferred
+
+    def _schedule(self, job: CrawlJob):
+        deferred = self._semaphore.run(self._crawl, job)
+        # _crawl raising (e.g. unknown spider) fails the job instead of going unhandled
+        deferred.addErrback(lambda failure: None if job.done else job._failed(failure))
+
+    # Jobs
+
+    def spiders(self) -> List[str]:
+        self._ensure_reactor()
+        return sorted(self._runner.spider_loader.list())
+
+    def _prune(self):
+        """Drop finished jobs past their TTL, then the oldest finished ones beyond ``max_jobs``"""
+        now = datetime.now(timezone.utc)
+        for job_id, job in list(self._jobs.items()):
+            expired = job.done and (now - job.finished_at).total_seconds() > self.job_ttl
+            if expired or (job.done and len(self._jobs) > self.max_jobs):
+                del self._jobs[job_id]
+
+    def submit(self, spider: str, **kwargs) -> CrawlJob:
+        """Queue a spider run and return its job immediately"""
+        self._ensure_reactor()
+        job = CrawlJob(spider, kwargs, self.store)
+        if self.store is not None:
+            self.store.save(job)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._reactor.callFromThread(self._schedule, job)
+        return job
+
+    def get(self, job_id: str):
+        """This worker's job, else the stored view of a job run by another worker"""
+        job = self._jobs.get(job_id)
+        if job is not None or self.store is None:
+            return job
+        state = self.store.load(job_id)
+        return StoredCrawlJob(self.store, state) if state is not None else None
+
+    def run_job(self, spider: str, timeout: Optional[float] = None, **kwargs) -> CrawlJob:
+        """Run a spider and wait for it to finish; raises if it times out or fails"""
+        job = self.submit(spider, **kwargs)
+        if not job.wait(timeout):
+            raise TimeoutError(f"Crawl {spider} did not finish within {timeout}s")
+        if job.status == JOB_FAILED:
+            raise RuntimeError(f"Crawl {spider} failed: {'; '.join(job.errors)}")
+        return job
+
+    def run(self, spider: str, timeout: Optional[float] = None, **kwargs) -> List[Dict[str, Any]]:
+        """Run a spider and wait for its items (the synchronous crawl.json equivalent)"""
+        return self.run_job(spider, timeout, **kwargs).items
+
+    def stats(self) -> Dict[str, Any]:
+        jobs = list(self._jobs.values())
+        return {
+            'reactor_running': self._reactor is not None and self._pid == os.getpid(),
+            'max_concurrent_jobs': self.max_concurrent_jobs,
+            'jobs': {status: sum(1 for job in jobs if job.status == status)
+                     for status in (JOB_PENDING, JOB_RUNNING, JOB_FINISHED, JOB_FAILED)}
+        }
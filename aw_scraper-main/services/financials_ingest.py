@@ -0,0 +1,184 @@
+"""
+Financials Ingestion
+Bulk, resumable download of S&P 500 statements from Yahoo into db.financials
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from services.fundamentals import STATEMENTS, FREQUENCIES, download_statement
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS = 'ingest_checkpoints'
+JOB_NAME = 'sp500_financials'
+
+# db.financials frequency values
+INGEST_FREQUENCIES = ('annual', 'quarterly')
+
+
+def period_datetime(period: Any) -> datetime:
+    if hasattr(period, 'to_pydatetime'):
+        period = period.to_pydatetime()
+    if isinstance(period, str):
+        period = datetime.fromisoformat(period)
+    return period.replace(tzinfo=None)
+
+
+def clean_values(values: Dict[str, Any]) -> Dict[str, float]:
+    """Line items with numeric values only (NaN and empty items dropped)"""
+    cleaned = {}
+    for item, value in values.items():
+        if value is None or isinstance(value, bool):
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            continue
+        if not math.isnan(value):
+            cleaned[item] = value
+    return cleaned
+
+
+def content_hash(data: Dict[str, float]) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class FinancialsIngestJob:
+    """Pull BS/IS/CF for every ``sp500`` ticker, annual and quarterly, into db.financials.
+
+    Tickers are processed concurrently (bounded by ``max_concurrency``); each
+    statement download is retried with backoff. Only periods whose line items
+    changed are written, so re-runs touch few documents and the screener's
+    incremental refresh stays small. Completed tickers are recorded in a
+    checkpoint document; a run that finds an unfinished checkpoint resumes it
+    and skips tickers already done.
+    """
+
+    def __init__(self, db, universe, max_concurrency: Optional[int] = None):
+        self.db = db
+        self.financials = db.financials
+        self.checkpoints = db[CHECKPOINTS]
+        self.universe = universe
+        self.max_concurrency = max_concurrency or int(os.getenv('YFINANCE_MAX_CONCURRENCY', 4))
+
+    def create_indexes(self):
+        # db.financials is keyed by company_id (as the financials endpoint and the screener
+        # read it); symbol is informational. Replace the indexes earlier versions created.
+        indexes = self.financials.index_information()
+        if 'financials_symbol_period' in indexes:
+            self.financials.drop_index('financials_symbol_period')
+        if 'financials_company_period' in indexes and not indexes['financials_company_period'].get('unique'):
+            self.financials.drop_index('financials_company_period')
+        self.financials.create_index(
+            [('company_id', 1), ('type', 1), ('frequency', 1), ('period', -1)],
+            unique=True, name='financials_company_period'
+        )
+        self.financials.create_index([('frequency', 1), ('updated_at', 1)], name='financials_updated_at')
+
+    def tickers(self) -> List[Dict[str, Any]]:
+        return [
+            {'symbol': str(doc['_id']).upper(), 'name': doc.get('name'),
+             'sector': doc.get('sector'), 'industry': doc.get('industry')}
+            for doc in self.universe.find({}, {'name': 1, 'sector': 1, 'industry': 1}) if doc.get('_id')
+        ]
+
+    def _company_id(self, company: Dict[str, Any]):
+        """The db.companies _id the financials endpoint joins on, creating a minimal company if missing"""
+        result = self.db.companies.find_one_and_update(
+            {'symbol': company['symbol']},
+            {'$setOnInsert': {k: v for k, v in company.items() if v is not None}},
+            projection={'_id': 1}, upsert=True, return_document=True
+        )
+        return result['_id']
+
+    def ingest_ticker(self, company: Dict[str, Any]) -> Dict[str, int]:
+        """Download all statements for one ticker and upsert changed periods; returns write counts"""
+        symbol = company['symbol']
+        company_id = self._company_id(company)
+        existing = {
+            (doc['type'], doc['frequency'], doc['period']): doc.get('hash')
+            for doc in self.financials.find({'company_id': company_id},
+                                            {'type': 1, 'frequency': 1, 'period': 1, 'hash': 1})
+        }
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        for frequency in INGEST_FREQUENCIES:
+            for statement in STATEMENTS:
+                data = download_statement(symbol, statement, FREQUENCIES[frequency])
+                for period, values in (data or {}).items():
+                    values = clean_values(values)
+                    if not values:
+                        continue
+                    period = period_datetime(period)
+                    digest = content_hash(values)
+                    if existing.get((statement, frequency, period)) == digest:
+                        continue
+                    operations.append(UpdateOne(
+                        {'company_id': company_id, 'type': statement, 'frequency': frequency, 'period': period},
+                        {'$set': {'symbol': symbol, 'data': values, 'hash': digest, 'updated_at': now},
+                         '$setOnInsert': {'created_at': now}},
+                        upsert=True
+                    ))
+
+        if not operations:
+            return {'upserted': 0, 'modified': 0}
+        result = self.financials.bulk_write(operations, ordered=False)
+        return {'upserted': result.upserted_count, 'modified': result.modified_count}
+
+    def _checkpoint(self, restart: bool) -> Dict[str, Any]:
+        checkpoint = self.checkpoints.find_one({'_id': JOB_NAME})
+        if checkpoint and not checkpoint.get('finished_at') and not restart:
+            logger.info(f"Resuming financials ingest started {checkpoint['started_at']} "
+                        f"({len(checkpoint.get('done', []))} tickers done)")
+            return checkpoint
+        checkpoint = {'_id': JOB_NAME, 'started_at': datetime.now(timezone.utc), 'finished_at': None,
+                      'done': [], 'failed': []}
+        self.checkpoints.replace_one({'_id': JOB_NAME}, checkpoint, upsert=True)
+        return checkpoint
+
+    def run(self, restart: bool = False, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Ingest the whole universe (or resume an interrupted run)"""
+        started = time.monotonic()
+        self.create_indexes()
+        checkpoint = self._checkpoint(restart)
+        done = set(checkpoint.get('done', []))
+        pending = [company for company in self.tickers() if company['symbol'] not in done]
+        if limit:
+            pending = pending[:limit]
+
+        totals = {'tickers': 0, 'failed': 0, 'upserted': 0, 'modified': 0}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='financials-ingest') as executor:
+            futures = {executor.submit(self.ingest_ticker, company): company['symbol'] for company in pending}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    counts = future.result()
+                except Exception as e:
+                    logger.warning(f"Financials ingest for {symbol} failed: {e}")
+                    totals['failed'] += 1
+                    self.checkpoints.update_one({'_id': JOB_NAME}, {'$addToSet': {'failed': symbol}})
+                    continue
+                totals['tickers'] += 1
+                totals['upserted'] += counts['upserted']
+                totals['modified'] += counts['modified']
+                self.checkpoints.update_one(
+                    {'_id': JOB_NAME},
+                    {'$addToSet': {'done': symbol}, '$pull': {'failed': symbol}}
+                )
+
+        if not limit or len(pending) < limit:
+            # Failed tickers are retried by the next run rather than blocking this one from finishing
+            self.checkpoints.update_one({'_id': JOB_NAME}, {'$set': {'finished_at': datetime.now(timezone.utc)}})
+        totals['elapsed_seconds'] = round(time.monotonic() - started, 1)
+        return totals
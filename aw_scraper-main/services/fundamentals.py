@@ -0,0 +1,231 @@
+"""
+Fundamentals Service
+Cached, batched yfinance financial statements with reporting-period aware freshness
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'fundamentals_cache'
+
+# Statement codes as used by db.financials -> yfinance Ticker method
+STATEMENTS = {
+    'BS': 'get_balance_sheet',
+    'IS': 'get_income_stmt',
+    'CF': 'get_cash_flow'
+}
+
+# API frequency -> yfinance frequency
+FREQUENCIES = {
+    'quarterly': 'quarterly',
+    'annual': 'yearly',
+    'yearly': 'yearly'
+}
+
+# Days after a quarter end during which new 10-Q/10-K filings are expected
+FILING_WINDOW_DAYS = 60
+# Freshness inside a filing window, when statements may change any day
+FILING_SEASON_TTL = {'quarterly': timedelta(hours=12), 'yearly': timedelta(hours=24)}
+
+MAX_RETRIES = 3
+
+# Marks a statement whose first download is still running when the caller's deadline passed
+PENDING_ERROR = 'Timed out fetching from Yahoo Finance'
+
+
+def last_quarter_end(now: datetime) -> datetime:
+    quarter_month = ((now.month - 1) // 3) * 3  # 0, 3, 6, 9
+    if quarter_month == 0:
+        return datetime(now.year - 1, 12, 31, tzinfo=timezone.utc)
+    first_of_quarter = datetime(now.year, quarter_month + 1, 1, tzinfo=timezone.utc)
+    return first_of_quarter - timedelta(days=1)
+
+
+def fresh_until(freq: str, now: Optional[datetime] = None) -> datetime:
+    """When a statement fetched now may be out of date.
+
+    Inside the filing window after a quarter end new reports can land any day,
+    so entries are short-lived; outside it nothing changes until the next
+    quarter closes, so entries stay fresh until then.
+    """
+    now = now or datetime.now(timezone.utc)
+    quarter_end = last_quarter_end(now)
+    if now - quarter_end <= timedelta(days=FILING_WINDOW_DAYS):
+        return now + FILING_SEASON_TTL[freq]
+    return last_quarter_end(now + timedelta(days=92)) + timedelta(days=1)
+
+
+def yahoo_symbol(symbol: str) -> str:
+    """The Yahoo form of a stored ticker: share classes use '-' there (BRK.B -> BRK-B)"""
+    return symbol.replace('.', '-')
+
+
+def statement_to_dict(statement: Dict[Any, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """yfinance ``as_dict`` output with string period keys and NaN as None"""
+    return {
+        str(period): {
+            item: (None if isinstance(value, float) and math.isnan(value) else value)
+            for item, value in values.items()
+        }
+        for period, values in statement.items()
+    }
+
+
+def download_statement(ticker: str, statement: str, freq: str) -> Dict[Any, Dict[str, Any]]:
+    """One statement from Yahoo as ``{period: {line_item: value}}``, retried with backoff"""
+    import yfinance as yf  # pulls in pandas; only paid for by workers that fetch statements
+
+    method = STATEMENTS[statement]
+    for attempt in range(MAX_RETRIES):
+        try:
+            return getattr(yf.Ticker(yahoo_symbol(ticker)), method)(proxy=None, as_dict=True, freq=freq)
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"yfinance {statement} {ticker} failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+class FundamentalsService:
+    """Serve financial statements from Mongo, refreshing from Yahoo off the request path.
+
+    Entries are keyed by (ticker, statement, freq). Reads return cached data
+    immediately, fresh or not; stale entries are queued for a background
+    refresh. Only a ticker that was never fetched waits on Yahoo, and only up
+    to the caller's timeout: the download keeps running and is stored, and
+    concurrent requests for it share the one download. All Yahoo calls go
+    through one executor, which caps concurrency per worker.
+    """
+
+    def __init__(self, db, max_concurrency: Optional[int] = None):
+        self.collection = db[COLLECTION]
+        self.max_concurrency = max_concurrency or int(os.getenv('YFINANCE_MAX_CONCURRENCY', 4))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='fundamentals')
+        self._refreshing = set()
+        self._fetching = {}
+        self._lock = threading.Lock()
+
+    def create_indexes(self):
+        self.collection.create_index([('ticker', 1)], name='fundamentals_ticker')
+        self.collection.create_index([('fresh_until', 1)], name='fundamentals_fresh_until')
+
+    @staticmethod
+    def cache_id(ticker: str, statement: str, freq: str) -> str:
+        return f"{ticker}:{statement}:{freq}"
+
+    def fetch(self, ticker: str, statement: str, freq: str) -> Dict[str, Any]:
+        """Download one statement from Yahoo (with retries) and store it"""
+        data = download_statement(ticker, statement, freq)
+        now = datetime.now(timezone.utc)
+        document = {
+            '_id': self.cache_id(ticker, statement, freq),
+            'ticker': ticker,
+            'statement': statement,
+            'freq': freq,
+            'data': statement_to_dict(data),
+            'fetched_at': now,
+            'fresh_until': fresh_until(freq, now)
+        }
+        self.collection.replace_one({'_id': document['_id']}, document, upsert=True)
+        return document
+
+    def _refresh(self, key: tuple):
+        try:
+            self.fetch(*key)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _first_fetch(self, ticker: str, statement: str, freq: str):
+        """The in-flight download of a never-fetched statement, started if there is none"""
+        key = (ticker, statement, freq)
+        with self._lock:
+            future = self._fetching.get(key)
+            if future is None:
+                future = self._fetching[key] = self.executor.submit(self.fetch, ticker, statement, freq)
+                future.add_done_callback(lambda _: self._fetch_done(key))
+        return future
+
+    def _fetch_done(self, key: tuple):
+        with self._lock:
+            self._fetching.pop(key, None)
+
+    def schedule_refresh(self, ticker: str, statement: str, freq: str):
+        key = (ticker, statement, freq)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self.executor.submit(self._refresh, key)
+
+    def get_many(self, tickers: List[str], statements: List[str], freq: str,
+                 timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Statements for many tickers: one Mongo read, concurrent Yahoo fetches for missing ones.
+
+        Returns {ticker: {statement: data}}; failed fetches map to ``{'error': ...}``
+        and ones still running at ``timeout`` to ``{'error': PENDING_ERROR, 'pending': True}``.
+        """
+        freq = FREQUENCIES[freq]
+        ids = [self.cache_id(t, s, freq) for t in tickers for s in statements]
+        cached = {doc['_id']: doc for doc in self.collection.find({'_id': {'$in': ids}})}
+        now = datetime.now(timezone.utc)
+
+        results: Dict[str, Dict[str, Any]] = {ticker: {} for ticker in tickers}
+        futures = {}
+        for ticker in tickers:
+            for statement in statements:
+                document = cached.get(self.cache_id(ticker, statement, freq))
+                if document is None:
+                    futures[self._first_fetch(ticker, statement, freq)] = (ticker, statement)
+                    continue
+                results[ticker][statement] = document['data']
+                fresh = document['fresh_until']
+                if fresh.tzinfo is None:
+                    fresh = fresh.replace(tzinfo=timezone.utc)
+                if fresh <= now:
+                    self.schedule_refresh(ticker, statement, freq)
+
+        if futures:
+            done, pending = wait(futures, timeout=timeout)
+            for future in done:
+                ticker, statement = futures[future]
+                try:
+                    results[ticker][statement] = future.result()['data']
+                except Exception as e:
+                    results[ticker][statement] = {'error': str(e)}
+            for future in pending:
+                ticker, statement = futures[future]
+                results[ticker][statement] = {'error': PENDING_ERROR, 'pending': True}
+        return results
+
+    def get(self, ticker: str, statement: str, freq: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.get_many([ticker], [statement], freq, timeout=timeout)[ticker][statement]
+
+    def refresh_stale(self, limit: int = 500) -> int:
+        """Refresh entries past their freshness date (for the cron refresher); returns the count"""
+        stale = list(self.collection.find(
+            {'fresh_until': {'$lte': datetime.now(timezone.utc)}},
+            {'ticker': 1, 'statement': 1, 'freq': 1}
+        ).sort('fresh_until', 1).limit(limit))
+        futures = [self.executor.submit(self._refresh_logged, doc) for doc in stale]
+        wait(futures)
+        return sum(1 for future in futures if future.result())
+
+    def _refresh_logged(self, doc: Dict[str, Any]) -> bool:
+        try:
+            self.fetch(doc['ticker'], doc['statement'], doc['freq'])
+            return True
+        except Exception as e:
+            logger.warning(f"Refresh of {doc['_id']} failed: {e}")
+            return False
@@ -0,0 +1,292 @@
+"""
+KYC Screening Service
+Cached BrokerCheck / SEC IAPD lookups with a normalized-name index and batch screening
+"""
+
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+RECORDS = 'kyc_records'
+SEARCHES = 'kyc_searches'
+
+KINDS = ('individual', 'firm')
+MAX_BATCH_NAMES = 100
+MAX_HITS_PER_SOURCE = 12
+
+# Search endpoints queried for every name; detail records live under /search/<kind>/<source_id>
+SOURCES = {
+    'finra': 'https://api.brokercheck.finra.org/search',
+    'sec': 'https://api.adviserinfo.sec.gov/search'
+}
+
+# Record fields returned to clients, by screen() matches and the /api/kyc lookup alike
+RECORD_FIELDS = ('source', 'source_id', 'name', 'disclosure_flag', 'detail', 'fetched_at')
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+# Dropped so "Goldman Sachs & Co. LLC" and "goldman sachs" share a key
+_NAME_STOPWORDS = {'the', 'and', 'inc', 'incorporated', 'llc', 'llp', 'lp', 'ltd', 'co', 'corp',
+                   'corporation', 'company', 'plc', 'na'}
+
+
+def name_tokens(name: str) -> List[str]:
+    tokens = [token for token in _NON_WORD.sub(' ', (name or '').lower()).split() if token not in _NAME_STOPWORDS]
+    return sorted(set(tokens))
+
+
+def name_key(name: str) -> str:
+    """Order-insensitive key: "Doe, John A." and "John A Doe" match"""
+    return ' '.join(name_tokens(name))
+
+
+def hit_name(kind: str, source: Dict[str, Any]) -> str:
+    if kind == 'firm':
+        return source.get('firm_name', '')
+    parts = [source.get('ind_firstname'), source.get('ind_middlename'), source.get('ind_lastname')]
+    return ' '.join(part for part in parts if part)
+
+
+def record_view(record: Dict[str, Any]) -> Dict[str, Any]:
+    """A kyc_records document in the shape /api/kyc returns"""
+    view = {'id': record['_id'], 'kind': record.get('kind')}
+    view.update({key: record.get(key) for key in RECORD_FIELDS})
+    return view
+
+
+def legacy_result_view(result: Dict[str, Any]) -> Dict[str, Any]:
+    """A legacy kyc_results document in the same shape; its own fields are kept under ``detail``"""
+    detail = {key: value for key, value in result.items() if key not in ('_id', '_score')}
+    return {
+        'id': str(result['_id']),
+        'kind': result.get('kind'),
+        'source': 'kyc_results',
+        'source_id': None,
+        'name': result.get('name') or result.get('query'),
+        'disclosure_flag': result.get('disclosure_flag'),
+        'detail': detail,
+        'fetched_at': result.get('fetched_at') or result.get('created_at')
+    }
+
+
+def parse_detail_content(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The JSON document BrokerCheck/IAPD embed as a string in ``content``/``iacontent``"""
+    source = (payload.get('hits', {}).get('hits') or [{}])[0].get('_source', {})
+    content = source.get('content') or source.get('iacontent') or '{}'
+    try:
+        return json.loads(content)
+    except ValueError:
+        # Some records escape quotes inside the embedded document
+        return json.loads(content.replace('\\', ''))
+
+
+class KYCService:
+    """Screen names against FINRA BrokerCheck and SEC IAPD with cached results.
+
+    Search results are cached per (kind, normalized name) and detail records
+    per (kind, source_id); each expires after its own TTL and is refetched
+    when next requested. A batch queries both sources for every uncached name
+    in parallel, fetches each distinct ``source_id`` once even when several
+    names (or both sources) return it, and yields each name's matches as soon
+    as its details are in.
+    """
+
+    def __init__(self, db, max_concurrency: Optional[int] = None, search_ttl_hours: Optional[float] = None,
+                 detail_ttl_hours: Optional[float] = None, timeout: float = 15):
+        self.records = db[RECORDS]
+        self.searches = db[SEARCHES]
+        self.search_ttl = timedelta(hours=search_ttl_hours or float(os.getenv('KYC_SEARCH_TTL_HOURS', 24)))
+        self.detail_ttl = timedelta(hours=detail_ttl_hours or float(os.getenv('KYC_DETAIL_TTL_HOURS', 168)))
+        self.max_concurrency = max_concurrency or int(os.getenv('KYC_MAX_CONCURRENCY', 8))
+        self.timeout = timeout
+        # Separate pools so detail fetches never queue behind the searches that produced them
+        self.search_executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='kyc-search')
+        self.detail_executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='kyc-detail')
+        self.session = requests.Session()
+
+    def create_indexes(self):
+        self.records.create_index([('name_tokens', 1)], name='kyc_records_name_tokens')
+        self.records.create_index([('name_key', 1)], name='kyc_records_name_key')
+
+    # Upstream
+
+    def search_source(self, source: str, kind: str, name: str) -> List[Dict[str, Any]]:
+        response = self.session.get(f"{SOURCES[source]}/{kind}", params={
+            'query': name, 'hl': 'false', 'nrows': MAX_HITS_PER_SOURCE, 'start': 0,
+            'r': 25, 'sort': 'score desc', 'wt': 'json'
+        }, timeout=self.timeout)
+        response.raise_for_status()
+        hits = []
+        for hit in response.json().get('hits', {}).get('hits', []):
+            hit_source = hit.get('_source', {})
+            source_id = hit_source.get('ind_source_id' if kind == 'individual' else 'firm_source_id')
+            if source_id:
+                hits.append({'source': source, 'source_id': str(source_id), 'name': hit_name(kind, hit_source)})
+        return hits
+
+    def fetch_detail(self, source: str, kind: str, source_id: str) -> Dict[str, Any]:
+        response = self.session.get(f"{SOURCES[source]}/{kind}/{source_id}", timeout=self.timeout)
+        response.raise_for_status()
+        detail = parse_detail_content(response.json())
+        now = datetime.now(timezone.utc)
+        basic = detail.get('basicInformation', {})
+        name = basic.get('firmName') or ' '.join(
+            part for part in (basic.get('firstName'), basic.get('middleName'), basic.get('lastName')) if part)
+        record = {
+            '_id': f"{kind}:{source_id}",
+            'kind': kind,
+            'source': source,
+            'source_id': source_id,
+            'name': name,
+            'name_key': name_key(name),
+            'name_tokens': name_tokens(' '.join([name] + list(basic.get('otherNames') or []))),
+            'disclosure_flag': detail.get('disclosureFlag') or detail.get('iaDisclosureFlag') or 'N',
+            'detail': detail,
+            'fetched_at': now,
+            'expires_at': now + self.detail_ttl
+        }
+        self.records.replace_one({'_id': record['_id']}, record, upsert=True)
+        return record
+
+    # Cache
+
+    def _search_hits(self, kind: str, key: str) -> Optional[List[Dict[str, Any]]]:
+        cached = self.searches.find_one({'_id': f"{kind}:{key}"})
+        if cached and cached['expires_at'].replace(tzinfo=timezone.utc) > datetime.now(timezone.utc):
+            return cached['hits']
+        return None
+
+    def _store_search(self, kind: str, key: str, hits: List[Dict[str, Any]]):
+        now = datetime.now(timezone.utc)
+        self.searches.replace_one({'_id': f"{kind}:{key}"}, {
+            '_id': f"{kind}:{key}", 'hits': hits, 'fetched_at': now, 'expires_at': now + self.search_ttl
+        }, upsert=True)
+
+    @staticmethod
+    def merge_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One hit per source_id; BrokerCheck wins when both sources return the same CRD"""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for hit in sorted(hits, key=lambda hit: hit['source'] != 'finra'):
+            merged.setdefault(hit['source_id'], hit)
+        return list(merged.values())
+
+    # Screening
+
+    def screen(self, names: List[str], kind: str = 'individual') -> Generator[Dict[str, Any], None, None]:
+        """Yield ``{name, matches, errors}`` per name, in completion order"""
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of: {', '.join(KINDS)}")
+
+        states: Dict[str, Dict[str, Any]] = {}
+        futures: Dict[Any, Tuple] = {}
+        detail_futures: Dict[str, Any] = {}
+        records: Dict[str, Dict[str, Any]] = {}
+        now = datetime.now(timezone.utc)
+
+        def request_details(name: str):
+            state = states[name]
+            state['hits'] = self.merge_hits(state['hits'])
+            ids = [f"{kind}:{hit['source_id']}" for hit in state['hits']]
+            unknown = [record_id for record_id in ids if record_id not in records and record_id not in detail_futures]
+            if unknown:
+                for record in self.records.find({'_id': {'$in': unknown}}):
+                    if record['expires_at'].replace(tzinfo=timezone.utc) > now:
+                        records[record['_id']] = record
+            for hit in state['hits']:
+                record_id = f"{kind}:{hit['source_id']}"
+                if record_id in records:
+                    continue
+                if record_id not in detail_futures:
+                    future = self.detail_executor.submit(self.fetch_detail, hit['source'], kind, hit['source_id'])
+                    detail_futures[record_id] = future
+                    futures[future] = ('detail', record_id)
+                state['waiting'].add(record_id)
+
+        def finished(name: str) -> Dict[str, Any]:
+            state = states.pop(name)
+            matches = []
+            for hit in state['hits']:
+                record = records.get(f"{kind}:{hit['source_id']}")
+                if record is None:
+                    continue
+                matches.append({key: record[key] for key in RECORD_FIELDS})
+            return {'name': name, 'kind': kind, 'matches': matches, 'errors': state['errors']}
+
+        for name in dict.fromkeys(name.strip() for name in names if name and name.strip()):
+            key = name_key(name)
+            states[name] = {'key': key, 'hits': [], 'errors': [], 'searching': set(), 'waiting': set()}
+            cached = self._search_hits(kind, key)
+            if cached is not None:
+                states[name]['hits'] = cached
+                request_details(name)
+                continue
+            for source in SOURCES:
+                future = self.search_executor.submit(self.search_source, source, kind, name)
+                futures[future] = ('search', name, source)
+                states[name]['searching'].add(source)
+
+        for name in [name for name, state in states.items() if not state['searching'] and not state['waiting']]:
+            yield finished(name)
+
+        while futures:
+            done, _ = wait(list(futures), timeout=self.timeout * 2, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                task = futures.pop(future)
+                if task[0] == 'search':
+                    _, name, source = task
+                    state = states[name]
+                    state['searching'].discard(source)
+                    try:
+                        state['hits'].extend(future.result())
+                    except Exception as e:
+                        state['errors'].append(f"{source}: {e}")
+                    if not state['searching']:
+                        if not state['errors']:
+                            self._store_search(kind, state['key'], self.merge_hits(state['hits']))
+                        request_details(name)
+                else:
+                    record_id = task[1]
+                    try:
+                        records[record_id] = future.result()
+                    except Exception as e:
+                        records[record_id] = None
+                        logger.warning(f"KYC detail {record_id} failed: {e}")
+                    for state in states.values():
+                        if record_id in state['waiting'] and records[record_id] is None:
+                            state['errors'].append(f"detail {record_id} unavailable")
+                        state['waiting'].discard(record_id)
+
+            for name in [name for name, state in states.items() if not state['searching'] and not state['waiting']]:
+                yield finished(name)
+
+        # Anything left timed out upstream
+        for name in list(states):
+            states[name]['errors'].append('Timed out waiting for BrokerCheck/IAPD')
+            yield finished(name)
+
+    def lookup(self, query: str, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Cached records whose name (or other names) contain every token of ``query``.
+
+        The last token typed may be partial: "goldman sa" matches "Goldman Sachs".
+        """
+        words = [token for token in _NON_WORD.sub(' ', (query or '').lower()).split() if token not in _NAME_STOPWORDS]
+        if not words:
+            return []
+        # An anchored regex on the multikey name_tokens index is a bounded prefix scan
+        condition: Dict[str, Any] = {'$regex': f'^{re.escape(words[-1])}'}
+        complete = sorted(set(words[:-1]))
+        if complete:
+            condition['$all'] = complete
+        filters: Dict[str, Any] = {'name_tokens': condition}
+        if kind:
+            filters['kind'] = kind
+        return list(self.records.find(filters, {'name_tokens': 0}).limit(limit))
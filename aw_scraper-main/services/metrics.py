@@ -0,0 +1,147 @@
+"""
+Request Metrics
+Per-route latency/size histograms, per-request Mongo timing and Server-Timing headers
+"""
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from flask import g, request
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# prometheus_client is optional: without it only the Server-Timing header is emitted.
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set by the config before the app is
+# imported so every worker writes to shared mmap files that /metrics aggregates.
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+MONGO_OPS_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        'http_request_duration_seconds', 'Request latency by route',
+        ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+    RESPONSE_SIZE = Histogram(
+        'http_response_size_bytes', 'Response body size on the wire by route',
+        ['method', 'route'], buckets=SIZE_BUCKETS)
+    REQUEST_MONGO_TIME = Histogram(
+        'http_request_mongo_seconds', 'Time spent in MongoDB commands per request',
+        ['route'], buckets=MONGO_BUCKETS)
+    REQUEST_MONGO_OPS = Histogram(
+        'http_request_mongo_operations', 'MongoDB commands issued per request',
+        ['route'], buckets=MONGO_OPS_BUCKETS)
+    MONGO_COMMAND_LATENCY = Histogram(
+        'mongo_command_duration_seconds', 'MongoDB command latency by command',
+        ['command', 'outcome'], buckets=MONGO_BUCKETS)
+
+
+class MongoTimer:
+    """Mongo time and command count accumulated for the current request"""
+
+    __slots__ = ('seconds', 'operations')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.operations = 0
+
+
+# Context-local, so attribution is per thread under sync workers and per greenlet under gevent
+_current_timer: ContextVar[Optional[MongoTimer]] = ContextVar('mongo_timer', default=None)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener that attributes command time to the running request"""
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.seconds += seconds
+            timer.operations += 1
+        if prometheus_client is not None:
+            MONGO_COMMAND_LATENCY.labels(event.command_name, outcome).observe(seconds)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, 'success')
+
+    def failed(self, event):
+        self._record(event, 'failure')
+
+
+class RequestMetrics:
+    """Instrument every request of a Flask app.
+
+    Must be created before any MongoClient: the command listener is registered
+    globally and pymongo only attaches it to clients constructed afterwards.
+    """
+
+    def __init__(self, app=None):
+        self.multiprocess_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+        monitoring.register(MongoCommandTimer())
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    def before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.mongo_timer = MongoTimer()
+        _current_timer.set(g.mongo_timer)
+
+    def after_request(self, response):
+        started = g.pop('metrics_started', None)
+        timer = g.pop('mongo_timer', None)
+        _current_timer.set(None)
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+
+        timings = [f"app;dur={elapsed * 1000:.1f}"]
+        if timer is not None:
+            timings.append(f'mongo;dur={timer.seconds * 1000:.1f};desc="{timer.operations} ops"')
+        if 'X-Cache' in response.headers:
+            timings.append(f'cache;desc="{response.headers["X-Cache"]}"')
+        response.headers['Server-Timing'] = ', '.join(timings)
+
+        if prometheus_client is not None:
+            try:
+                REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(elapsed)
+                # Streamed bodies have no length up front and are not counted
+                size = None if response.is_streamed else response.calculate_content_length()
+                if size is not None:
+                    RESPONSE_SIZE.labels(request.method, route).observe(size)
+                if timer is not None:
+                    REQUEST_MONGO_TIME.labels(route).observe(timer.seconds)
+                    REQUEST_MONGO_OPS.labels(route).observe(timer.operations)
+            except Exception as e:
+                logger.warning(f"Failed to record request metrics: {e}")
+        return response
+
+    def render(self) -> Tuple[bytes, str]:
+        """Prometheus exposition of all workers' metrics; raises RuntimeError when unavailable"""
+        if prometheus_client is None:
+            raise RuntimeError('prometheus_client is not installed')
+        if self.multiprocess_dir:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry, path=self.multiprocess_dir)
+        else:
+            registry = prometheus_client.REGISTRY
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
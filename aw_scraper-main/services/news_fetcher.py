@@ -11,12 +11,13 @@ from pymongo import MongoClient
 # Environment variables loaded by main application
 import time
 import logging
-import feedparser
 from urllib.parse import urlparse
 import hashlib
 import re
 import urllib3
 from services.ai_proxy import AIProxyService
+from services.ai_cache import AIResultCache
+from services.response_cache import invalidate_namespace
 from typing import List, Dict, Any, Optional
 from returns.result import Result, Success, Failure, safe
 from returns.pipeline import flow
@@ -39,10 +40,15 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class NewsFetcherService:
-    def __init__(self):
+    def __init__(self, ai_service=None, db=None):
         self.mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-        self.client = MongoClient(self.mongo_uri)
-        self.db = self.client['dashboard_db']
+        # Callers that already hold a connection (the API) pass their database instead of opening another client
+        if db is not None:
+            self.client = db.client
+            self.db = db
+        else:
+            self.client = MongoClient(self.mongo_uri)
+            self.db = self.client['dashboard_db']
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY', '')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
         self.searx_url = os.getenv("SEARX_BASE_URL", "https://search.ackersweldon.com")
@@ -52,8 +58,8 @@ class NewsFetcherService:
         logger.info(f"Environment check - NewsAPI: {'✅' if self.newsapi_key else '❌'}")
         logger.info(f"Environment check - SearXNG: {self.searx_url}")
         
-        # Initialize AI service
-        self.ai_service = AIProxyService()
+        # Initialize AI service (shared with the API when passed in), backed by the AI result cache
+        self.ai_service = ai_service or AIProxyService(cache=AIResultCache(self.db))
         
         # Setup retry session with exponential backoff
         self.session = self._create_retry_session()
@@ -276,6 +282,9 @@ class NewsFetcherService:
     
     def fetch_rss_news(self):
         """Fetch news from RSS feeds"""
+        # Only the ingest path parses feeds; API workers never pay for this import
+        import feedparser
+
         all_news = []
         
         for feed_config in self.rss_feeds:
@@ -526,6 +535,8 @@ class NewsFetcherService:
                         logger.error(f"Fallback storage also failed for article {article.get('title', 'Unknown')}: {fallback_error}")
                         
             logger.info(f"Successfully stored {stored_count} out of {len(unique_articles)} unique articles")
+            if stored_count:
+                self._invalidate_news_cache()
             return stored_count
             
         except Exception as e:
@@ -554,9 +565,18 @@ class NewsFetcherService:
                 
             except Exception as e:
                 logger.error(f"Emergency storage failed for article {article.get('title', 'Unknown')}: {e}")
-                
+        
+        if stored_count:
+            self._invalidate_news_cache()
         return stored_count
     
+    def _invalidate_news_cache(self):
+        """Tell every API worker that cached news responses are out of date"""
+        try:
+            invalidate_namespace(self.db, 'news')
+        except Exception as e:
+            logger.warning(f"Failed to invalidate news response cache: {e}")
+    
     @safe
     def _process_article_with_ai(self, article: Dict[str, Any]) -> Dict[str, Any]:
         """Process article with AI service, with proper error handling"""
@@ -717,8 +737,8 @@ class NewsFetcherService:
         
         return stored_count
     
-    def get_latest_news(self, limit=50, category=None, source=None):
-        """Retrieve latest news from database"""
+    def latest_news_cursor(self, limit=50, category=None, source=None, projection=None):
+        """Cursor over the latest news, optionally projected to a subset of fields"""
         query = {}
         
         if category:
@@ -726,14 +746,25 @@ class NewsFetcherService:
         if source:
             query['api_source'] = source
             
-        cursor = self.db.news_metadata.find(query).sort('published_at', -1).limit(limit)
-        
-        news_list = []
-        for news in cursor:
-            news['_id'] = str(news['_id'])
-            news_list.append(news)
-            
-        return news_list
+        return self.db.news_metadata.find(query, projection).sort('published_at', -1).limit(limit)
+    
+    def get_latest_news(self, limit=50, category=None, source=None, projection=None):
+        """Retrieve latest news from database, optionally projected to a subset of fields"""
+        return list(self.latest_news_cursor(limit, category, source, projection))
+
+# Global instance, created on first use so importing this module opens no connections
+_news_fetcher = None
+
+
+def get_news_fetcher() -> NewsFetcherService:
+    global _news_fetcher
+    if _news_fetcher is None:
+        _news_fetcher = NewsFetcherService()
+    return _news_fetcher
+
 
-# Global instance
-news_fetcher = NewsFetcherService()
+def __getattr__(name):
+    # Keeps ``from services.news_fetcher import news_fetcher`` working
+    if name == 'news_fetcher':
+        return get_news_fetcher()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,96 @@
+"""
+News Projections
+Field profiles and Mongo projections for news_metadata article responses
+"""
+
+from typing import Any, Dict, List, Optional
+
+# Fields exposed by the article endpoints, with the default used when a
+# document does not carry the field.
+ARTICLE_FIELDS: Dict[str, Any] = {
+    # AI Analysis Fields
+    'ai_summary': '',
+    'ai_summary_timestamp': '',
+    'ai_summary_model': '',
+    'ai_sentiment_analysis': '',
+    'ai_sentiment_timestamp': '',
+    'ai_sentiment_model': '',
+    # Enhanced Sentiment Fields
+    'sentiment_confidence': 0,
+    'sentiment_analysis_date': '',
+    '_id': '',
+    'title': '',
+    'summary': '',
+    'url': '',
+    'source': '',
+    'category': '',
+    'published_at': '',
+    'api_source': '',
+    'sentiment_score': 0,
+    'sentiment_label': '',
+    'relevance_score': 0,
+    'topic': '',
+    'fetched_at': '',
+    'unique_id': ''
+}
+
+# Predefined compact profiles selectable with ?view=
+VIEW_PROFILES: Dict[str, List[str]] = {
+    'list': [
+        '_id', 'title', 'summary', 'url', 'source', 'category',
+        'published_at', 'api_source', 'sentiment_score', 'sentiment_label'
+    ],
+    'detail': list(ARTICLE_FIELDS),
+    'ai': [
+        '_id', 'title', 'ai_summary', 'ai_summary_timestamp', 'ai_summary_model',
+        'ai_sentiment_analysis', 'ai_sentiment_timestamp', 'ai_sentiment_model',
+        'sentiment_confidence', 'sentiment_analysis_date',
+        'sentiment_score', 'sentiment_label'
+    ]
+}
+
+DEFAULT_VIEW = 'detail'
+
+# Large internal fields that are never needed by list endpoints
+HEAVY_FIELDS = (
+    'plot_embedding',
+    'temp_summary',
+    'ai_summary_metadata',
+    'ai_sentiment_metadata',
+    'ai_sentiment_reasoning'
+)
+
+
+def resolve_fields(fields_param: Optional[str] = None, view: Optional[str] = None,
+                   default_view: Optional[str] = DEFAULT_VIEW) -> Optional[List[str]]:
+    """Resolve ?fields= / ?view= into an ordered list of article fields.
+
+    An explicit ``fields`` list wins over ``view``. Returns None when neither is
+    given and ``default_view`` is None. Raises ValueError on unknown names.
+    """
+    if fields_param:
+        requested = [f.strip() for f in fields_param.split(',') if f.strip()]
+        unknown = [f for f in requested if f not in ARTICLE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        fields = ['_id'] + [f for f in requested if f != '_id']
+        return list(dict.fromkeys(fields))
+
+    view = view or default_view
+    if view is None:
+        return None
+    if view not in VIEW_PROFILES:
+        raise ValueError(f"Unknown view '{view}'. Must be one of: {', '.join(VIEW_PROFILES)}")
+    return VIEW_PROFILES[view]
+
+
+def build_projection(fields: Optional[List[str]]) -> Dict[str, int]:
+    """Build a Mongo projection; without a field list only heavy fields are excluded"""
+    if fields is None:
+        return {field: 0 for field in HEAVY_FIELDS}
+    return {field: 1 for field in fields}
+
+
+def shape_article(article: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Return the requested fields of a projected article, filling in defaults"""
+    return {field: article.get(field, ARTICLE_FIELDS[field]) for field in fields}
@@ -0,0 +1,135 @@
+"""
+News Search Service
+Relevance-ranked full-text search over news_metadata backed by a MongoDB text index
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+MS_PER_DAY = 24 * 3600 * 1000
+
+
+class NewsSearchService:
+    """Text search with BM25-style term weighting from MongoDB plus a recency boost.
+
+    The text index is maintained by MongoDB on every insert/update, so newly
+    ingested articles are searchable immediately without a rebuild step.
+    """
+
+    TEXT_INDEX_NAME = 'news_text_search'
+
+    def __init__(self, db, recency_half_life_days: float = 3.0, recency_weight: float = 0.5,
+                 candidate_limit: int = 1000, prefix_max_time_ms: int = 1000):
+        self.db = db
+        self.recency_half_life_ms = recency_half_life_days * MS_PER_DAY
+        self.recency_weight = recency_weight
+        # Only the best text matches are re-ranked by recency
+        self.candidate_limit = candidate_limit
+        # The title-prefix fallback is not index-backed, so it runs under a time limit
+        self.prefix_max_time_ms = prefix_max_time_ms
+
+    def create_indexes(self):
+        """Create the weighted English text index (stemming and stop words included)"""
+        self.db.news_metadata.create_index(
+            [('title', 'text'), ('summary', 'text'), ('content', 'text')],
+            weights={'title': 10, 'summary': 5, 'content': 1},
+            default_language='english',
+            name=self.TEXT_INDEX_NAME
+        )
+
+    def build_query(self, q: str, sources: Optional[List[str]] = None,
+                    category: Optional[str] = None) -> Dict[str, Any]:
+        """Build the $text filter with optional source and category filters"""
+        query: Dict[str, Any] = {'$text': {'$search': q}}
+        if sources:
+            query['api_source'] = sources[0] if len(sources) == 1 else {'$in': sources}
+        if category:
+            query['category'] = category
+        return query
+
+    def prefix_filter(self, match: Dict[str, Any]) -> Dict[str, Any]:
+        """The same filter with its $text clause replaced by an anchored, case-insensitive title prefix.
+
+        The text index only matches whole (stemmed) words, so partial input such as
+        "Gold" never finds "Goldman"; this is the fallback for those queries.
+        """
+        prefix = dict(match)
+        q = prefix.pop('$text')['$search']
+        prefix['title'] = {'$regex': f'^{re.escape(q.strip())}', '$options': 'i'}
+        return prefix
+
+    def prefix_matches(self, match: Dict[str, Any], skip: int = 0, limit: int = 20,
+                       projection: Optional[Dict[str, int]] = None, max_time_ms: Optional[int] = None):
+        """Newest-first cursor over the title-prefix fallback for a $text filter"""
+        max_time_ms = min(max_time_ms, self.prefix_max_time_ms) if max_time_ms else self.prefix_max_time_ms
+        return (self.db.news_metadata.find(self.prefix_filter(match), projection)
+                .sort('published_at', -1).skip(skip).limit(limit).max_time_ms(max_time_ms))
+
+    def search(self, q: str, sources: Optional[List[str]] = None, category: Optional[str] = None,
+               skip: int = 0, limit: int = 20, projection: Optional[Dict[str, int]] = None,
+               max_time_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return matching articles ranked by text relevance boosted by recency.
+
+        A first page with room left is topped up with title-prefix matches.
+        ``max_time_ms`` bounds each of the two queries on the server.
+        """
+        match = self.build_query(q, sources, category)
+        articles = self.rank(match, skip, limit, projection, max_time_ms)
+        if skip == 0 and len(articles) < limit:
+            seen = {article.get('_id') for article in articles}
+            try:
+                for article in self.prefix_matches(match, 0, limit, projection, max_time_ms):
+                    if len(articles) >= limit:
+                        break
+                    if article.get('_id') not in seen:
+                        articles.append(article)
+            except Exception as e:
+                logger.warning(f"News title-prefix fallback failed: {e}")
+        return articles
+
+    def rank(self, match: Dict[str, Any], skip: int = 0, limit: int = 20,
+             projection: Optional[Dict[str, int]] = None,
+             max_time_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rank documents matching a filter that contains a $text clause"""
+        now = datetime.utcnow()
+        candidates = max(self.candidate_limit, skip + limit)
+
+        # Prefer the article's publication time, falling back to when we stored it
+        published = {
+            '$convert': {
+                'input': '$published_at', 'to': 'date',
+                'onError': {'$convert': {'input': '$created_at', 'to': 'date', 'onError': EPOCH, 'onNull': EPOCH}},
+                'onNull': {'$convert': {'input': '$created_at', 'to': 'date', 'onError': EPOCH, 'onNull': EPOCH}}
+            }
+        }
+        age_ms = {'$max': [0, {'$subtract': [now, published]}]}
+        # Hyperbolic decay: 1.0 for brand-new articles, 0.5 at the half-life
+        recency = {'$divide': [self.recency_half_life_ms, {'$add': [self.recency_half_life_ms, age_ms]}]}
+
+        pipeline = [
+            {'$match': match},
+            {'$sort': {'_text_score': {'$meta': 'textScore'}}},
+            {'$limit': candidates},
+            {'$addFields': {'_text_score': {'$meta': 'textScore'}}},
+            {'$addFields': {'_rank': {'$multiply': [
+                '$_text_score', {'$add': [1, {'$multiply': [self.recency_weight, recency]}]}
+            ]}}},
+            {'$sort': {'_rank': -1}},
+            {'$skip': skip},
+            {'$limit': limit}
+        ]
+
+        if projection and any(projection.values()):
+            pipeline.append({'$project': projection})
+        else:
+            excluded = dict(projection or {})
+            excluded.update({'_text_score': 0, '_rank': 0})
+            pipeline.append({'$project': excluded})
+
+        options = {'maxTimeMS': max_time_ms} if max_time_ms else {}
+        return list(self.db.news_metadata.aggregate(pipeline, **options))
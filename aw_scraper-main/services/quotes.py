@@ -0,0 +1,248 @@
+"""
+Quote Snapshots
+Batched price snapshots for the S&P 500 and watchlists, served from memory
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import CollectionInvalid
+
+from services.cache_utils import TTLCache
+from services.fundamentals import yahoo_symbol
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLLECTION = 'quote_snapshots'
+LATEST_COLLECTION = 'quote_latest'
+SNAPSHOT_ID = 'snapshot'
+
+# Symbols outside the universe that a snapshot will also track once requested
+MAX_EXTRA_SYMBOLS = 500
+
+
+def _number(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def download_quotes(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Latest daily bar and previous close for many symbols in one Yahoo download.
+
+    Quotes are keyed by the symbols as given, not by their Yahoo form.
+    """
+    if not symbols:
+        return {}
+    import yfinance as yf  # pulls in pandas; deferred until the first refresh
+
+    tickers = [yahoo_symbol(symbol) for symbol in symbols]
+    frame = yf.download(list(dict.fromkeys(tickers)), period='5d', interval='1d', group_by='ticker',
+                        auto_adjust=False, progress=False, threads=True)
+    quotes = {}
+    multi = getattr(frame.columns, 'nlevels', 1) > 1
+    for symbol, ticker in zip(symbols, tickers):
+        try:
+            bars = frame[ticker] if multi else frame
+        except KeyError:
+            continue
+        bars = bars.dropna(subset=['Close'])
+        if bars.empty:
+            continue
+        last = bars.iloc[-1]
+        price = _number(last['Close'])
+        prev_close = _number(bars.iloc[-2]['Close']) if len(bars) > 1 else None
+        change = price - prev_close if price is not None and prev_close else None
+        quotes[symbol] = {
+            'symbol': symbol,
+            'price': price,
+            'open': _number(last['Open']),
+            'high': _number(last['High']),
+            'low': _number(last['Low']),
+            'volume': _number(last['Volume']),
+            'prev_close': prev_close,
+            'change': round(change, 4) if change is not None else None,
+            'change_pct': round(change / prev_close * 100, 4) if change is not None else None,
+            'trading_day': bars.index[-1].strftime('%Y-%m-%d')
+        }
+    return quotes
+
+
+class QuoteSnapshotService:
+    """Serve multi-symbol quotes from an in-memory snapshot refreshed once per interval.
+
+    One worker at a time claims the shared snapshot document in Mongo,
+    downloads every tracked symbol in a single batched Yahoo call, appends the
+    rows to a time-series collection and publishes the snapshot; other workers
+    just reload it. Requests never wait on the full download: until a snapshot
+    is published, and for symbols nobody tracks yet, only the requested symbols
+    are fetched (in one batch), and new ones are tracked from then on.
+    """
+
+    def __init__(self, db, universe=None, interval: Optional[float] = None,
+                 history_days: Optional[int] = None):
+        self.db = db
+        self.history = db[HISTORY_COLLECTION]
+        self.latest = db[LATEST_COLLECTION]
+        self.universe = universe
+        self.interval = interval or float(os.getenv('QUOTE_REFRESH_INTERVAL', 60))
+        self.history_days = history_days or int(os.getenv('QUOTE_HISTORY_DAYS', 30))
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        self._as_of: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Symbols Yahoo had no quote for, so they are not downloaded again on every request
+        self._unknown = TTLCache(ttl=max(self.interval, 300))
+        self._history_ready = False
+
+    def create_collections(self):
+        try:
+            self.db.create_collection(
+                HISTORY_COLLECTION,
+                timeseries={'timeField': 'ts', 'metaField': 'symbol', 'granularity': 'minutes'},
+                expireAfterSeconds=self.history_days * 86400
+            )
+        except CollectionInvalid:
+            pass  # already exists
+
+    def symbols(self) -> List[str]:
+        tracked = []
+        if self.universe is not None:
+            tracked = [str(doc['_id']).upper() for doc in self.universe.find({}, {'_id': 1}) if doc.get('_id')]
+        snapshot = self.latest.find_one({'_id': SNAPSHOT_ID}, {'extra_symbols': 1}) or {}
+        return list(dict.fromkeys(tracked + snapshot.get('extra_symbols', [])))
+
+    # Shared snapshot
+
+    def _claim(self) -> bool:
+        """Take the refresh for this interval unless the snapshot is fresh or another worker has it"""
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=self.interval)
+        self.latest.update_one({'_id': SNAPSHOT_ID}, {'$setOnInsert': {'as_of': None, 'refreshing_until': None}},
+                               upsert=True)
+        claimed = self.latest.find_one_and_update(
+            {'_id': SNAPSHOT_ID,
+             '$and': [{'$or': [{'as_of': None}, {'as_of': {'$lt': stale}}]},
+                      {'$or': [{'refreshing_until': None}, {'refreshing_until': {'$lt': now}}]}]},
+            {'$set': {'refreshing_until': now + timedelta(seconds=max(self.interval, 120))}},
+            projection={'_id': 1}
+        )
+        return claimed is not None
+
+    def _download_and_publish(self):
+        started = time.monotonic()
+        now = datetime.now(timezone.utc)
+        try:
+            symbols = self.symbols()
+            quotes = download_quotes(symbols)
+            if quotes:
+                if not self._history_ready:
+                    # A plain collection created by the first insert could never become time-series
+                    self.create_collections()
+                    self._history_ready = True
+                self.history.insert_many([dict(quote, ts=now) for quote in quotes.values()], ordered=False)
+            self.latest.update_one({'_id': SNAPSHOT_ID}, {'$set': {
+                'as_of': now, 'quotes': list(quotes.values()), 'refreshing_until': None
+            }})
+        except Exception:
+            self.latest.update_one({'_id': SNAPSHOT_ID}, {'$set': {'refreshing_until': None}})
+            raise
+        logger.info(f"Downloaded {len(quotes)}/{len(symbols)} quotes in {time.monotonic() - started:.1f}s")
+
+    def _load(self) -> bool:
+        snapshot = self.latest.find_one({'_id': SNAPSHOT_ID}, {'as_of': 1, 'quotes': 1})
+        if not snapshot or not snapshot.get('as_of'):
+            return False
+        if self._as_of is None or snapshot['as_of'] != self._as_of:
+            quotes = {quote['symbol']: quote for quote in snapshot.get('quotes', [])}
+            with self._lock:
+                # Keep on-demand quotes for symbols the published snapshot does not have yet
+                self._quotes = dict(self._quotes, **quotes)
+                self._as_of = snapshot['as_of']
+        return True
+
+    def refresh(self):
+        if self._claim():
+            self._download_and_publish()
+        self._load()
+        self._checked_at = time.monotonic()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Quote snapshot refresh failed: {e}")
+            self._checked_at = time.monotonic()
+        finally:
+            self._refreshing = False
+
+    def warm(self):
+        """Load the published snapshot, or download the first one, in a background thread"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name='quote-refresh', daemon=True).start()
+
+    def _ensure_fresh(self):
+        if self._as_of is None and not self._load():
+            # Nothing published yet: the full download runs in the background and
+            # this request only fetches the symbols it asked for
+            self.warm()
+        elif time.monotonic() - self._checked_at >= self.interval:
+            self.warm()
+
+    def _track(self, symbols: List[str]):
+        """Add symbols to the snapshot's extra_symbols once each, keeping the newest MAX_EXTRA_SYMBOLS"""
+        tracked = set()
+        if self.universe is not None:
+            tracked = {str(doc['_id']).upper() for doc in self.universe.find({'_id': {'$in': symbols}}, {'_id': 1})}
+        symbols = [symbol for symbol in symbols if symbol not in tracked]
+        if not symbols:
+            return
+        # A pipeline update, so workers tracking the same symbol concurrently cannot add it twice
+        extra = {'$ifNull': ['$extra_symbols', []]}
+        self.latest.update_one({'_id': SNAPSHOT_ID}, [{'$set': {'extra_symbols': {'$slice': [
+            {'$concatArrays': [extra, {'$filter': {
+                'input': {'$literal': symbols}, 'as': 'symbol', 'cond': {'$not': [{'$in': ['$$symbol', extra]}]}
+            }}]}, -MAX_EXTRA_SYMBOLS
+        ]}}}], upsert=True)
+
+    # Reads
+
+    def get(self, symbols: List[str]) -> Dict[str, Any]:
+        """Quotes for ``symbols``; untracked symbols are fetched together and tracked from then on"""
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols if symbol))
+        self._ensure_fresh()
+        quotes = self._quotes
+        missing = [symbol for symbol in symbols if symbol not in quotes and self._unknown.get(symbol) is None]
+        if missing:
+            fetched = download_quotes(missing)
+            for symbol in missing:
+                if symbol not in fetched:
+                    self._unknown.set(symbol, True)
+            if fetched:
+                with self._lock:
+                    self._quotes = dict(self._quotes, **fetched)
+                self._track(list(fetched))
+            quotes = self._quotes
+        return {
+            'quotes': {symbol: quotes[symbol] for symbol in symbols if symbol in quotes},
+            'missing': [symbol for symbol in symbols if symbol not in quotes],
+            'as_of': self._as_of
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self._quotes),
+            'as_of': self._as_of,
+            'interval_seconds': self.interval
+        }
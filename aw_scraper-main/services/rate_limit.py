@@ -0,0 +1,89 @@
+"""
+Rate Limiting
+Token buckets for pacing calls to metered upstream APIs, per process or shared through MongoDB
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'rate_limits'
+
+
+class RateLimiter:
+    """Allow ``rate`` calls per second on average, with bursts of up to ``burst``"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a call is allowed; False if that would take longer than ``timeout``"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """A token bucket kept in one Mongo document, so every worker draws from the same budget.
+
+    Each attempt refills and takes a token in a single atomic pipeline update.
+    Refill uses the caller's clock, so workers on different hosts should run
+    NTP. If Mongo is unreachable, calls are paced by a per-process bucket instead.
+    """
+
+    def __init__(self, db, name: str, rate: float, burst: Optional[int] = None):
+        self.collection = db[COLLECTION]
+        self.name = name
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.fallback = RateLimiter(rate, self.burst)
+
+    def _take(self) -> float:
+        """Take a token if one is available; otherwise return how long until one will be"""
+        now = datetime.now(timezone.utc)
+        updated = {'$ifNull': ['$updated', now]}
+        elapsed = {'$max': [0, {'$divide': [{'$subtract': [now, updated]}, 1000]}]}
+        tokens = {'$min': [self.burst, {'$add': [{'$ifNull': ['$tokens', self.burst]},
+                                                 {'$multiply': [elapsed, self.rate]}]}]}
+        document = self.collection.find_one_and_update({'_id': self.name}, [
+            {'$set': {'tokens': tokens, 'updated': {'$max': [now, updated]}}},
+            {'$set': {'granted': {'$gte': ['$tokens', 1]}}},
+            {'$set': {'tokens': {'$cond': ['$granted', {'$subtract': ['$tokens', 1]}, '$tokens']}}}
+        ], upsert=True, return_document=ReturnDocument.AFTER)
+        return 0.0 if document['granted'] else (1 - document['tokens']) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a call is allowed; False if that would take longer than ``timeout``"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            try:
+                wait = self._take()
+            except Exception as e:
+                logger.warning(f"Shared rate limit '{self.name}' unavailable, pacing per process: {e}")
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                return self.fallback.acquire(timeout=max(remaining, 0) if remaining is not None else None)
+            if not wait:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
@@ -0,0 +1,50 @@
+"""
+Read Routing
+Read preferences that send designated read-only queries to replica set secondaries
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from pymongo.read_preferences import (Nearest, Primary, PrimaryPreferred, Secondary,
+                                      SecondaryPreferred)
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCE_MODES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+# The server rejects maxStalenessSeconds below 90 (and below heartbeat + 10s)
+MIN_MAX_STALENESS_SECONDS = 90
+
+
+def read_preference_from_env(mode: Optional[str] = None, max_staleness: Optional[int] = None):
+    """Read preference for the read-only endpoints.
+
+    ``MONGO_READ_PREFERENCE`` picks the mode (``secondaryPreferred`` unless set;
+    ``primary`` turns routing off) and ``MONGO_MAX_STALENESS_SECONDS`` bounds how
+    far behind the primary a secondary may be and still serve reads. On a
+    standalone server, or a replica set with no eligible secondary, reads
+    simply go to the primary.
+    """
+    mode = mode or os.getenv('MONGO_READ_PREFERENCE', 'secondaryPreferred')
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"MONGO_READ_PREFERENCE must be one of: {', '.join(READ_PREFERENCE_MODES)}")
+    if mode == 'primary':
+        return Primary()
+    max_staleness = max_staleness or int(os.getenv('MONGO_MAX_STALENESS_SECONDS', MIN_MAX_STALENESS_SECONDS))
+    if max_staleness < MIN_MAX_STALENESS_SECONDS:
+        raise ValueError(f"MONGO_MAX_STALENESS_SECONDS must be at least {MIN_MAX_STALENESS_SECONDS}")
+    return READ_PREFERENCE_MODES[mode](max_staleness=max_staleness)
+
+
+def describe(read_preference) -> Dict[str, Any]:
+    """Read preference as reported by /health"""
+    document = read_preference.document
+    return {'mode': document['mode'], 'max_staleness_seconds': document.get('maxStalenessSeconds')}
@@ -0,0 +1,176 @@
+"""
+Realtime News Aggregator
+Queries Alpha Vantage, SearXNG and the news database in parallel under one deadline
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from services.cache_utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+ALPHA_VANTAGE_TIME_FORMAT = '%Y%m%dT%H%M%S'
+
+# Floor for a source's timeout when it starts with (almost) none of the deadline left
+MIN_SOURCE_TIMEOUT = 0.1
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse the mixed timestamp formats of the realtime sources into aware UTC datetimes"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    text = str(value).strip()
+    try:
+        # Alpha Vantage: 20240131T154500
+        parsed = datetime.strptime(text, ALPHA_VANTAGE_TIME_FORMAT)
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class RealtimeNewsAggregator:
+    """Fan out to every realtime source at once and merge whatever finishes in time.
+
+    Each source gets the remaining request deadline as its upstream timeout.
+    Sources that miss the deadline are reported as ``timeout`` and keep running
+    in the background so their results land in the short-lived upstream cache
+    for the next request with the same query.
+    """
+
+    def __init__(self, db, news_search, deadline: float = 8.0, upstream_ttl: float = 60,
+                 max_workers: int = 16, search_proxy=None):
+        self.db = db
+        self.news_search = news_search
+        self.search_proxy = search_proxy
+        self.deadline = deadline
+        self.upstream_cache = TTLCache(upstream_ttl)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='realtime-news')
+        self.session = requests.Session()
+
+    def fetch_alpha_vantage(self, query: str, limit: int, timeout: float) -> List[Dict[str, Any]]:
+        alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
+        if not alpha_vantage_key or not query:
+            return []
+        response = self.session.get('https://www.alphavantage.co/query', params={
+            'function': 'NEWS_SENTIMENT',
+            'tickers': query.upper(),
+            'apikey': alpha_vantage_key,
+            'limit': limit
+        }, timeout=timeout)
+        response.raise_for_status()
+        return [{
+            'title': article.get('title', ''),
+            'summary': article.get('summary', ''),
+            'source': article.get('source', 'Alpha Vantage'),
+            'publishedAt': article.get('time_published', ''),
+            'url': article.get('url', ''),
+            'score': article.get('overall_sentiment_score', 0),
+            'category': 'financial'
+        } for article in response.json().get('feed', [])[:limit // 2]]
+
+    def fetch_searx(self, query: str, limit: int, timeout: float) -> List[Dict[str, Any]]:
+        if not query:
+            return []
+        if self.search_proxy is not None:
+            data = self.search_proxy.search(f"{query} news", categories='news', budget=timeout)
+        else:
+            searx_url = os.getenv("SEARX_BASE_URL", "http://localhost:8081")
+            response = self.session.get(f"{searx_url.rstrip('/')}/search", params={
+                'q': f"{query} news", 'format': 'json', 'categories': 'news'
+            }, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+        return [{
+            'title': result.get('title', ''),
+            'summary': result.get('content', ''),
+            'source': (result.get('engines') or ['Web Search'])[0],
+            'publishedAt': result.get('publishedDate', ''),
+            'url': result.get('url', ''),
+            'score': result.get('score', 0),
+            'category': 'web'
+        } for result in data.get('results', [])[:limit // 2]]
+
+    def fetch_database(self, query: str, limit: int, timeout: float) -> List[Dict[str, Any]]:
+        if query:
+            articles = self.news_search.search(query, limit=limit // 3, max_time_ms=int(timeout * 1000))
+        else:
+            articles = list(self.db.news_metadata.find({}).sort('published_at', -1)
+                            .limit(limit // 3).max_time_ms(int(timeout * 1000)))
+        for article in articles:
+            article['category'] = article.get('category', 'database')
+            article.setdefault('publishedAt', article.get('published_at', ''))
+        return articles
+
+    def _run_source(self, name: str, fetch, query: str, limit: int, expires_at: float, cacheable: bool):
+        """Run one source fetch within what is left of the deadline; upstream results are cached for the next request"""
+        timeout = max(expires_at - time.monotonic(), MIN_SOURCE_TIMEOUT)
+        results = fetch(query, limit, timeout)
+        if cacheable:
+            self.upstream_cache.set((name, query, limit), results)
+        return results
+
+    def aggregate(self, query: str, source: str = 'all', limit: int = 20,
+                  deadline: Optional[float] = None) -> Dict[str, Any]:
+        deadline = self.deadline if deadline is None else deadline
+        started = time.monotonic()
+
+        plan = []
+        if source in ['all', 'financial']:
+            plan.append(('alpha_vantage', self.fetch_alpha_vantage, True))
+        if source in ['all', 'web'] and query:
+            plan.append(('searxng', self.fetch_searx, True))
+        if source in ['all', 'database']:
+            plan.append(('database', self.fetch_database, False))
+
+        source_status: Dict[str, Dict[str, Any]] = {}
+        results: List[Dict[str, Any]] = []
+        futures = {}
+        for name, fetch, cacheable in plan:
+            cached = self.upstream_cache.get((name, query, limit)) if cacheable else None
+            if cached is not None:
+                source_status[name] = {'status': 'cached', 'count': len(cached)}
+                results.extend(dict(item, provider=name) for item in cached)
+                continue
+            future = self.executor.submit(self._run_source, name, fetch, query, limit, started + deadline, cacheable)
+            futures[future] = name
+
+        done, pending = wait(futures, timeout=max(0.0, deadline - (time.monotonic() - started)))
+        for future in done:
+            name = futures[future]
+            try:
+                items = future.result()
+                source_status[name] = {'status': 'ok', 'count': len(items)}
+                results.extend(dict(item, provider=name) for item in items)
+            except Exception as e:
+                logger.warning(f"Realtime source {name} failed: {e}")
+                source_status[name] = {'status': 'error', 'count': 0, 'error': str(e)}
+        for future in pending:
+            source_status[futures[future]] = {'status': 'timeout', 'count': 0}
+
+        # Merge on the parsed timestamp rather than the raw mixed-format strings
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        for item in results:
+            parsed = parse_timestamp(item.get('publishedAt'))
+            item['timestamp'] = parsed.isoformat() if parsed else None
+            item['_sort_key'] = parsed or epoch
+        results.sort(key=lambda item: item.pop('_sort_key'), reverse=True)
+
+        return {
+            'results': results[:limit],
+            'source_status': source_status,
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
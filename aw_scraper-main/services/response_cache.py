@@ -0,0 +1,228 @@
+"""
+Response Cache
+Server-side cache for hot read endpoints with strong ETags and stale-while-revalidate
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Optional
+
+from flask import current_app, make_response, request
+
+from services.compression import (
+    COMPRESSIBLE_MIMETYPES, MIN_COMPRESS_SIZE, compress, encoded_etag, negotiate_encoding
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-namespace version counters shared by all workers and ingest processes
+VERSIONS_COLLECTION = 'response_cache_versions'
+
+
+def invalidate_namespace(db, namespace: str):
+    """Bump a namespace version so every worker drops its cached responses"""
+    db[VERSIONS_COLLECTION].update_one(
+        {'_id': namespace},
+        {'$inc': {'version': 1}, '$set': {'updated_at': datetime.utcnow()}},
+        upsert=True
+    )
+
+
+class CacheEntry:
+    __slots__ = ('body', 'status', 'mimetype', 'etag', 'created_at', 'ttl', 'version', 'refreshing', 'variants')
+
+    def __init__(self, body: bytes, status: int, mimetype: str, ttl: float, version: int):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.created_at = time.monotonic()
+        self.ttl = ttl
+        self.version = version
+        self.refreshing = False
+        # Compressed bodies, filled once per encoding for the lifetime of the entry
+        self.variants: Dict[str, bytes] = {}
+
+    def body_for(self, encoding: Optional[str]):
+        """Return (body, encoding), compressing at most once per encoding"""
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE or self.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return self.body, None
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = compress(self.body, encoding)
+            self.variants[encoding] = variant
+        return variant, encoding
+
+    def is_fresh(self, version: int) -> bool:
+        return self.version == version and time.monotonic() - self.created_at < self.ttl
+
+    def is_usable(self, version: int, stale_ttl: float) -> bool:
+        """Servable while revalidating: expired by age only, never by an invalidation"""
+        return self.version == version and time.monotonic() - self.created_at < self.ttl + stale_ttl
+
+
+class ResponseCache:
+    """In-process cache of successful JSON responses keyed by route and normalized query.
+
+    Entries expire after ``ttl`` seconds or when their namespace is invalidated.
+    Expired entries younger than ``ttl + stale_ttl`` are revalidated in the
+    background; if the refresh takes longer than ``revalidate_timeout`` the
+    stale body is served instead of making the client wait on MongoDB.
+    Entries of an invalidated namespace are never served stale.
+    """
+
+    def __init__(self, db, default_ttl: float = 30, stale_ttl: float = 300,
+                 revalidate_timeout: float = 0.5, version_check_interval: float = 5,
+                 max_entries: int = 512, invalidation_delay: Optional[float] = None):
+        self.db = db
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.revalidate_timeout = revalidate_timeout
+        self.version_check_interval = version_check_interval
+        self.max_entries = max_entries
+        self._entries: Dict[str, CacheEntry] = {}
+        self._versions: Dict[str, int] = {}
+        self._versions_checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.invalidation_delay = (invalidation_delay if invalidation_delay is not None
+                                   else float(os.getenv('RESPONSE_CACHE_INVALIDATION_DELAY', 10)))
+        self._pending_invalidations: Dict[str, threading.Timer] = {}
+
+    def _version(self, namespace: str) -> int:
+        """Current namespace version, re-read from MongoDB at most every version_check_interval"""
+        now = time.monotonic()
+        if now - self._versions_checked_at.get(namespace, float('-inf')) >= self.version_check_interval:
+            try:
+                doc = self.db[VERSIONS_COLLECTION].find_one({'_id': namespace}, {'version': 1})
+                self._versions[namespace] = doc.get('version', 0) if doc else 0
+            except Exception as e:
+                logger.warning(f"Response cache version check failed for {namespace}: {e}")
+            self._versions_checked_at[namespace] = now
+        return self._versions.get(namespace, 0)
+
+    def invalidate(self, namespace: str):
+        """Invalidate a namespace in this worker and in every other worker"""
+        try:
+            invalidate_namespace(self.db, namespace)
+        except Exception as e:
+            logger.warning(f"Failed to publish cache invalidation for {namespace}: {e}")
+        with self._lock:
+            prefix = f"{namespace}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+        self._versions_checked_at.pop(namespace, None)
+
+    def invalidate_later(self, namespace: str):
+        """Debounced ``invalidate`` for high-frequency writers (one per AI result).
+
+        The first call schedules an invalidation ``invalidation_delay`` seconds
+        out; calls made before it fires are folded into it, so a burst of
+        writes costs one version bump instead of one per write.
+        """
+        with self._lock:
+            if namespace in self._pending_invalidations:
+                return
+            timer = threading.Timer(self.invalidation_delay, self._flush_invalidation, args=(namespace,))
+            timer.daemon = True
+            self._pending_invalidations[namespace] = timer
+        timer.start()
+
+    def _flush_invalidation(self, namespace: str):
+        with self._lock:
+            self._pending_invalidations.pop(namespace, None)
+        self.invalidate(namespace)
+
+    @staticmethod
+    def make_key(namespace: str) -> str:
+        """Key by namespace, path and query arguments in sorted order"""
+        args = sorted((k, v) for k in request.args for v in sorted(request.args.getlist(k)))
+        query = '&'.join(f"{k}={v}" for k, v in args)
+        return f"{namespace}:{request.path}?{query}"
+
+    def _store(self, key: str, response, ttl: float, version: int) -> Optional[CacheEntry]:
+        if response.status_code != 200 or response.is_streamed or response.mimetype != 'application/json':
+            return None
+        entry = CacheEntry(response.get_data(), response.status_code, response.mimetype, ttl, version)
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = entry
+        return entry
+
+    def _respond(self, entry: CacheEntry, cache_status: str):
+        body, encoding = entry.body_for(negotiate_encoding())
+        etag = encoded_etag(entry.etag, encoding)
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, status=entry.status, mimetype=entry.mimetype)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        response.headers['X-Cache'] = cache_status
+        return response
+
+    def _revalidate(self, app, key: str, view, args, kwargs, ttl: float, version: int,
+                    path: str, query_string: str):
+        try:
+            with app.test_request_context(path, query_string=query_string):
+                response = make_response(view(*args, **kwargs))
+                self._store(key, response, ttl, version)
+        except Exception as e:
+            logger.warning(f"Background revalidation failed for {key}: {e}")
+        finally:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refreshing = False
+
+    def cached(self, namespace: str, ttl: Optional[float] = None):
+        """Decorator caching a GET view under ``namespace``"""
+        ttl = self.default_ttl if ttl is None else ttl
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                key = self.make_key(namespace)
+                version = self._version(namespace)
+                entry = self._entries.get(key)
+
+                if entry is not None and entry.is_fresh(version):
+                    return self._respond(entry, 'HIT')
+
+                if entry is not None and entry.is_usable(version, self.stale_ttl):
+                    with self._lock:
+                        start_refresh = not entry.refreshing
+                        entry.refreshing = True
+                    if start_refresh:
+                        worker = threading.Thread(
+                            target=self._revalidate,
+                            args=(current_app._get_current_object(), key, view, args, kwargs, ttl, version,
+                                  request.path, request.query_string.decode('latin-1')),
+                            daemon=True
+                        )
+                        worker.start()
+                        worker.join(self.revalidate_timeout)
+                    refreshed = self._entries.get(key)
+                    if refreshed is not None and refreshed is not entry and refreshed.is_fresh(version):
+                        return self._respond(refreshed, 'REVALIDATED')
+                    return self._respond(entry, 'STALE')
+
+                response = make_response(view(*args, **kwargs))
+                stored = self._store(key, response, ttl, version)
+                if stored is None:
+                    return response
+                return self._respond(stored, 'MISS')
+
+            return wrapper
+
+        return decorator
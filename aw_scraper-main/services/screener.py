@@ -0,0 +1,404 @@
+"""
+Fundamental Screener
+Columnar NumPy snapshot of db.financials with vectorized ratios, filters and sorting
+"""
+
+import fcntl
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'screener')
+
+# Statement line items (yfinance names, as stored under ``data`` in db.financials)
+LINE_ITEMS = {
+    'IS': ['TotalRevenue', 'GrossProfit', 'OperatingIncome', 'NetIncome', 'EBITDA'],
+    'BS': ['TotalAssets', 'TotalDebt', 'StockholdersEquity', 'CurrentAssets', 'CurrentLiabilities',
+           'CashAndCashEquivalents'],
+    'CF': ['OperatingCashFlow', 'FreeCashFlow']
+}
+
+# Matrix columns: each line item for the latest period, then for the same period a
+# year earlier (the prior fiscal year, or four quarters back for quarterly data)
+COLUMNS = [item for items in LINE_ITEMS.values() for item in items]
+PRIOR_COLUMNS = [f"{item}_prev" for item in COLUMNS]
+ALL_COLUMNS = COLUMNS + PRIOR_COLUMNS
+COLUMN_INDEX = {name: i for i, name in enumerate(ALL_COLUMNS)}
+
+# How far before the latest period the year-ago period may end (fiscal calendars drift)
+YEAR_AGO_DAYS = (320, 410)
+# Bumped when the matrix layout or meaning changes, forcing a full rebuild
+SNAPSHOT_VERSION = 2
+# Periods kept per company and statement while looking for the year-ago one
+MAX_PERIODS = 8
+
+METRICS = [
+    'revenue', 'net_income', 'ebitda', 'total_debt', 'cash',
+    'gross_margin', 'operating_margin', 'net_margin', 'fcf_margin',
+    'debt_to_equity', 'current_ratio', 'roe', 'roa',
+    'revenue_growth', 'net_income_growth'
+]
+
+_FILTER = re.compile(r'^\s*([a-z_]+)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)(%?)\s*$')
+_OPERATORS = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater,
+    '>=': np.greater_equal, '==': np.equal, '!=': np.not_equal
+}
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+def compute_metrics(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """All screener metrics for every company at once (NaN where inputs are missing)"""
+    col = lambda name: matrix[:, COLUMN_INDEX[name]]
+    revenue, net_income = col('TotalRevenue'), col('NetIncome')
+    equity = col('StockholdersEquity')
+    return {
+        'revenue': revenue,
+        'net_income': net_income,
+        'ebitda': col('EBITDA'),
+        'total_debt': col('TotalDebt'),
+        'cash': col('CashAndCashEquivalents'),
+        'gross_margin': _ratio(col('GrossProfit'), revenue),
+        'operating_margin': _ratio(col('OperatingIncome'), revenue),
+        'net_margin': _ratio(net_income, revenue),
+        'fcf_margin': _ratio(col('FreeCashFlow'), revenue),
+        'debt_to_equity': _ratio(col('TotalDebt'), np.where(equity > 0, equity, np.nan)),
+        'current_ratio': _ratio(col('CurrentAssets'), col('CurrentLiabilities')),
+        'roe': _ratio(net_income, np.where(equity > 0, equity, np.nan)),
+        'roa': _ratio(net_income, col('TotalAssets')),
+        'revenue_growth': _ratio(revenue - col('TotalRevenue_prev'), np.abs(col('TotalRevenue_prev'))),
+        'net_income_growth': _ratio(net_income - col('NetIncome_prev'), np.abs(col('NetIncome_prev')))
+    }
+
+
+def period_date(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def year_ago(periods: List[Tuple[datetime, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Data of the period ending about a year before the latest one (``periods`` newest first)"""
+    latest = periods[0][0]
+    for period, data in periods[1:]:
+        if YEAR_AGO_DAYS[0] <= (latest - period).days <= YEAR_AGO_DAYS[1]:
+            return data
+    return None
+
+
+def parse_filters(expression: str) -> List[Tuple[str, str, float]]:
+    """Parse ``debt_to_equity<1,revenue_growth>10%`` into (metric, operator, value) triples"""
+    filters = []
+    for clause in filter(None, (part.strip() for part in re.split(r',|\band\b', expression or ''))):
+        match = _FILTER.match(clause)
+        if not match:
+            raise ValueError(f"Invalid filter '{clause}'")
+        metric, operator, value, percent = match.groups()
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Must be one of: {', '.join(METRICS)}")
+        filters.append((metric, operator, float(value) / 100 if percent else float(value)))
+    return filters
+
+
+class ScreenerEngine:
+    """Serve filter/sort queries over the whole universe from a memory-mapped matrix.
+
+    The matrix (companies x line items for the latest and year-ago period) lives
+    in ``<data_dir>/<freq>.<build>.npy`` named by a JSON manifest, so all gunicorn
+    workers share the same pages. Refreshes are incremental: only symbols whose
+    financials changed since the last build are reloaded. Each build writes a new
+    matrix file and then replaces the manifest atomically, so readers always see
+    a matching symbol list and matrix. A file lock keeps one worker refreshing
+    at a time; the others pick the new build up by its manifest mtime.
+    """
+
+    def __init__(self, db, universe=None, freq: str = 'annual', data_dir: Optional[str] = None,
+                 refresh_interval: float = 300):
+        self.financials = db.financials
+        # db.financials is keyed by company_id; symbols come from db.companies
+        self.companies = db.companies
+        self.universe = universe
+        self.freq = freq
+        self.data_dir = data_dir or os.getenv('SCREENER_DATA_DIR', DEFAULT_DATA_DIR)
+        self.refresh_interval = refresh_interval
+        self.manifest_path = os.path.join(self.data_dir, f"{freq}.json")
+        self.lock_path = os.path.join(self.data_dir, f"{freq}.lock")
+        self._snapshot = None
+        self._snapshot_mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    # Building
+
+    def _universe_info(self) -> Dict[str, Dict[str, Any]]:
+        if self.universe is None:
+            return {}
+        return {
+            str(doc['_id']).upper(): {'name': doc.get('name'), 'sector': doc.get('sector')}
+            for doc in self.universe.find({}, {'name': 1, 'sector': 1}) if doc.get('_id')
+        }
+
+    def _symbols(self, company_ids: List[Any]) -> Dict[Any, str]:
+        return {
+            doc['_id']: str(doc['symbol']).upper()
+            for doc in self.companies.find({'_id': {'$in': company_ids}}, {'symbol': 1}) if doc.get('symbol')
+        }
+
+    def _load_rows(self, company_ids: Optional[List[Any]] = None) -> Tuple[Dict[str, np.ndarray], Dict[str, str], Any]:
+        """Latest and year-ago values per symbol, plus each symbol's latest period"""
+        query: Dict[str, Any] = {'frequency': self.freq, 'type': {'$in': list(LINE_ITEMS)}}
+        query['company_id'] = {'$in': company_ids} if company_ids is not None else {'$exists': True}
+        projection = {'company_id': 1, 'type': 1, 'period': 1, 'updated_at': 1}
+        projection.update({f"data.{item}": 1 for items in LINE_ITEMS.values() for item in items})
+
+        history: Dict[Tuple[Any, str], List[Tuple[datetime, Dict[str, Any]]]] = {}
+        latest_update = None
+        for doc in self.financials.find(query, projection).sort('period', -1):
+            period = period_date(doc.get('period'))
+            if period is None or doc.get('type') not in LINE_ITEMS:
+                continue
+            periods = history.setdefault((doc['company_id'], doc['type']), [])
+            if len(periods) < MAX_PERIODS:
+                periods.append((period, doc.get('data') or {}))
+            updated = doc.get('updated_at')
+            if updated is not None and (latest_update is None or updated > latest_update):
+                latest_update = updated
+
+        symbols = self._symbols(list({company_id for company_id, _ in history}))
+        rows: Dict[str, np.ndarray] = {}
+        periods_by_symbol: Dict[str, str] = {}
+        for (company_id, statement), periods in history.items():
+            symbol = symbols.get(company_id)
+            if symbol is None:
+                continue
+            row = rows.setdefault(symbol, np.full(len(ALL_COLUMNS), np.nan))
+            for offset, data in ((0, periods[0][1]), (len(COLUMNS), year_ago(periods))):
+                for item in LINE_ITEMS[statement]:
+                    value = (data or {}).get(item)
+                    if isinstance(value, (int, float)):
+                        row[offset + COLUMN_INDEX[item]] = value
+            periods_by_symbol[symbol] = max(periods_by_symbol.get(symbol, ''), periods[0][0].isoformat()[:10])
+        return rows, periods_by_symbol, latest_update
+
+    def _matrix_path(self, manifest: Dict[str, Any]) -> str:
+        # Manifests written before versioned builds name no file
+        return os.path.join(self.data_dir, manifest.get('matrix') or f"{self.freq}.npy")
+
+    def _write(self, symbols: List[str], matrix: np.ndarray, manifest: Dict[str, Any]):
+        """Write the matrix to a new file, then switch to it by replacing the manifest"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        matrix_name = f"{self.freq}.{time.time_ns()}-{os.getpid()}.npy"
+        with open(os.path.join(self.data_dir, matrix_name), 'wb') as f:
+            np.save(f, matrix)
+        tmp_manifest = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_manifest, 'w') as f:
+            json.dump(dict(manifest, symbols=symbols, matrix=matrix_name, columns=ALL_COLUMNS,
+                           version=SNAPSHOT_VERSION), f)
+        os.replace(tmp_manifest, self.manifest_path)
+        # Workers that already mapped an old build keep reading it after the unlink
+        for path in glob.glob(os.path.join(self.data_dir, f"{self.freq}.*npy")):
+            if os.path.basename(path) != matrix_name:
+                os.remove(path)
+
+    def refresh(self, full: bool = False) -> int:
+        """Rebuild changed rows (or everything); returns the number of rows reloaded"""
+        manifest = self._read_manifest()
+        if full or manifest is None or manifest.get('version') != SNAPSHOT_VERSION:
+            rows, periods, latest_update = self._load_rows()
+            symbols = sorted(rows)
+            matrix = np.vstack([rows[s] for s in symbols]) if symbols else np.empty((0, len(ALL_COLUMNS)))
+            info = self._universe_info()
+            self._write(symbols, matrix, {
+                'updated_at': latest_update.isoformat() if latest_update else None,
+                'periods': periods,
+                'info': {s: info.get(s, {}) for s in symbols},
+                'built_at': datetime.now(timezone.utc).isoformat()
+            })
+            return len(symbols)
+
+        since = manifest.get('updated_at')
+        query: Dict[str, Any] = {'frequency': self.freq}
+        if since:
+            query['updated_at'] = {'$gt': datetime.fromisoformat(since)}
+        changed = [c for c in self.financials.distinct('company_id', query) if c is not None]
+        if not changed:
+            return 0
+
+        rows, periods, latest_update = self._load_rows(changed)
+        symbols = list(manifest['symbols'])
+        matrix = np.array(np.load(self._matrix_path(manifest), mmap_mode='r'))
+        position = {s: i for i, s in enumerate(symbols)}
+        new_symbols = [s for s in rows if s not in position]
+        if new_symbols:
+            matrix = np.vstack([matrix, np.full((len(new_symbols), len(ALL_COLUMNS)), np.nan)])
+            for s in new_symbols:
+                position[s] = len(symbols)
+                symbols.append(s)
+        for s, row in rows.items():
+            matrix[position[s]] = row
+
+        info = manifest.get('info', {})
+        if new_symbols:
+            universe = self._universe_info()
+            info.update({s: universe.get(s, {}) for s in new_symbols})
+        manifest['periods'].update(periods)
+        if latest_update is not None:
+            manifest['updated_at'] = latest_update.isoformat()
+        manifest['info'] = info
+        self._write(symbols, matrix, manifest)
+        return len(rows)
+
+    # Reading
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _try_refresh(self):
+        """Refresh unless another worker holds the lock"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        with open(self.lock_path, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            try:
+                reloaded = self.refresh()
+                if reloaded:
+                    logger.info(f"Screener ({self.freq}) reloaded {reloaded} companies")
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _background_refresh(self):
+        try:
+            self._try_refresh()
+        except Exception as e:
+            logger.warning(f"Screener refresh failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def _load_snapshot(self):
+        mtime = os.stat(self.manifest_path).st_mtime
+        if self._snapshot is not None and mtime == self._snapshot_mtime:
+            return self._snapshot
+        for attempt in range(3):
+            manifest = self._read_manifest()
+            try:
+                matrix = np.load(self._matrix_path(manifest), mmap_mode='r')
+            except FileNotFoundError:
+                # A refresh replaced the build between the two reads; its manifest is in place
+                if attempt == 2:
+                    raise
+                continue
+            if matrix.shape[0] == len(manifest['symbols']):
+                break
+            if attempt == 2:
+                raise RuntimeError(f"Screener ({self.freq}) snapshot has {matrix.shape[0]} rows "
+                                   f"for {len(manifest['symbols'])} symbols")
+        metrics = compute_metrics(matrix)
+        info = manifest.get('info', {})
+        symbols = manifest['symbols']
+        snapshot = {
+            'symbols': np.array(symbols, dtype=object),
+            'names': np.array([info.get(s, {}).get('name') for s in symbols], dtype=object),
+            'sectors': np.array([info.get(s, {}).get('sector') for s in symbols], dtype=object),
+            'periods': manifest.get('periods', {}),
+            'metrics': metrics
+        }
+        self._snapshot, self._snapshot_mtime = snapshot, mtime
+        return snapshot
+
+    def _ensure_fresh(self):
+        if not os.path.exists(self.manifest_path):
+            with self._lock:
+                if not os.path.exists(self.manifest_path):
+                    self._try_refresh()
+                    if not os.path.exists(self.manifest_path):
+                        # Another worker is building it; wait for its file
+                        deadline = time.monotonic() + 30
+                        while not os.path.exists(self.manifest_path) and time.monotonic() < deadline:
+                            time.sleep(0.1)
+            self._checked_at = time.monotonic()
+            return
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._checked_at = time.monotonic()
+        threading.Thread(target=self._background_refresh, name='screener-refresh', daemon=True).start()
+
+    def screen(self, filters: str = '', sort: Optional[str] = None, limit: int = 50,
+               sector: Optional[str] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        parsed = parse_filters(filters)
+        descending = bool(sort) and sort.startswith('-')
+        sort_metric = sort.lstrip('-+') if sort else None
+        if sort_metric and sort_metric not in METRICS:
+            raise ValueError(f"Unknown sort metric '{sort_metric}'. Must be one of: {', '.join(METRICS)}")
+
+        self._ensure_fresh()
+        snapshot = self._load_snapshot()
+        metrics = snapshot['metrics']
+
+        mask = np.ones(len(snapshot['symbols']), dtype=bool)
+        for metric, operator, value in parsed:
+            values = metrics[metric]
+            # NaN compares False, so companies missing an input never pass a filter on it
+            mask &= _OPERATORS[operator](values, value)
+        if sector:
+            mask &= snapshot['sectors'] == sector
+
+        selected = np.flatnonzero(mask)
+        if sort_metric:
+            keys = metrics[sort_metric][selected]
+            keys = -keys if descending else keys
+            # NaNs sort last either way
+            selected = selected[np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')]
+        page = selected[:limit]
+
+        data = []
+        for i in page:
+            symbol = snapshot['symbols'][i]
+            row = {
+                'symbol': symbol,
+                'name': snapshot['names'][i],
+                'sector': snapshot['sectors'][i],
+                'period': snapshot['periods'].get(symbol)
+            }
+            for metric in METRICS:
+                value = metrics[metric][i]
+                row[metric] = None if np.isnan(value) else round(float(value), 6)
+            data.append(row)
+
+        return {
+            'data': data,
+            'count': len(data),
+            'total_matched': int(len(selected)),
+            'universe': int(len(snapshot['symbols'])),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
@@ -0,0 +1,111 @@
+"""
+Search Proxy
+Cached, coalesced SearXNG queries over a pooled keep-alive connection
+"""
+
+import logging
+import os
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.cache_utils import TTLCache
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Results older than the fresh TTL are still served (marked stale) when SearXNG fails
+STALE_TTL_MULTIPLIER = 10
+
+# Smallest per-request latency budget a caller may ask for, in seconds
+MIN_BUDGET = 0.1
+
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', query or '')).strip().lower()
+
+
+def format_web_results(query: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """SearXNG JSON in the shape the dashboard's web search expects"""
+    formatted_results = [{
+        'title': result.get('title', ''),
+        'url': result.get('url', ''),
+        'description': result.get('content', ''),
+        'source': result.get('engines', []),
+        'published_date': result.get('publishedDate', ''),
+        'score': result.get('score', 0)
+    } for result in data.get('results', [])]
+    return {
+        'query': query,
+        'results': formatted_results,
+        'total_results': len(formatted_results),
+        'search_metadata': {
+            'query_time': data.get('query_time', 0),
+            'total_results_estimate': data.get('number_of_results', 0)
+        }
+    }
+
+
+class SearchProxy:
+    """Front SearXNG with a short-TTL cache keyed by normalized query.
+
+    Identical queries already in flight are coalesced onto one upstream call,
+    every call shares one pooled keep-alive session, and each upstream request
+    is bounded by a latency budget. When SearXNG errors or misses the budget,
+    the last known results for the query are returned as stale if there are any.
+    Callers coalesced onto an upstream call wait at most their own budget and
+    then fall back the same way; they never issue a second upstream call.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, ttl: Optional[float] = None,
+                 budget: Optional[float] = None, pool_size: int = 32):
+        self.base_url = (base_url or os.getenv('SEARX_BASE_URL', 'http://localhost:8081')).rstrip('/')
+        self.ttl = ttl or float(os.getenv('SEARCH_CACHE_TTL', 120))
+        self.budget = budget or float(os.getenv('SEARCH_LATENCY_BUDGET', 5))
+        self.cache = TTLCache(self.ttl * STALE_TTL_MULTIPLIER, max_entries=4096)
+        self.single_flight = SingleFlight(wait_timeout=self.budget, compute_on_timeout=False)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _fetch(self, query: str, categories: Optional[str], budget: float) -> Dict[str, Any]:
+        params = {'q': query, 'format': 'json'}
+        if categories:
+            params['categories'] = categories
+        response = self.session.get(f"{self.base_url}/search", params=params,
+                                    timeout=(min(budget, 3.05), budget))
+        response.raise_for_status()
+        return response.json()
+
+    def search(self, query: str, categories: Optional[str] = None,
+               budget: Optional[float] = None) -> Dict[str, Any]:
+        """Raw SearXNG results plus ``cached``/``stale`` flags; raises if nothing usable is available"""
+        budget = max(min(budget or self.budget, self.budget), MIN_BUDGET)
+        key = (normalize_query(query), categories or '')
+        entry = self.cache.get(key)
+        if entry is not None and time.monotonic() - entry['fetched_at'] < self.ttl:
+            return dict(entry['data'], cached=True, stale=False)
+
+        def compute():
+            data = self._fetch(query, categories, budget)
+            self.cache.set(key, {'data': data, 'fetched_at': time.monotonic()})
+            return data
+
+        try:
+            data = self.single_flight.run('\x1f'.join(key), compute, timeout=budget)
+            return dict(data, cached=False, stale=False)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"SearXNG failed for '{key[0]}', serving stale results: {e}")
+            return dict(entry['data'], cached=True, stale=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'single_flight': self.single_flight.stats(), 'ttl_seconds': self.ttl, 'budget_seconds': self.budget}
@@ -0,0 +1,170 @@
+"""
+Single Flight
+Coalesces identical in-flight computations across threads and gunicorn workers
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# prometheus_client is optional: the in-process counters in stats() are always kept
+try:
+    from prometheus_client import Counter
+except ImportError:
+    Counter = None
+
+COLLECTION = 'ai_inflight'
+TTL_INDEX_NAME = 'ai_inflight_ttl'
+
+if Counter is not None:
+    SINGLE_FLIGHT_CALLS = Counter(
+        'single_flight_calls_total', 'Coalesced computations by role',
+        ['role'])
+
+
+class SingleFlight:
+    """Run a computation once per key while identical calls wait for its result.
+
+    Within a process, the first caller for a key becomes the leader and later
+    callers block on its Future. Across workers, the leader also takes a lock
+    document in Mongo; a leader that finds the lock held by another worker
+    polls ``lookup`` (the shared result cache) until the owner's result lands,
+    and only computes itself if the owner fails or its lock expires.
+
+    A follower that times out computes locally, unless ``compute_on_timeout``
+    is False: then it raises ``TimeoutError`` so callers with a latency budget
+    can fall back (e.g. to stale data) instead of repeating the upstream call.
+    """
+
+    def __init__(self, db=None, lock_ttl: float = 150, wait_timeout: float = 130,
+                 poll_interval: float = 0.25, compute_on_timeout: bool = True):
+        self.collection = db[COLLECTION] if db is not None else None
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.compute_on_timeout = compute_on_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'leader': 0, 'follower': 0, 'remote_wait': 0}
+
+    def create_indexes(self):
+        if self.collection is None:
+            return
+        # Backstop cleanup only; expiry is also checked explicitly since the TTL monitor runs once a minute
+        self.collection.create_index([('expires_at', 1)], expireAfterSeconds=0, name=TTL_INDEX_NAME)
+
+    def _count(self, role: str):
+        with self._lock:
+            self._stats[role] += 1
+        if Counter is not None:
+            SINGLE_FLIGHT_CALLS.labels(role).inc()
+
+    def run(self, key: str, compute: Callable[[], Any],
+            lookup: Optional[Callable[[], Any]] = None, timeout: Optional[float] = None) -> Any:
+        """``timeout`` bounds how long a follower waits (``wait_timeout`` by default)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self._count('follower')
+            try:
+                result = future.result(timeout=timeout if timeout is not None else self.wait_timeout)
+                return dict(result) if isinstance(result, dict) else result
+            except FutureTimeoutError:
+                if not self.compute_on_timeout:
+                    raise TimeoutError(f"Timed out waiting for in-flight computation {key[:12]}")
+                logger.warning(f"Timed out waiting for in-flight computation {key[:12]}, computing locally")
+                return compute()
+
+        self._count('leader')
+        try:
+            result = self._run_leader(key, compute, lookup)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _run_leader(self, key: str, compute: Callable[[], Any], lookup: Optional[Callable[[], Any]]) -> Any:
+        if self.collection is None or lookup is None:
+            return compute()
+        if self._acquire(key):
+            try:
+                return compute()
+            finally:
+                self._release(key)
+
+        # Another worker is computing: wait for its result to reach the shared cache
+        self._count('remote_wait')
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            result = lookup()
+            if result is not None:
+                return result
+            if not self._held(key):
+                # The owner finished without a cacheable result, or died; one last look
+                result = lookup()
+                if result is not None:
+                    return result
+                break
+        return compute()
+
+    def _acquire(self, key: str) -> bool:
+        now = datetime.now(timezone.utc)
+        document = {'_id': key, 'owner': self.owner, 'expires_at': now + timedelta(seconds=self.lock_ttl)}
+        try:
+            self.collection.insert_one(document)
+            return True
+        except DuplicateKeyError:
+            # Take over a lock left behind by a worker that died mid-computation
+            if self.collection.delete_one({'_id': key, 'expires_at': {'$lt': now}}).deleted_count:
+                try:
+                    self.collection.insert_one(document)
+                    return True
+                except DuplicateKeyError:
+                    return False
+            return False
+        except Exception as e:
+            logger.warning(f"Single-flight lock unavailable, computing without it: {e}")
+            return True
+
+    def _held(self, key: str) -> bool:
+        try:
+            return self.collection.find_one(
+                {'_id': key, 'expires_at': {'$gt': datetime.now(timezone.utc)}}, {'_id': 1}
+            ) is not None
+        except Exception:
+            return False
+
+    def _release(self, key: str):
+        if self.collection is None:
+            return
+        try:
+            self.collection.delete_one({'_id': key, 'owner': self.owner})
+        except Exception as e:
+            logger.warning(f"Failed to release single-flight lock: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._inflight)
+        return stats
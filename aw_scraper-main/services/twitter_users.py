@@ -0,0 +1,127 @@
+"""
+Twitter User Resolver
+Cached screen name -> user info lookups with negative caching and rate-limited batch resolution
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from services.cache_utils import TTLCache
+from services.rate_limit import SharedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'twitter_user_cache'
+TTL_INDEX_NAME = 'twitter_user_cache_ttl'
+
+MAX_BATCH_HANDLES = 200
+
+
+def normalize_handle(handle: str) -> str:
+    return (handle or '').strip().lstrip('@').lower()
+
+
+class TwitterUserResolver:
+    """Resolve screen names to ``{_id, user_name, user_handle}`` without a crawl per call.
+
+    Results are kept in memory and in a Mongo collection whose documents
+    expire on their own: found users after ``ttl_days`` (the handle -> rest_id
+    mapping almost never changes), unknown handles after
+    ``negative_ttl_hours`` so typos and suspended accounts do not cost a
+    RapidAPI request every time. Misses run ``twitter_user_info`` crawls
+    concurrently, paced by a token bucket sized to the RapidAPI plan and
+    shared by all workers through Mongo.
+    """
+
+    def __init__(self, db, crawl_runner, ttl_days: Optional[float] = None,
+                 negative_ttl_hours: Optional[float] = None, rate_limit: Optional[float] = None,
+                 max_concurrency: Optional[int] = None, crawl_timeout: float = 60):
+        self.collection = db[COLLECTION]
+        self.crawl_runner = crawl_runner
+        self.ttl = timedelta(days=ttl_days or float(os.getenv('TWITTER_USER_TTL_DAYS', 30)))
+        self.negative_ttl = timedelta(hours=negative_ttl_hours or float(os.getenv('TWITTER_USER_NEGATIVE_TTL_HOURS', 6)))
+        self.limiter = SharedRateLimiter(
+            db, 'twitter_api', rate_limit or float(os.getenv('TWITTER_API_RATE_LIMIT', 5)))
+        self.max_concurrency = max_concurrency or int(os.getenv('TWITTER_API_MAX_CONCURRENCY', 4))
+        self.crawl_timeout = crawl_timeout
+        self.memory = TTLCache(ttl=600, max_entries=10000)
+
+    def create_indexes(self):
+        self.collection.create_index([('expires_at', 1)], expireAfterSeconds=0, name=TTL_INDEX_NAME)
+
+    def _payload(self, handle: str) -> Dict[str, Any]:
+        return {
+            "payload": {
+                "screen_name": handle,
+                "withSafetyModeUserFields": True,
+                "withHighlightedLabel": True
+            }
+        }
+
+    def _store(self, key: str, user: Optional[Dict[str, Any]]):
+        now = datetime.now(timezone.utc)
+        self.collection.replace_one({'_id': key}, {
+            '_id': key,
+            'user': user,
+            'found': user is not None,
+            'fetched_at': now,
+            'expires_at': now + (self.ttl if user is not None else self.negative_ttl)
+        }, upsert=True)
+        self.memory.set(key, {'user': user})
+
+    def fetch(self, handle: str) -> Optional[Dict[str, Any]]:
+        """Resolve one handle through the twitter_user_info spider and cache the outcome"""
+        key = normalize_handle(handle)
+        if not self.limiter.acquire(timeout=self.crawl_timeout):
+            raise TimeoutError('Twitter API rate limit wait exceeded')
+        job = self.crawl_runner.run_job('twitter_user_info', timeout=self.crawl_timeout, **self._payload(handle))
+        user = next((item for item in job.items if item.get('_id') and item.get('user_handle')), None)
+        if user is not None:
+            user = {'_id': user['_id'], 'user_handle': user['user_handle'], 'user_name': user.get('user_name')}
+        elif not job.stats.get('downloader/response_status_count/200'):
+            # Rate limited or upstream error rather than an unknown handle: do not cache
+            raise RuntimeError(f"Twitter API gave no answer for {handle}")
+        self._store(key, user)
+        return user
+
+    def resolve_many(self, handles: List[str]) -> Dict[str, Any]:
+        """{handle: user or None}; handles that could not be resolved right now map to ``{'error': ...}``"""
+        keys = {handle: normalize_handle(handle) for handle in handles if normalize_handle(handle)}
+        results: Dict[str, Any] = {}
+        missing = []
+        for key in dict.fromkeys(keys.values()):
+            cached = self.memory.get(key)
+            if cached is not None:
+                results[key] = cached['user']
+            else:
+                missing.append(key)
+
+        if missing:
+            now = datetime.now(timezone.utc)
+            for doc in self.collection.find({'_id': {'$in': missing}, 'expires_at': {'$gt': now}}):
+                results[doc['_id']] = doc.get('user')
+                self.memory.set(doc['_id'], {'user': doc.get('user')})
+            missing = [key for key in missing if key not in results]
+
+        if missing:
+            started = time.monotonic()
+
+            def resolve(key):
+                try:
+                    return key, self.fetch(key)
+                except Exception as e:
+                    logger.warning(f"Resolving twitter handle {key} failed: {e}")
+                    return key, {'error': str(e)}
+
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(missing))) as executor:
+                results.update(executor.map(resolve, missing))
+            logger.info(f"Resolved {len(missing)} twitter handles in {time.monotonic() - started:.1f}s")
+
+        return {handle: results.get(key) for handle, key in keys.items()}
+
+    def resolve(self, handle: str) -> Optional[Dict[str, Any]]:
+        return self.resolve_many([handle]).get(handle)
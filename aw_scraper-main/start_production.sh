@@ -12,11 +12,19 @@ mkdir -p logs
 
 # Kill any existing processes
 pkill -f "gunicorn.*dashboard_api" || true
+pkill -f "gunicorn.*dashboard_api_async" || true
 pkill -f "python3.*api_dashboard" || true
 
+# Create indexes and collections once, before any worker boots
+python3 migrate.py || exit 1
+
 # Start with Gunicorn in production mode
 gunicorn -c gunicorn.conf.py wsgi:app --daemon
 
+# Start the gevent pool for AI and Twitter routes (proxied to port 5002 by nginx)
+gunicorn -c gunicorn_async.conf.py wsgi:app --daemon
+
 echo "Dashboard API started in production mode on port 5001"
+echo "Async AI/Twitter pool started on port 5002"
 echo "Check logs/gunicorn_access.log for access logs"
 echo "Check logs/gunicorn_error.log for error logs"